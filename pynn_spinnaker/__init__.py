@@ -10,7 +10,6 @@ really running simulations.
 
 import atexit
 import logging
-import warnings
 
 from pyNN import common
 from pyNN.common.control import (DEFAULT_MAX_DELAY, DEFAULT_TIMESTEP,
@@ -26,14 +25,10 @@ from .connectors import *
 from .random import NativeRNG
 from .populations import Population, PopulationView, Assembly
 from .projections import Projection
-
-from rig.machine_control.machine_controller import TruncationWarning
+from .spinnaker.recording_arrays import read_arrays
 
 logger = logging.getLogger("PyNN")
 
-# Convert Rig TruncationWarnings to errors
-warnings.simplefilter("error", TruncationWarning)
-
 @atexit.register
 def _stop_on_spinnaker():
     # Stop SpiNNaker simulation
@@ -60,6 +55,8 @@ def setup(timestep=DEFAULT_TIMESTEP, min_delay=DEFAULT_MIN_DELAY,
         extra_params.get("realtime_proportion", 1.0)
     simulator.state.convert_direct_connections =\
         extra_params.get("convert_direct_connections", True)
+    simulator.state.merge_direct_connections =\
+        extra_params.get("merge_direct_connections", True)
     simulator.state.generate_connections_on_chip =\
         extra_params.get("generate_connections_on_chip", True)
     simulator.state.stop_on_spinnaker =\
@@ -70,6 +67,18 @@ def setup(timestep=DEFAULT_TIMESTEP, min_delay=DEFAULT_MIN_DELAY,
         extra_params.get("disable_software_watchdog", False)
     simulator.state.allocation_fudge_factor =\
         extra_params.get("allocation_fudge_factor", 1.6)
+    simulator.state.synaptic_matrix_cache_dir =\
+        extra_params.get("synaptic_matrix_cache_dir")
+    simulator.state.synaptic_matrix_cache_max_bytes =\
+        extra_params.get("synaptic_matrix_cache_max_bytes", 1024 * 1024 * 1024)
+    simulator.state.bulk_readback =\
+        extra_params.get("bulk_readback", True)
+    simulator.state.readback_threads =\
+        extra_params.get("readback_threads")
+    simulator.state.injection_lookahead_ms =\
+        extra_params.get("injection_lookahead_ms", 50.0)
+    simulator.state.injection_max_packets_per_second =\
+        extra_params.get("injection_max_packets_per_second", 5000)
 
     return rank()
 
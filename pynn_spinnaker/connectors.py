@@ -7,11 +7,14 @@ Connection method classes for PyNN SpiNNaker
 """
 # Import modules
 import numpy as np
+import os
 import scipy
 from spinnaker import lazy_param_map
 import lazyarray as la
 
+from pyNN import errors
 from pyNN.random import RandomDistribution
+from pyNN.recording import files
 
 # Import classes
 from pyNN.connectors import (AllToAllConnector,
@@ -28,6 +31,14 @@ from pyNN.connectors import (AllToAllConnector,
                              FromFileConnector,
                              CloneConnector,
                              ArrayConnector)
+from pyNN.connectors import Connector
+from pyNN.standardmodels import StandardSynapseType
+
+# Import functions
+from copy import deepcopy
+from six import string_types
+from spinnaker.connection_file import (convert_text_connection_file,
+                                       load_binary_connection_file)
 
 # TODO for handling allow_self_connections=False we need the allow_self
 # connections flag, to test if post_slice and pre_slice overlap,
@@ -151,18 +162,30 @@ class FromListConnector(FromListConnector):
     # Internal SpiNNaker methods
     # --------------------------------------------------------------------------
     def _get_slice_row_length_histogram(self, pre_slice, post_slice):
-        # Extract columns of pre and post indices from connection list
-        pre_indices = self.conn_list[:, 0]
-        post_indices = self.conn_list[:, 1]
-
-        # Build mask to select list entries in slice
-        mask = ((pre_indices >= pre_slice.start) &
-                (pre_indices < pre_slice.stop) &
-                (post_indices >= post_slice.start) &
-                (post_indices < post_slice.stop))
-
-        # Return histogram of masked pre-indices
-        return np.bincount(pre_indices[mask].astype(int))
+        # If histogram has already been calculated for these slices, return it
+        cache_key = (pre_slice.start, pre_slice.stop,
+                     post_slice.start, post_slice.stop)
+        hist_cache = self._row_length_histogram_cache
+        if cache_key in hist_cache:
+            return hist_cache[cache_key]
+
+        # Get sorted connection keys and the stride used to build them
+        keys, stride = self._sorted_connection_keys
+
+        # Find the range of keys corresponding to each row in the pre-slice
+        # that have post-synaptic indices within the post slice
+        # **NOTE** post slice is clamped to stride so rows don't overlap
+        row_keys = np.arange(pre_slice.start, pre_slice.stop,
+                             dtype=np.int64) * stride
+        row_starts = np.searchsorted(keys,
+                                     row_keys + min(post_slice.start, stride))
+        row_ends = np.searchsorted(keys,
+                                   row_keys + min(post_slice.stop, stride))
+
+        # Build histogram of these row lengths and add to cache
+        hist = np.bincount(row_ends - row_starts)
+        hist_cache[cache_key] = hist
+        return hist
 
     def _row_synapses_distribution(self, pre_slice, post_slice,
                                    pre_size, post_size):
@@ -176,6 +199,192 @@ class FromListConnector(FromListConnector):
     def _get_projection_initial_state(self, pre_size, post_size):
         return None
 
+    # --------------------------------------------------------------------------
+    # Internal SpiNNaker properties
+    # --------------------------------------------------------------------------
+    @property
+    def _sorted_connection_keys(self):
+        # If connection list hasn't been indexed yet
+        if not hasattr(self, "_connection_keys"):
+            # If connection list is empty, there is nothing to index
+            if len(self.conn_list) == 0:
+                self._connection_keys = (np.empty(0, dtype=np.int64), 1)
+            else:
+                # Extract columns of pre and post indices from connection list
+                pre_indices = self.conn_list[:, 0].astype(np.int64)
+                post_indices = self.conn_list[:, 1].astype(np.int64)
+
+                # Combine indices into single keys, sorted by pre then post
+                stride = post_indices.max() + 1
+                keys = (pre_indices * stride) + post_indices
+                keys.sort()
+
+                self._connection_keys = (keys, stride)
+
+        return self._connection_keys
+
+    @property
+    def _row_length_histogram_cache(self):
+        if not hasattr(self, "_row_length_histograms"):
+            self._row_length_histograms = {}
+        return self._row_length_histograms
+
+
+# ----------------------------------------------------------------------------
+# FromFileConnector
+# ----------------------------------------------------------------------------
+class FromFileConnector(FromFileConnector, FromListConnector):
+    """
+    Make connections according to a list read from a file.
+
+    Arguments:
+        `file`:
+            either a PyNN file object, the filename of a text file containing
+            a list of connections, in the format required by
+            `FromListConnector`, or the filename of a binary (.npy) file
+            containing the same columns, sorted by post-synaptic index.
+            Text files are converted once into a binary file alongside them
+            (with .npy appended to the filename) which is then memory-mapped.
+        `distributed`:
+            not supported.
+        `safe`:
+            if True, check that weights and delays have valid values. If False,
+            this check is skipped.
+        `callback`:
+            if True, display a progress bar on the terminal.
+        `column_names`:
+            the names of the parameter columns in a binary file. If not
+            provided, they are assumed to be 'weight', 'delay' if there are
+            two parameter columns.
+    """
+    def __init__(self, file, distributed=False, safe=True, callback=None,
+                 column_names=None):
+        assert not distributed, "Distributed connection files not supported"
+
+        Connector.__init__(self, safe=safe, callback=callback)
+        self.distributed = distributed
+
+        # If file is a binary connection file, memory-map it directly
+        if isinstance(file, string_types) and file.endswith(".npy"):
+            self.file = file
+            self.conn_list = load_binary_connection_file(file)
+
+            # Use column names or PyNN defaults
+            if column_names is not None:
+                self.column_names = column_names
+            elif self.conn_list.shape[1] == 4:
+                self.column_names = ("weight", "delay")
+            else:
+                self.column_names = ()
+            return
+
+        # Otherwise, open text files
+        if isinstance(file, string_types):
+            file = files.StandardTextFile(file, mode="r")
+        self.file = file
+
+        # Read column names from file metadata
+        self.column_names = list(
+            file.get_metadata().get("columns", ("weight", "delay")))
+        for ignore in "ij":
+            if ignore in self.column_names:
+                self.column_names.remove(ignore)
+
+        # If file is a text file
+        if type(file) is files.StandardTextFile:
+            # If there is no up-to-date binary version
+            # of the text file, convert text file
+            binary_filename = file.name + ".npy"
+            if (not os.path.exists(binary_filename) or
+                    (os.path.getmtime(binary_filename) <
+                     os.path.getmtime(file.name))):
+                convert_text_connection_file(file.name, binary_filename)
+
+            # Memory-map binary file
+            self.conn_list = load_binary_connection_file(binary_filename)
+        # Otherwise, read file into memory and sort by post-synaptic index
+        else:
+            conn_list = file.read()
+            self.conn_list = conn_list[np.argsort(conn_list[:, 1],
+                                                  kind="mergesort")]
+
+    def connect(self, projection):
+        """Connect-up a Projection."""
+        synapse_parameter_names = projection.synapse_type.get_parameter_names()
+        for name in self.column_names:
+            if name not in synapse_parameter_names:
+                raise ValueError("%s is not a valid parameter for %s" % (
+                                 name, projection.synapse_type.__class__.__name__))
+
+        # Read connections to the range of post-synaptic neurons that are local
+        mask_local = projection.post._mask_local
+        local_targets = np.flatnonzero(mask_local)
+        if len(local_targets) == 0:
+            return
+        conn_list = self._read_post_slice_connections(local_targets[0],
+                                                      local_targets[-1] + 1)
+
+        if np.any(conn_list[:, 0] >= projection.pre.size):
+            raise errors.ConnectionError("source index out of range")
+
+        # Find the range of connections to each target
+        targets, left = np.unique(conn_list[:, 1].astype(int),
+                                  return_index=True)
+        right = np.append(left[1:], len(conn_list))
+
+        for tgt, l, r in zip(targets, left, right):
+            # Skip any non-local targets within range
+            if not mask_local[tgt]:
+                continue
+
+            sources = conn_list[l:r, 0].astype(int)
+            connection_parameters = deepcopy(projection.synapse_type.parameter_space)
+            connection_parameters.shape = (r - l,)
+            for col, name in enumerate(self.column_names, 2):
+                connection_parameters.update(**{name: conn_list[l:r, col]})
+            if isinstance(projection.synapse_type, StandardSynapseType):
+                connection_parameters = projection.synapse_type.translate(
+                                            connection_parameters)
+            connection_parameters.evaluate()
+            projection._convergent_connect(sources, tgt, **connection_parameters)
+
+    # --------------------------------------------------------------------------
+    # Internal SpiNNaker methods
+    # --------------------------------------------------------------------------
+    def _read_post_slice_connections(self, post_start, post_stop, column=None):
+        # Find the contiguous range of connections to post-synaptic slice
+        start, stop = np.searchsorted(self.conn_list[:, 1],
+                                      [post_start, post_stop])
+
+        # Read either the specified column or entire rows into memory
+        if column is None:
+            return np.asarray(self.conn_list[start:stop])
+        else:
+            return np.asarray(self.conn_list[start:stop, column])
+
+    def _get_slice_row_length_histogram(self, pre_slice, post_slice):
+        # If histogram has already been calculated for these slices, return it
+        cache_key = (pre_slice.start, pre_slice.stop,
+                     post_slice.start, post_slice.stop)
+        hist_cache = self._row_length_histogram_cache
+        if cache_key in hist_cache:
+            return hist_cache[cache_key]
+
+        # Read pre-synaptic indices of connections to post slice
+        pre_indices = self._read_post_slice_connections(
+            post_slice.start, post_slice.stop, 0).astype(np.int64)
+
+        # Count the number of synapses in each row of the pre slice
+        pre_indices = pre_indices[(pre_indices >= pre_slice.start) &
+                                  (pre_indices < pre_slice.stop)]
+        row_lengths = np.bincount(pre_indices - pre_slice.start,
+                                  minlength=len(pre_slice))
+
+        # Build histogram of these row lengths and add to cache
+        hist = np.bincount(row_lengths)
+        hist_cache[cache_key] = hist
+        return hist
+
 
 # ----------------------------------------------------------------------------
 # FixedNumberPostConnector
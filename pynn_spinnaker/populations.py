@@ -3,11 +3,10 @@ import itertools
 import logging
 import math
 import numpy as np
-from rig import machine
 from pyNN import common
 
 # Import classes
-from collections import defaultdict, Iterable, namedtuple
+from collections import defaultdict, Iterable, namedtuple, OrderedDict
 from operator import itemgetter
 from pyNN.standardmodels import StandardCellType
 from pyNN.parameters import ParameterSpace
@@ -15,6 +14,8 @@ from . import simulator
 from .recording import Recorder
 from rig.netlist import Net
 from spinnaker.neural_cluster import NeuralCluster
+from spinnaker.recording_arrays import write_arrays
+from spinnaker.spike_injection import SpikeInjectionQueue
 from spinnaker.synapse_cluster import SynapseCluster
 from spinnaker.spinnaker_population_config import SpinnakerPopulationConfig
 from spinnaker.utils import UnitStrideSlice
@@ -40,12 +41,30 @@ def _calc_cores_per_cluster(cluster_width, constraint):
     return int(math.ceil(2.0 ** math.ceil(np.log2(float(cluster_width) /
                                                  float(constraint)))))
 
+def _calc_max_group_current_inputs_per_core(projections, hardware_timestep_us):
+    # Each projection in group adds a source per neuron so
+    # divide the smallest constraint amongst the projections
+    return (min(p.pre.celltype._calc_max_current_inputs_per_core(
+                hardware_timestep_us) for p in projections) //
+            len(projections))
+
+def _get_group_label(projections):
+    return ", ".join(p.label for p in projections)
+
 # --------------------------------------------------------------------------
 # Assembly
 # --------------------------------------------------------------------------
 class Assembly(common.Assembly):
     _simulator = simulator
 
+    @property
+    def all_cells(self):
+        # **NOTE** concatenating the arrays of ids of each population would
+        # lose track of the population each id belongs to so, instead, build
+        # an array from the ID objects materialised by iterating through them
+        return np.array([id for p in self.populations for id in p.all_cells],
+                        dtype=simulator.ID)
+
 # --------------------------------------------------------------------------
 # PopulationView
 # --------------------------------------------------------------------------
@@ -84,6 +103,16 @@ class PopulationView(common.PopulationView):
     def _get_view(self, selector, label=None):
         return PopulationView(self, selector, label)
 
+    # --------------------------------------------------------------------------
+    # Public PyNN methods
+    # --------------------------------------------------------------------------
+    def get_data(self, variables="all", gather=True, clear=False,
+                 time_window=None):
+        # Create context containing time window and call superclass
+        with self.recorder.get_new_context(time_window=time_window):
+            return super(PopulationView, self).get_data(variables, gather,
+                                                        clear)
+
 
 # --------------------------------------------------------------------------
 # Population
@@ -112,9 +141,50 @@ class Population(common.Population):
         # [pynn_projection]
         self.outgoing_projections = list()
 
+        # List of groups of incoming directly connectable
+        # projections which share a current input cluster
+        # [(pynn_projection)]
+        self._direct_projection_groups = list()
+
+        # If cell type receives spikes injected from the host,
+        # create queue to hold spikes pushed to population
+        self._spike_injection_queue = (
+            SpikeInjectionQueue()
+            if getattr(self.celltype, "_receives_injected_spikes", False)
+            else None)
+
         # Add population to simulator
         self._simulator.state.populations.append(self)
 
+    # --------------------------------------------------------------------------
+    # Public PyNN methods
+    # --------------------------------------------------------------------------
+    def get_data(self, variables="all", gather=True, clear=False,
+                 time_window=None):
+        """
+        Return a Neo `Block` containing the data (spikes, state variables)
+        recorded from the Population.
+
+        If `time_window` is a (t_start, t_stop) tuple in ms, only data
+        recorded between these times is read back from SpiNNaker.
+        """
+        # Create context containing time window and call superclass
+        with self.recorder.get_new_context(time_window=time_window):
+            return super(Population, self).get_data(variables, gather, clear)
+
+    def can_record(self, variable):
+        """Determine whether `variable` can be recorded from this population.
+
+        In addition to the cell type's recordables, any population which can
+        record spikes can record the number of spikes each neuron emits as
+        "spike_count" and the mean firing rate of the recorded neurons in
+        each sampling interval as "population_rate".
+        """
+        if variable in self._recorder_class.summary_variables:
+            return super(Population, self).can_record("spikes")
+        else:
+            return super(Population, self).can_record(variable)
+
     # --------------------------------------------------------------------------
     # Public SpiNNaker methods
     # --------------------------------------------------------------------------
@@ -160,6 +230,248 @@ class Population(common.Population):
         return {t: c.read_statistics()
                 for t, c in iteritems(self._synapse_clusters)}
 
+    def push_spikes(self, ids, times):
+        """Push spikes to be emitted by a population of
+        :py:class:`~pynn_spinnaker.SpikeInjector` cells.
+
+        Spikes can be pushed before the simulation is run or, from another
+        thread, while it is running and are sent to SpiNNaker shortly before
+        they are due to be emitted.
+
+        Parameters
+        ----------
+        ids : iterable
+            IDs of the neurons which should spike.
+        times : iterable
+            Times in ms, from the start of the simulation,
+            at which the corresponding neurons should spike.
+        """
+        # Assert that population can receive injected spikes
+        assert self._spike_injection_queue is not None
+
+        # Convert ids to indices and times to ticks and add to queue
+        indices = self.id_to_index(np.asarray(ids, dtype=int))
+        ticks = np.rint(np.asarray(times, dtype=float) /
+                        self._simulator.state.dt).astype(int)
+        self._spike_injection_queue.push(indices, ticks)
+
+    def get_spike_arrays(self):
+        """Get all recorded spikes as flat arrays, bypassing Neo.
+
+        Returns
+        -------
+        (:py:class:`numpy.ndarray`, :py:class:`numpy.ndarray`)
+            Indices of the neurons which spiked and the times
+            in ms at which they did so, sorted by index and then time.
+        """
+        logger.info("Downloading spikes for population %s", self.label)
+
+        # Assert that spikes are being recorded
+        assert "spikes" in self.recorder.recorded
+
+        return self._read_recorded_vars(["spikes"])[0]
+
+    def get_population_rate(self, time_window=None):
+        """Get the mean firing rate of the neurons recording
+        "population_rate" in each sampling interval, bypassing Neo.
+
+        Parameters
+        ----------
+        time_window : (float, float) or None
+            If specified, only intervals starting between
+            these times in ms are read back from SpiNNaker.
+
+        Returns
+        -------
+        (:py:class:`numpy.ndarray`, :py:class:`numpy.ndarray`)
+            Times in ms at which each interval starts and the mean firing
+            rate in Hz within it. Rates of intervals which were dropped
+            because recording buffers were full are NaN.
+        """
+        logger.info("Downloading population rate for population %s",
+                    self.label)
+
+        # Assert that population rate is being recorded
+        assert "population_rate" in self.recorder.recorded
+
+        # If a time window is specified, convert it to a window of ticks
+        tick_window = None
+        if time_window is not None:
+            dt = self._simulator.state.dt
+            tick_window = tuple(int(math.ceil(float(t) / dt))
+                                for t in time_window)
+
+        return self._read_recorded_population_rate(tick_window)
+
+    def get_aggregate_signal(self, variable, time_window=None):
+        """Get the mean and variance of a signal across the recorded
+        neurons, aggregated on-core as specified by
+        `spinnaker_config.analogue_recording_aggregate`, bypassing Neo.
+
+        Parameters
+        ----------
+        variable : str
+            Name of recorded variable to get.
+        time_window : (float, float) or None
+            If specified, only samples recorded between
+            these times in ms are read back from SpiNNaker.
+
+        Returns
+        -------
+        (:py:class:`numpy.ndarray`, :py:class:`numpy.ndarray`, :py:class:`numpy.ndarray`)
+            Times in ms of each sample and the mean and variance of the
+            signal at each. Samples which were dropped because recording
+            buffers were full are NaN.
+        """
+        logger.info("Downloading aggregate %s for population %s",
+                    variable, self.label)
+
+        # Assert that variable is being recorded and aggregated
+        assert variable in self.recorder.recorded
+        assert self.spinnaker_config.analogue_recording_aggregate.get(
+            variable, False)
+
+        # If a time window is specified, convert it to a window of ticks
+        tick_window = None
+        if time_window is not None:
+            dt = self._simulator.state.dt
+            tick_window = tuple(int(math.ceil(float(t) / dt))
+                                for t in time_window)
+
+        return self._read_recorded_aggregate_signal(variable, tick_window)
+
+    def get_data_arrays(self, variables="all"):
+        """Get recorded data as columnar arrays, bypassing Neo.
+
+        Parameters
+        ----------
+        variables : str or list
+            Names of recorded variables to get or "all".
+
+        Returns
+        -------
+        dict
+            Dictionary containing the indices and times of recorded spikes
+            as "spikes.index" and "spikes.time" and, for each recorded
+            signal, the sorted indices of recorded neurons as "<var>.index",
+            a (time x neuron) array of samples as "<var>.signal" and the
+            interval in ms between samples as "<var>.sampling_interval".
+            If recorded, spike counts are included as "spike_count.index"
+            and "spike_count.count" and population rates as
+            "population_rate.time" and "population_rate.rate". Signals
+            aggregated across neurons are included as "<var>.time",
+            "<var>.mean" and "<var>.variance".
+        """
+        logger.info("Downloading recorded data arrays for population %s",
+                    self.label)
+
+        vars_to_read = set(self.recorder.recorded.keys())
+        if variables != "all":
+            vars_to_read = vars_to_read.intersection(set(variables))
+
+        # Split signals aggregated across neurons from other variables
+        aggregate = self.spinnaker_config.analogue_recording_aggregate
+        aggregate_vars = set(v for v in vars_to_read
+                             if aggregate.get(v, False))
+
+        # Read desired spikes and signals
+        spikes, signals = self._read_recorded_vars(
+            vars_to_read.difference(self._recorder_class.summary_variables,
+                                    aggregate_vars))
+
+        arrays = {}
+        for var in aggregate_vars:
+            (arrays[var + ".time"], arrays[var + ".mean"],
+             arrays[var + ".variance"]) =\
+                self._read_recorded_aggregate_signal(var)
+            arrays[var + ".sampling_interval"] =\
+                np.float64(self.recorder.sampling_interval)
+
+        if "spike_count" in vars_to_read:
+            arrays["spike_count.index"], arrays["spike_count.count"] =\
+                self._read_recorded_spike_counts()
+
+        if "population_rate" in vars_to_read:
+            arrays["population_rate.time"], arrays["population_rate.rate"] =\
+                self._read_recorded_population_rate()
+
+        if "spikes" in vars_to_read:
+            arrays["spikes.index"], arrays["spikes.time"] = spikes
+
+        for var, (indices, signal) in iteritems(signals):
+            arrays[var + ".index"] = indices
+            arrays[var + ".signal"] = signal
+            arrays[var + ".sampling_interval"] =\
+                np.float64(self.recorder.sampling_interval)
+
+        return arrays
+
+    def write_arrays(self, filename, variables="all"):
+        """Write recorded data as columnar arrays to an uncompressed NPZ or,
+        if `filename` has an .h5 or .hdf5 extension, an HDF5 file. These can
+        be memory-mapped for later analysis using
+        :py:func:`~pynn_spinnaker.spinnaker.recording_arrays.read_arrays`.
+
+        Parameters
+        ----------
+        filename : str
+            Filename to write to.
+        variables : str or list
+            Names of recorded variables to write or "all".
+        """
+        write_arrays(filename, self.get_data_arrays(variables))
+
+    def get_recording_statistics(self):
+        """Get statistics about how recorded variables
+        were drained from SpiNNaker's recording buffers.
+
+        Returns
+        -------
+        dict
+            Dictionary mapping recorded variable names to the total
+            number of samples drained, maximum number of samples waiting in
+            any one buffer and number of samples dropped as buffers were full.
+        """
+        stats = {}
+
+        # If we have a neuron cluster
+        if self._neural_cluster is not None:
+            # Loop through recorded variables
+            for var in self.recorder.recorded:
+                # If this variable is spikes, get spike recording statistics
+                if var == "spikes":
+                    stats[var] =\
+                        self._neural_cluster.get_spike_recording_statistics()
+                # Otherwise, if it is population rate, get its statistics
+                elif var == "population_rate":
+                    stats[var] = self._neural_cluster.\
+                        get_population_rate_recording_statistics()
+                # Spike counts are not buffered so have no statistics
+                elif var == "spike_count":
+                    continue
+                # Otherwise, get statistics from variable's channel
+                # **HACK** subtract one assuming first entry is spikes
+                else:
+                    channel = self.celltype.recordable.index(var) - 1
+                    stats[var] = self._neural_cluster.\
+                        get_signal_recording_statistics(channel)
+        # Otherwise
+        else:
+            # Get statistics from first directly connectable projection's
+            # current input cluster as these are where spikes are recorded
+            for o in self.outgoing_projections:
+                if o._directly_connectable:
+                    c_cluster = o._current_input_cluster
+                    if "spikes" in self.recorder.recorded:
+                        stats["spikes"] =\
+                            c_cluster.get_spike_recording_statistics()
+                    if "population_rate" in self.recorder.recorded:
+                        stats["population_rate"] =\
+                            c_cluster.get_population_rate_recording_statistics()
+                    break
+
+        return stats
+
     def get_neural_statistics(self):
         logger.info("\tDownloading neural statistics for population %s",
                     self.label)
@@ -171,16 +483,14 @@ class Population(common.Population):
     # Internal PyNN methods
     # --------------------------------------------------------------------------
     def _create_cells(self):
-        id_range = np.arange(simulator.state.id_counter,
-                             simulator.state.id_counter + self.size)
-        self.all_cells = np.array([simulator.ID(id) for id in id_range],
-                                  dtype=simulator.ID)
+        # Create array of consecutive ids which only materialises
+        # ID objects, with this population as their parent, on demand
+        self.all_cells = simulator.IDArray(simulator.state.id_counter,
+                                           self.size, self)
 
         # In terms of MPI, all SpiNNaker neurons are local
         self._mask_local = np.ones((self.size,), bool)
 
-        for id in self.all_cells:
-            id.parent = self
         simulator.state.id_counter += self.size
 
         # Take a deep copy of cell type parameters
@@ -219,27 +529,35 @@ class Population(common.Population):
     # Internal SpiNNaker methods
     # --------------------------------------------------------------------------
     def _read_synaptic_matrices(self, pre_pop, synapse_type, names):
+        return list(self._iter_synaptic_matrices(pre_pop, synapse_type,
+                                                 names))
+
+    def _iter_synaptic_matrices(self, pre_pop, synapse_type, names):
         # Is the receptor type inhibitory
         # **YUCK** this is not a great test
         is_inhibitory = (synapse_type.receptor == "inhibitory")
 
-        # Return synaptic weights from correct synapse cluster
+        # Return iterator over synaptic matrices from correct synapse cluster
         synapse_cluster = self._synapse_clusters[synapse_type]
-        return synapse_cluster.read_synaptic_matrices(
-            pre_pop, names, float(self._simulator.state.dt), is_inhibitory)
+        return synapse_cluster.iter_synaptic_matrices(
+            pre_pop, names, float(self._simulator.state.dt), is_inhibitory,
+            self._simulator.state.bulk_reader)
 
-    def _read_recorded_vars(self, vars_to_read):
-        spike_times = {}
+    def _read_recorded_vars(self, vars_to_read, indices=None,
+                            tick_window=None):
+        spikes = (np.empty(0, dtype=int), np.empty(0, dtype=np.float32))
         signals = {}
+        bulk_reader = self._simulator.state.bulk_reader
 
         # If we have a neuron clusters
         if self._neural_cluster is not None:
             # Loop through all variables to read
             for var in vars_to_read:
-                # If this variable is a spike recording, update the
-                # spike times dictionary with spikes from this vertex
+                # If this variable is a spike recording,
+                # read spikes from the neuron cluster
                 if var == "spikes":
-                    spike_times = self._neural_cluster.read_recorded_spikes()
+                    spikes = self._neural_cluster.read_recorded_spikes(
+                        indices, tick_window, bulk_reader)
                 # Otherwise
                 else:
                     # Convert variable name to channel number
@@ -247,7 +565,8 @@ class Population(common.Population):
                     channel = self.celltype.recordable.index(var) - 1
 
                     # Read signal from this channel and add to dictionary
-                    sig = self._neural_cluster.read_recorded_signal(channel)
+                    sig = self._neural_cluster.read_recorded_signal(
+                        channel, indices, tick_window, bulk_reader)
                     signals[var] = sig
         # Otherwise, if we're recording spikes
         elif "spikes" in vars_to_read:
@@ -257,13 +576,55 @@ class Population(common.Population):
                 if not o._directly_connectable:
                     continue
 
-                # Read spike times from the current input
+                # Read spikes from the current input
                 # cluster associated with this projection
-                spike_times = o._current_input_cluster.read_recorded_spikes()
+                spikes = o._current_input_cluster.read_recorded_spikes(
+                    indices, tick_window, bulk_reader)
                 break
 
 
-        return spike_times, signals
+        return spikes, signals
+
+    def _read_recorded_aggregate_signal(self, variable, tick_window=None):
+        # Convert variable name to channel number
+        # **HACK** subtract one assuming first entry is spikes
+        channel = self.celltype.recordable.index(variable) - 1
+
+        # Read aggregate signal from this channel
+        return self._neural_cluster.read_recorded_aggregate_signal(
+            channel, tick_window, self._simulator.state.bulk_reader)
+
+    def _read_recorded_spike_counts(self, indices=None):
+        # If we have a neuron cluster, read spike counts from it
+        bulk_reader = self._simulator.state.bulk_reader
+        if self._neural_cluster is not None:
+            return self._neural_cluster.read_recorded_spike_counts(
+                indices, bulk_reader)
+
+        # Otherwise, read spike counts from the current input cluster
+        # associated with the first directly connectable projection
+        for o in self.outgoing_projections:
+            if o._directly_connectable:
+                return o._current_input_cluster.read_recorded_spike_counts(
+                    indices, bulk_reader)
+
+        return (np.empty(0, dtype=int), np.empty(0, dtype=np.uint32))
+
+    def _read_recorded_population_rate(self, tick_window=None):
+        # If we have a neuron cluster, read population rate from it
+        bulk_reader = self._simulator.state.bulk_reader
+        if self._neural_cluster is not None:
+            return self._neural_cluster.read_recorded_population_rate(
+                tick_window, bulk_reader)
+
+        # Otherwise, read population rate from the current input
+        # cluster associated with the first directly connectable projection
+        for o in self.outgoing_projections:
+            if o._directly_connectable:
+                return o._current_input_cluster.\
+                    read_recorded_population_rate(tick_window, bulk_reader)
+
+        return (np.empty(0), np.empty(0))
 
     def _estimate_synaptic_constraints(self, hardware_timestep_us,
                                        dc_projections, dc_j_constraints):
@@ -386,11 +747,12 @@ class Population(common.Population):
                                  self._neuron_j_constraint)
 
                     # Calculate final current input J
-                    # constraint for each projection
-                    for p, c in zip(dc_projections, cluster_current_input_processors):
-                        p._current_input_j_constraint = cluster_width // c
+                    # constraint for each group of projections
+                    for g, c in zip(dc_projections, cluster_current_input_processors):
+                        for p in g:
+                            p._current_input_j_constraint = cluster_width // c
                         logger.debug("\t\t\t\t\t%s - %u neurons per current input processor",
-                                 p.label, p._current_input_j_constraint)
+                                 _get_group_label(g), cluster_width // c)
                     return
 
             # Divide the constraint on any synapse processors
@@ -416,16 +778,57 @@ class Population(common.Population):
                         self._neuron_j_constraint)
 
         # Use maximum current input processor constraint directly
-        for c, p in zip(dc_j_constraints, dc_projections):
-            p._current_input_j_constraint = c
+        for c, g in zip(dc_j_constraints, dc_projections):
+            for p in g:
+                p._current_input_j_constraint = c
             logger.debug("\t\t\t%s - %u neurons per current input processor",
-                        p.label, p._current_input_j_constraint)
+                        _get_group_label(g), c)
+
+    def _group_direct_projections(self, projections, hardware_timestep_us):
+        # Sort projections into the order they were created as they are
+        # gathered from dictionaries keyed by pre-synaptic population
+        # **NOTE** this determines the order in which each neuron's sources
+        # are interleaved so is required for builds to be reproducible
+        creation_order = {p: i for i, p in
+                          enumerate(self._simulator.state.projections)}
+        projections = sorted(projections, key=creation_order.__getitem__)
+
+        # If merging is disabled, each projection
+        # gets its own current input cluster
+        if not self._simulator.state.merge_direct_connections:
+            return [(p,) for p in projections]
+
+        # Loop through projections
+        groups = []
+        merge_groups = OrderedDict()
+        for p in projections:
+            # If projection can't be merged, give it its own group
+            # Otherwise, add it to group of projections it can be merged with
+            merge_key = p._current_input_merge_key
+            if merge_key is None:
+                groups.append((p,))
+            else:
+                merge_groups.setdefault(merge_key, []).append(p)
+
+        # Split mergeable projections into groups small enough that each
+        # current input processor can still handle every source of a neuron
+        for merge_projections in itervalues(merge_groups):
+            max_group_size = min(
+                p.pre.celltype._calc_max_current_inputs_per_core(
+                    hardware_timestep_us)
+                for p in merge_projections)
+            groups.extend(tuple(merge_projections[i:i + max_group_size])
+                          for i in range(0, len(merge_projections),
+                                         max_group_size))
+
+        return groups
 
     def _estimate_constraints(self, hardware_timestep_us):
         logger.debug("\t\tFinding maximum synapse J constraints")
 
          # Loop through synapse types
         self._synapse_j_constraints = {}
+        self._direct_projection_groups = []
         dc_projections = []
         dc_j_constraints = []
         for s_type, pre_pop_projections in iteritems(self.incoming_projections):
@@ -448,19 +851,26 @@ class Population(common.Population):
                              synapse_constraint)
                 self._synapse_j_constraints[s_type] = synapse_constraint
 
-            # Calculate maximum number of current inputs
-            # each current input processor can handle
+            # Group together directly connectable projections
+            # which can share a current input cluster
+            s_type_dc_groups = self._group_direct_projections(
+                s_type_dc_projections, hardware_timestep_us)
+
+            # Calculate maximum number of current inputs each current
+            # input processor can handle for each group of projections
+            # **NOTE** merged projections each simulate a source per neuron
             s_type_dc_j_constraints =\
-                [p.pre.celltype._calc_max_current_inputs_per_core(hardware_timestep_us)
-                for p in s_type_dc_projections]
-            for c, p in zip(s_type_dc_j_constraints, s_type_dc_projections):
+                [_calc_max_group_current_inputs_per_core(g, hardware_timestep_us)
+                for g in s_type_dc_groups]
+            for c, g in zip(s_type_dc_j_constraints, s_type_dc_groups):
                 logger.debug("\t\t\tProjection %s - current input J constraint:%u",
-                             p.label, c)
+                             _get_group_label(g), c)
 
-            # Add directly connectable projections and
-            # their corresponding constraint to list
-            dc_projections.extend(s_type_dc_projections)
+            # Add groups of directly connectable projections
+            # and their corresponding constraint to list
+            dc_projections.extend(s_type_dc_groups)
             dc_j_constraints.extend(s_type_dc_j_constraints)
+            self._direct_projection_groups.extend(s_type_dc_groups)
 
         logger.debug("\t\tFinding cluster configuration")
 
@@ -616,7 +1026,7 @@ class Population(common.Population):
                                                       machine_controller)
 
     def _load_verts(self, placements, allocations,
-                    machine_controller, flush_mask):
+                    machine_controller, flush_mask, matrix_cache=None):
         logger.info("\tPopulation label:%s", self.label)
 
         # Loop through synapse types and associated cluster
@@ -627,13 +1037,23 @@ class Population(common.Population):
             # Load vertices that make up cluster
             s_cluster.load(placements, allocations, machine_controller,
                            self.incoming_projections[s_type],
-                           flush_mask)
+                           flush_mask, matrix_cache)
 
         # If population has a neuron cluster, load it
         if self._neural_cluster is not None:
             logger.info("\t\tNeurons")
             self._neural_cluster.load(placements, allocations, machine_controller)
 
+    def _get_spike_injection_target(self, placements, allocations):
+        from rig.place_and_route import Cores
+
+        # Pair the queue of spikes pushed to this population with
+        # the slice and core of each vertex they should be sent to
+        vertices = [(v.neuron_slice,
+                     placements[v] + (allocations[v][Cores].start,))
+                    for v in self._neural_cluster.verts]
+        return self._spike_injection_queue, vertices
+
     # --------------------------------------------------------------------------
     # Internal SpiNNaker properties
     # --------------------------------------------------------------------------
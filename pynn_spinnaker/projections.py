@@ -4,26 +4,29 @@ except ImportError:
     izip = zip  # Python 3 zip returns an iterator already
 from pyNN import common
 from pyNN.random import RandomDistribution
+from pyNN.recording import files
 from pyNN.space import Space
-from pyNN.standardmodels import StandardCellType
+from pyNN.standardmodels import StandardCellType, StandardSynapseType
 from . import simulator
 import itertools
 import logging
 import math
 import numpy as np
 import scipy
+import scipy.sparse
 from bisect import bisect_left
 import lazyarray as la
-from rig import machine
 
 # Import classes
-from collections import namedtuple
+from bitarray import bitarray
+from collections import defaultdict, namedtuple
 from rig.utils.contexts import ContextMixin
 from spinnaker.current_input_cluster import CurrentInputCluster
 from .standardmodels.synapses import StaticSynapse
 from .random import NativeRNG
 
 # Import functions
+from six import itervalues, string_types
 from spinnaker.utils import get_model_comparable, is_scalar
 
 logger = logging.getLogger("pynn_spinnaker")
@@ -75,6 +78,38 @@ def continuous_bisect_fun_left(f, v, val_lower, val_upper):
         k = next_k
     return k
 
+# Build a dense array of shape with the sum of values of connections
+# between pre and post indices and NaN wherever there are no connections
+def sum_connections_to_array(shape, pre_indices, post_indices, values):
+    array = np.empty(shape)
+    array.fill(np.nan)
+
+    # If there are no connections, return array of NaNs
+    if len(values) == 0:
+        return array
+
+    # Convert indices into flat indices into the array and find
+    # each unique connection and which one each synapse belongs to
+    flat_indices = np.ravel_multi_index((pre_indices, post_indices), shape)
+    unique_flat_indices, synapse_connection = np.unique(flat_indices,
+                                                        return_inverse=True)
+
+    # Sum the values of the synapses making up each connection
+    # and scatter these sums into the array
+    array.flat[unique_flat_indices] = np.bincount(
+        synapse_connection, weights=values,
+        minlength=len(unique_flat_indices))
+    return array
+
+# Combine the parameter spaces of several populations into
+# a dictionary of lazy arrays containing each parameter
+def interleave_parameters(parameter_spaces):
+    # Evaluate each parameter from each parameter space and interleave
+    # them so the values of each neuron's parameters are adjacent
+    return {n: la.larray(np.column_stack([p[n].evaluate()
+                                          for p in parameter_spaces]).ravel())
+            for n in parameter_spaces[0].keys()}
+
 # --------------------------------------------------------------------------
 # SynapseClusterType
 # --------------------------------------------------------------------------
@@ -124,6 +159,11 @@ class Projection(common.Projection, ContextMixin):
         # slice is going to be the same so we can cache them
         self._max_dims_estimate_cache = {}
 
+        # Current input cluster used to simulate directly connectable
+        # projection and the projections it's shared between
+        self._current_input_cluster = None
+        self._current_input_projections = ()
+
         # If pre-synaptic population in an assembly
         if isinstance(self.pre, common.Assembly):
             # Add this projection to each pre-population in
@@ -155,6 +195,154 @@ class Projection(common.Projection, ContextMixin):
     def set(self, **attributes):
         raise NotImplementedError
 
+    def save(self, attribute_names, file, format="list", gather=True,
+             with_address=True):
+        # If connections are being saved as a list to a text file,
+        # stream them to disk rather than building the entire list
+        if format == "list" and (isinstance(file, string_types) or
+                                 type(file) is files.StandardTextFile):
+            if attribute_names in ("all", "connections"):
+                attribute_names = self.synapse_type.get_parameter_names()
+            if isinstance(attribute_names, string_types):
+                attribute_names = (attribute_names,)
+            if isinstance(file, string_types):
+                file = files.StandardTextFile(file, mode="wb")
+
+            # Write header in the same format as PyNN
+            columns = list(attribute_names)
+            if with_address:
+                columns = ["i", "j"] + columns
+            file._check_open()
+            file.fileobj.write("# columns = %s\n" % columns)
+
+            # Write each chunk of connections as rows of text
+            for chunk in self.iter_connections(attribute_names,
+                                               with_address=with_address):
+                np.savetxt(file.fileobj,
+                           np.column_stack([chunk[n]
+                                            for n in chunk.dtype.names]),
+                           fmt="%r", delimiter="\t")
+            file.close()
+        # Otherwise, let PyNN gather the connections and save them
+        else:
+            common.Projection.save(self, attribute_names, file, format,
+                                   gather, with_address)
+
+    # --------------------------------------------------------------------------
+    # Public SpiNNaker methods
+    # --------------------------------------------------------------------------
+    def get_sparse(self, attribute_names, sparse_format="csr"):
+        """Get the values of connection attributes as sparse matrices.
+
+        Unlike `get(..., format="array")`, only the connections which
+        exist are ever stored so this is suitable for downloading large,
+        sparsely-connected projections.
+
+        Parameters
+        ----------
+        attribute_names : str or list of str
+            Name of the attribute (weight or delay) whose values are
+            wanted, or a list of such names.
+        sparse_format : str
+            Any format supported by scipy.sparse e.g. "coo" or "csr".
+            In formats other than "coo", the values of multiple
+            synapses between the same pair of neurons are summed.
+
+        Returns
+        -------
+        scipy.sparse.spmatrix or tuple of scipy.sparse.spmatrix
+            pre x post sparse matrix for each attribute.
+        """
+        if isinstance(attribute_names, string_types):
+            attribute_names = (attribute_names,)
+            return_single = True
+        else:
+            return_single = False
+        if isinstance(self.synapse_type, StandardSynapseType):
+            attribute_names =\
+                self.synapse_type.get_native_names(*attribute_names)
+
+        logger.info("Downloading synaptic matrices for projection %s",
+                    self.label)
+
+        # Read connections as flat index and attribute arrays
+        pre_indices, post_indices, attribute_values =\
+            self._read_connection_arrays(tuple(attribute_names))
+
+        # Wrap index and attribute arrays in COO matrices, which
+        # scipy converts to the requested format without copying indices
+        shape = (self.pre.size, self.post.size)
+        matrices = tuple(
+            scipy.sparse.coo_matrix((v, (pre_indices, post_indices)),
+                                    shape=shape).asformat(sparse_format)
+            for v in attribute_values)
+
+        return matrices[0] if return_single else matrices
+
+    def iter_connections(self, attribute_names, chunk_size=65536,
+                         with_address=True):
+        """Iterate through the connections in this projection in chunks.
+
+        Sub-matrices are downloaded and decoded one at a time so
+        connections can be streamed into files or reductions without
+        holding the entire projection in memory.
+
+        Parameters
+        ----------
+        attribute_names : str or list of str
+            Name of the attribute (weight or delay) whose values are
+            wanted, or a list of such names.
+        chunk_size : int
+            Maximum number of connections to return in each chunk.
+        with_address : bool
+            Should "presynaptic_index" and "postsynaptic_index" fields
+            be included in each chunk.
+
+        Yields
+        ------
+        :py:class:`numpy.ndarray`
+            Structured array of up to `chunk_size` connections with
+            a field for each attribute.
+        """
+        if isinstance(attribute_names, string_types):
+            attribute_names = (attribute_names,)
+        if isinstance(self.synapse_type, StandardSynapseType):
+            attribute_names =\
+                self.synapse_type.get_native_names(*attribute_names)
+
+        names = tuple(attribute_names)
+        if with_address:
+            names = ("presynaptic_index", "postsynaptic_index") + names
+
+        logger.info("Streaming synaptic matrices for projection %s",
+                    self.label)
+
+        # Loop through sub-matrices as they are read
+        pending = []
+        num_pending = 0
+        for matrix in self.post._iter_synaptic_matrices(
+                self.pre, self._synapse_cluster_type, names):
+            # Stack the rows of sub-matrix into a single array
+            matrix = np.concatenate(matrix)
+            pending.append(matrix)
+            num_pending += len(matrix)
+
+            # If enough connections are pending to fill any chunks
+            if num_pending >= chunk_size:
+                # Stack together pending connections and yield full chunks
+                pending = np.concatenate(pending)
+                num_chunks = num_pending // chunk_size
+                for c in range(num_chunks):
+                    yield pending[c * chunk_size:(c + 1) * chunk_size]
+
+                # Keep any remaining connections pending
+                pending = [pending[num_chunks * chunk_size:]]
+                num_pending -= num_chunks * chunk_size
+
+        # Yield any connections that are still pending
+        if num_pending > 0:
+            yield np.concatenate(pending)
+
     # --------------------------------------------------------------------------
     # Internal PyNN methods
     # --------------------------------------------------------------------------
@@ -162,8 +350,8 @@ class Projection(common.Projection, ContextMixin):
         logger.info("Downloading synaptic matrices for projection %s",
                     self.label)
 
-        # Read synaptic matrices from the post-synaptic population
-        synaptic_matrices = self.post._read_synaptic_matrices(
+        # Stream synaptic matrices from the post-synaptic population
+        synaptic_matrices = self.post._iter_synaptic_matrices(
             self.pre, self._synapse_cluster_type, names)
 
         # Loop through all the rows of all the matrices and convert to a list
@@ -174,58 +362,60 @@ class Projection(common.Projection, ContextMixin):
         logger.info("Downloading synaptic matrices for projection %s",
                     self.label)
 
-        # **YUCK** As it's rather hard to build an array without
-        # indices, add index parameters if not specified
-        if "presynaptic_index" not in names:
-            names += ("presynaptic_index",)
-        if "postsynaptic_index" not in names:
-            names += ("postsynaptic_index",)
+        # Read connections as flat index and attribute arrays
+        pre_indices, post_indices, attribute_values =\
+            self._read_connection_arrays(names)
 
-        # Read synaptic matrices from the post-synaptic population
-        synaptic_matrices = self.post._read_synaptic_matrices(
-            self.pre, self._synapse_cluster_type, names)
-
-        # If there are no synaptic matrices i.e. this
-        # projection got entirely optimised out
-        if len(synaptic_matrices) == 0:
-            # Initialize all attribute arrays to NaN indicating no connections
-            attribute_arrays = tuple(
-                np.empty((self.pre.size, self.post.size)) * np.nan
-                for name in names
-                if name != "presynaptic_index" and name != "postsynaptic_index")
-        else:
-            # Stack all rows together into single mega-row
-            all_rows = np.hstack(
-                row for matrix in synaptic_matrices for row in matrix)
-
-            # Count connections and build mask array of the pairs
-            # of neurons between which there are no connections
-            connection_bins = (self.pre.size, self.post.size)
-            no_connection_mask = np.histogram2d(all_rows["presynaptic_index"],
-                                                all_rows["postsynaptic_index"],
-                                                connection_bins)[0] == 0
-
-            # Build a tuple containing the sum of each connection
-            # property (skipping over the pre and postsynaptic indices)
-            attribute_arrays = tuple(
-                scipy.stats.binned_statistic_2d(all_rows["presynaptic_index"],
-                                                all_rows["postsynaptic_index"],
-                                                all_rows[name],
-                                                "sum", connection_bins)[0]
-                for name in names
-                if name != "presynaptic_index" and name != "postsynaptic_index")
-
-            # Loop through each attribute array and set the
-            # value to NaN wherever there is no connection
-            for a in attribute_arrays:
-                a[no_connection_mask] = np.nan
-
-        # Return the tuple of attribute arrays
-        return attribute_arrays
+        # Scatter each attribute directly into a dense pre x post array
+        shape = (self.pre.size, self.post.size)
+        return tuple(sum_connections_to_array(shape, pre_indices,
+                                              post_indices, v)
+                     for v in attribute_values)
 
     # --------------------------------------------------------------------------
     # Internal SpiNNaker methods
     # --------------------------------------------------------------------------
+    def _read_connection_arrays(self, names):
+        # Strip any index names - they are always read
+        attribute_names = tuple(n for n in names
+                                if n != "presynaptic_index" and
+                                n != "postsynaptic_index")
+
+        # Read synaptic matrices from the post-synaptic population
+        synaptic_matrices = self.post._read_synaptic_matrices(
+            self.pre, self._synapse_cluster_type,
+            attribute_names + ("presynaptic_index", "postsynaptic_index"))
+
+        # Stack the rows of each sub-matrix into a single array,
+        # dropping the individual row arrays as we go
+        for i, matrix in enumerate(synaptic_matrices):
+            synaptic_matrices[i] = np.concatenate(matrix)
+
+        # Allocate flat arrays to hold all connections, using the
+        # narrowest index type scipy.sparse can use without copying
+        num_connections = sum(len(m) for m in synaptic_matrices)
+        max_index = max(self.pre.size, self.post.size)
+        index_dtype = (np.int32 if max_index <= np.iinfo(np.int32).max
+                       else np.int64)
+        pre_indices = np.empty(num_connections, dtype=index_dtype)
+        post_indices = np.empty(num_connections, dtype=index_dtype)
+        attribute_values = tuple(np.empty(num_connections, dtype=np.float64)
+                                 for _ in attribute_names)
+
+        # Copy each sub-matrix into flat arrays and release it
+        start = 0
+        for i, matrix in enumerate(synaptic_matrices):
+            end = start + len(matrix)
+            pre_indices[start:end] = matrix["presynaptic_index"]
+            post_indices[start:end] = matrix["postsynaptic_index"]
+            for n, v in zip(attribute_names, attribute_values):
+                v[start:end] = matrix[n]
+
+            synaptic_matrices[i] = None
+            start = end
+
+        return pre_indices, post_indices, attribute_values
+
     def _build(self, **context_kwargs):
         # **TODO** this may already have been connected
         # by another assembled post population
@@ -233,29 +423,55 @@ class Projection(common.Projection, ContextMixin):
         with self.get_new_context(**context_kwargs):
             self._connector.connect(self)
 
-    def _create_current_input_cluster(self, timer_period_us, simulation_ticks,
+    def _create_current_input_cluster(self, merged_projections,
+                                      timer_period_us, simulation_ticks,
                                       vertex_load_applications, vertex_run_applications,
                                       vertex_resources):
-        # If this projection is directory connectable
-        if self._directly_connectable:
-            logger.debug("\t\tProjection:%s", self.label)
-
-            # Find index of receptor type
-            receptor_index =\
-                self.post.celltype.receptor_types.index(self.receptor_type)
-
-            # Create current input cluster
-            self._current_input_cluster = CurrentInputCluster(
-                self.pre.celltype, self.pre._parameters, self.pre.initial_values,
-                self._simulator.state.dt, timer_period_us, simulation_ticks,
-                self.pre.recorder.indices_to_record, self.pre.spinnaker_config,
-                receptor_index, vertex_load_applications, vertex_run_applications,
-                vertex_resources, self._current_input_j_constraint, self.pre.size)
-        # Otherwise, null current input cluster
-        else:
-            self._current_input_cluster = None
+        # Assert that the projection is directly connectable
+        assert self._directly_connectable
 
-        return self._current_input_cluster
+        # Build tuple of all projections this cluster will
+        # simulate in the order their sources are interleaved
+        projections = (self,) + tuple(merged_projections)
+        logger.debug("\t\tProjection:%s",
+                     ", ".join(p.label for p in projections))
+
+        # Find index of receptor type
+        receptor_index =\
+            self.post.celltype.receptor_types.index(self.receptor_type)
+
+        # If this projection isn't merged, use pre-synaptic
+        # population's parameters and recording indices directly
+        if len(projections) == 1:
+            parameters = self.pre._parameters
+            indices_to_record = self.pre.recorder.indices_to_record
+        # Otherwise interleave parameters of each pre-synaptic population
+        # **NOTE** projections from populations which are
+        # being recorded are never merged so record nothing
+        else:
+            num_sources = self.pre.size * len(projections)
+            parameters = interleave_parameters(
+                [p.pre._parameters for p in projections])
+            indices_to_record = defaultdict(
+                lambda: bitarray(itertools.repeat(0, num_sources),
+                                 endian="little"))
+
+        # Create current input cluster
+        current_input_cluster = CurrentInputCluster(
+            self.pre.celltype, parameters, self.pre.initial_values,
+            self._simulator.state.dt, timer_period_us, simulation_ticks,
+            self.pre.recorder.sampling_interval,
+            indices_to_record, self.pre.spinnaker_config,
+            receptor_index, vertex_load_applications, vertex_run_applications,
+            vertex_resources, self._current_input_j_constraint, self.pre.size,
+            len(projections))
+
+        # Share cluster between all projections
+        for p in projections:
+            p._current_input_cluster = current_input_cluster
+            p._current_input_projections = projections
+
+        return current_input_cluster
 
     @ContextMixin.use_contextual_arguments()
     def _direct_convergent_connect(self, presynaptic_indices,
@@ -565,8 +781,9 @@ class Projection(common.Projection, ContextMixin):
 
     def _allocate_out_buffers(self, placements, allocations,
                               machine_controller):
-         # If projection has no current input cluster, skip
-        if self._current_input_cluster is None:
+        # If projection has no current input cluster or
+        # it's merged into another projection's cluster, skip
+        if not self._owns_current_input_cluster:
             return
 
         logger.info("\tProjection label:%s from population label:%s",
@@ -577,15 +794,19 @@ class Projection(common.Projection, ContextMixin):
                                                          machine_controller)
 
     def _load_verts(self, placements, allocations, machine_controller):
-        # If projection has no current input cluster, skip
-        if self._current_input_cluster is None:
+        # If projection has no current input cluster or
+        # it's merged into another projection's cluster, skip
+        if not self._owns_current_input_cluster:
             return
 
         logger.info("\tProjection label:%s from population label:%s",
                     self.label, self.pre.label)
 
-        # Build direct connection for projection
-        direct_weights = self._build_direct_connection()
+        # Build direct connection for each projection simulated by cluster
+        # and interleave weights in the same way as their sources
+        direct_weights = np.column_stack(
+            [p._build_direct_connection()
+             for p in self._current_input_projections]).ravel()
 
         # Load
         self._current_input_cluster.load(placements, allocations,
@@ -626,6 +847,28 @@ class Projection(common.Projection, ContextMixin):
                 self._connector._directly_connectable and
                 type(self.synapse_type) is self._static_synapse_class)
 
+    @property
+    def _owns_current_input_cluster(self):
+        # Current input clusters are loaded by the
+        # first of the projections they simulate
+        return (self._current_input_cluster is not None and
+                self._current_input_projections[0] is self)
+
+    @property
+    def _current_input_merge_key(self):
+        # Projections can only be merged if pre-synaptic populations
+        # aren't recorded and are the same size as the post-synaptic
+        # population as each post-synaptic neuron gets a source from each
+        if (self.pre.size != self.post.size or
+                any(len(ids) > 0
+                    for ids in itervalues(self.pre.recorder.recorded))):
+            return None
+
+        # Otherwise, they can be merged with other projections whose
+        # pre-synaptic populations have the same cell type and profiling
+        return (type(self.pre.celltype),
+                self.pre.spinnaker_config.num_profile_samples)
+
     @property
     def _weight_range_estimate(self):
         # Extract weight parameters
@@ -1,7 +1,9 @@
 # Import modules
 import itertools
 import logging
+import math
 import numpy as np
+import quantities as pq
 from pyNN import recording
 
 # Import classes
@@ -20,6 +22,11 @@ logger = logging.getLogger("pynn_spinnaker")
 class Recorder(recording.Recorder, ContextMixin):
     _simulator = simulator
 
+    # Lightweight variables, derived from spikes, which can be recorded
+    # from any population that can record spikes but which summarise
+    # activity rather than fitting into Neo segments so are read directly
+    summary_variables = ("spike_count", "population_rate")
+
     def __init__(self, population, file=None):
         # Superclass
         super(Recorder, self).__init__(population, file)
@@ -49,47 +56,104 @@ class Recorder(recording.Recorder, ContextMixin):
             # Set this bit in indices
             indices[new_index] = True
 
-    def _get_current_segment(self, filter_ids=None,
-                             variables='all', clear=False):
+    @ContextMixin.use_contextual_arguments()
+    def _get_current_segment(self, filter_ids=None, variables='all',
+                             clear=False, time_window=None):
         logger.info("Downloading recorded data for population %s",
                     self.population.label)
 
-        vars_to_read = set(self.recorded.keys())
+        # Summary variables and signals aggregated
+        # across neurons are not included in segments
+        aggregate =\
+            self.population.spinnaker_config.analogue_recording_aggregate
+        vars_to_read = set(v for v in self.recorded.keys()
+                           if v not in self.summary_variables and
+                           not aggregate.get(v, False))
         if variables is not "all":
             vars_to_read = vars_to_read.intersection(set(variables))
 
-        # Read desired spike times and signals from population
-        spike_times, signals = self.population._read_recorded_vars(vars_to_read)
+        # If ids are specified, convert them to
+        # indices so only these neurons are read
+        indices = None
+        if filter_ids is not None:
+            indices = self.population.id_to_index(
+                np.asarray(list(filter_ids), dtype=int))
+
+        # If a time window is specified, convert it to a window of ticks
+        # **NOTE** the start is rounded down to a sample boundary so
+        # recorded signals start at the same time as the segment
+        tick_window = None
+        recording_start_time = self._recording_start_time
+        if time_window is not None:
+            dt = self._simulator.state.dt
+            sample_ticks = int(round(self.sampling_interval / dt))
+            start_tick = int(math.floor(float(time_window[0]) /
+                                        self.sampling_interval)) * sample_ticks
+            stop_tick = int(math.ceil(float(time_window[1]) / dt))
+            tick_window = (max(0, start_tick), stop_tick)
+
+            logger.info("\tReading ticks [%u, %u)", *tick_window)
+
+            # Start segment at start of window
+            self._recording_start_time = max(
+                recording_start_time, tick_window[0] * dt * pq.ms)
+
+        # Read desired spikes and signals from population
+        spikes, signals = self.population._read_recorded_vars(
+            vars_to_read, indices, tick_window)
 
         # Create context containing data read
         # from spinnaker and call superclass
-        with self.get_new_context(spike_times=spike_times, signals=signals):
-            return super(Recorder, self)._get_current_segment(filter_ids,
-                                                              variables, clear)
+        try:
+            with self.get_new_context(spikes=spikes, signals=signals):
+                return super(Recorder, self)._get_current_segment(
+                    filter_ids, vars_to_read, clear)
+        finally:
+            self._recording_start_time = recording_start_time
 
     @ContextMixin.use_contextual_arguments()
-    def _get_spiketimes(self, id, spike_times, signals):
+    def _get_spiketimes(self, id, spikes, signals):
         # Convert id to index
         index = self.population.id_to_index(id)
 
-        # Return the numpy array of spike times associated with this index
-        return spike_times[index]
+        # Spikes are sorted by index so find range associated
+        # with this index and return the corresponding spike times
+        spike_indices, spike_times = spikes
+        start, stop = np.searchsorted(spike_indices, [index, index + 1])
+        return spike_times[start:stop]
 
     @ContextMixin.use_contextual_arguments()
-    def _get_all_signals(self, variable, ids, spike_times,
+    def _get_all_signals(self, variable, ids, spikes,
                          signals, clear=False):
-        # Stack together signals for this variable from all ids
-        signal = signals[variable]
-        return np.vstack((signal[self.population.id_to_index(id)]
-                          for id in ids)).T
-
-    def _localpass_count(self, variable, filter_ids=None):
-        N = {}
-        if variable == "spikes":
-            raise NotImplementedError("Not implemented")
+        # Get sorted indices of recorded neurons
+        # and (time x neuron) array of their signals
+        signal_indices, signal = signals[variable]
+
+        # If there are no ids, return empty array
+        if len(ids) == 0:
+            return signal[:, :0]
+
+        # Convert ids to indices and select the corresponding columns
+        indices = self.population.id_to_index(np.asarray(ids, dtype=int))
+        return signal[:, np.searchsorted(signal_indices, indices)]
+
+    def _local_count(self, variable, filter_ids=None):
+        # If spike counts are recorded, read them directly
+        if self.recorded.get("spike_count"):
+            ids = self.filter_recorded("spike_count", filter_ids)
+            indices, counts = self.population._read_recorded_spike_counts()
+        # Otherwise, count the recorded spikes of each neuron
         else:
-            raise Exception("Only implemented for spikes")
-        return N
+            ids = self.filter_recorded(variable, filter_ids)
+            spike_indices = self.population._read_recorded_vars(
+                ["spikes"])[0][0]
+            indices, counts = np.unique(spike_indices, return_counts=True)
+
+        # Build dictionary mapping ids to counts,
+        # including those of neurons which never spiked
+        counts = dict(zip(indices, counts))
+        return {id: int(counts.get(self.population.id_to_index(id), 0))
+                for id in ids}
 
     def _clear_simulator(self):
         pass
@@ -4,20 +4,18 @@ import logging
 import math
 import numpy as np
 import time
-from rig import machine
+import warnings
 
 # Import classes
 from collections import defaultdict
 from pyNN import common
 from rig.bitfield import BitField
-from rig.machine_control.consts import AppState, signal_types, AppSignal, MessageType
-from rig.machine_control.machine_controller import MachineController
-from rig.place_and_route.machine import Cores
-from rig.place_and_route.constraints import SameChipConstraint
+from spinnaker.bulk_read import BulkReader
+from spinnaker.matrix_cache import SynapticMatrixCache
+from spinnaker.recording_drain import RecordingDrain
+from spinnaker.spike_injection import SpikeInjectionSender
 
 # Import functions
-from rig.place_and_route import place_and_route_wrapper
-from rig.place_and_route.utils import build_application_map
 from six import iteritems, itervalues
 
 logger = logging.getLogger("pynn_spinnaker")
@@ -35,6 +33,40 @@ class ID(int, common.IDMixin):
         common.IDMixin.__init__(self)
 
 
+# ----------------------------------------------------------------------------
+# IDArray
+# ----------------------------------------------------------------------------
+class IDArray(np.ndarray):
+    """Array of the integer IDs of cells belonging to a population. These
+    are only materialised as :py:class:`ID` objects when they are accessed
+    individually, for example by indexing or iterating.
+    """
+    def __new__(cls, first_id, size, parent):
+        ids = np.arange(first_id, first_id + size).view(cls)
+        ids.parent = parent
+        return ids
+
+    def __array_finalize__(self, obj):
+        # Slices and views of ids belong to the same population
+        self.parent = getattr(obj, "parent", None)
+
+    def __array_wrap__(self, out_arr, context=None):
+        # Results of arithmetic, reductions etc are integers rather than ids
+        out_arr = out_arr.view(np.ndarray)
+        return out_arr[()] if out_arr.ndim == 0 else out_arr
+
+    def __getitem__(self, index):
+        # If item is an array of ids, return it directly
+        item = super(IDArray, self).__getitem__(index)
+        if isinstance(item, np.ndarray):
+            return item
+        # Otherwise, materialise ID object belonging to population
+        else:
+            id = ID(item)
+            id.parent = self.parent
+            return id
+
+
 # ----------------------------------------------------------------------------
 # State
 # ----------------------------------------------------------------------------
@@ -47,6 +79,7 @@ class State(common.control.BaseState):
     def __init__(self):
         common.control.BaseState.__init__(self)
         self.machine_controller = None
+        self.bulk_reader = None
         self.spalloc_job = None
         self.system_info = None
         self.dt = 0.1
@@ -103,6 +136,7 @@ class State(common.control.BaseState):
             logger.info("Stopping SpiNNaker application")
             self.machine_controller.send_signal("stop")
             self.machine_controller = None
+            self.bulk_reader = None
 
         # Destroy spalloc job if we have one
         if self.spalloc_job is not None:
@@ -113,6 +147,8 @@ class State(common.control.BaseState):
     def _wait_for_transition(self, placements, allocations,
                              from_state, to_state,
                              num_verts, timeout=5.0):
+        from rig.place_and_route import Cores
+
         while True:
             # If no cores are still in from_state, stop
             if self.machine_controller.count_cores_in_state(from_state) == 0:
@@ -128,7 +164,7 @@ class State(common.control.BaseState):
         if cores_in_to_state != num_verts:
             # Loop through all placed vertices
             for vertex, (x, y) in iteritems(placements):
-                p = allocations[vertex][machine.Cores].start
+                p = allocations[vertex][Cores].start
                 status = self.machine_controller.get_processor_status(p, x, y)
                 if status.cpu_state is not to_state:
                     print("Core ({}, {}, {}) in state {!s}".format(
@@ -149,6 +185,8 @@ class State(common.control.BaseState):
             pop._estimate_constraints(hardware_timestep_us)
 
     def _constrain_clusters(self):
+        from rig.place_and_route.constraints import SameChipConstraint
+
         logger.info("Constraining vertex clusters to same chip")
 
         # Loop through populations
@@ -206,6 +244,83 @@ class State(common.control.BaseState):
 
         return constraints
 
+    def _start_recording_drain(self, hardware_timestep_us):
+        # Get recordings which need draining while simulation is
+        # running from neural clusters and current input clusters
+        recordings = []
+        for pop in self.populations:
+            if pop._neural_cluster is not None:
+                recordings.extend(
+                    pop._neural_cluster.get_streamed_recordings())
+        for c in itertools.chain.from_iterable(
+                itervalues(self.post_pop_current_input_clusters)):
+            recordings.extend(c.get_streamed_recordings())
+
+        # If there are none, no drain is required
+        if len(recordings) == 0:
+            return None
+
+        # Drain often enough that the smallest buffer
+        # is drained when it is, at most, half full
+        min_buffer_ticks = min(r.buffer_ticks for r, _, _ in recordings)
+        interval = (min_buffer_ticks * hardware_timestep_us) / 2000000.0
+        logger.info("Draining %u recording buffers every %fs",
+                    len(recordings), interval)
+
+        # Create and start drain thread
+        drain = RecordingDrain(recordings, interval)
+        drain.start()
+        return drain
+
+    def _start_spike_injection(self, placements, allocations,
+                               hardware_timestep_us, duration_timesteps):
+        # Get the vertices of populations which receive injected spikes
+        targets = [pop._get_spike_injection_target(placements, allocations)
+                   for pop in self.populations
+                   if pop._spike_injection_queue is not None]
+
+        # If there are none, no sender is required
+        if len(targets) == 0:
+            return None
+
+        # Convert lookahead time into timesteps
+        lookahead_ticks = int(math.ceil(float(self.injection_lookahead_ms) /
+                                        float(self.dt)))
+        logger.info("Injecting spikes into %u populations %u ticks ahead",
+                    len(targets), lookahead_ticks)
+
+        # Create and start sender thread
+        sender = SpikeInjectionSender(
+            self.machine_controller.initial_host, targets,
+            hardware_timestep_us / 1000000.0, duration_timesteps,
+            lookahead_ticks, self.injection_max_packets_per_second)
+        sender.start()
+        return sender
+
+    def _prefetch_readback(self):
+        # If bulk readback is disabled, data will be read on demand
+        if self.bulk_reader is None:
+            return
+
+        logger.info("Prefetching profiles and statistics")
+
+        # Get requests to prefetch regions that are read back after
+        # simulation from all neural, synapse and current input clusters
+        # **NOTE** recording regions are prefetched when they are read so
+        # only the vertices and ticks which are requested get transferred
+        requests = []
+        for pop in self.populations:
+            if pop._neural_cluster is not None:
+                requests.extend(pop._neural_cluster.get_readback_requests())
+            for c in itervalues(pop._synapse_clusters):
+                requests.extend(c.get_readback_requests())
+        for c in itertools.chain.from_iterable(
+                itervalues(self.post_pop_current_input_clusters)):
+            requests.extend(c.get_readback_requests())
+
+        # Read them all at once
+        self.bulk_reader.read(requests)
+
     def _read_stats(self, duration_ms):
         logger.info("Reading stats")
 
@@ -234,6 +349,21 @@ class State(common.control.BaseState):
                 logger.info("\t\t\tTimer event overruns:%u",
                                 np.sum(stats["timer_event_overflows"]))
 
+            # Loop through recorded variables which have been drained
+            for var, stats in iteritems(pop.get_recording_statistics()):
+                if stats["samples_drained"] == 0 and stats["overflows"] == 0:
+                    continue
+
+                logger.info("\t\tRecording %s", var)
+                logger.info("\t\t\tSamples drained:%u, Max buffer occupancy:%u",
+                            stats["samples_drained"], stats["max_occupancy"])
+
+                # Warn if buffers overflowed
+                if stats["overflows"] > 0:
+                    logger.warn("%u samples of %s recorded by population %s "
+                                "were dropped as recording buffers were full",
+                                stats["overflows"], var, pop.label)
+
             # If population has a neural cluster
             if pop._neural_cluster is not None:
                 neural_stats = pop.get_neural_statistics()
@@ -244,6 +374,14 @@ class State(common.control.BaseState):
                                 np.sum(neural_stats["timer_event_overflows"]))
 
     def _build(self, duration_ms):
+        # **NOTE** Rig's machine control and place-and-route modules are
+        # slow to import so they are only imported when a simulation is built
+        from rig.machine_control.consts import AppState
+        from rig.machine_control.machine_controller import (MachineController,
+                                                            TruncationWarning)
+        from rig.place_and_route import Cores, place_and_route_wrapper
+        from rig.place_and_route.utils import build_application_map
+
         # Convert dt into microseconds and divide by
         # realtime proportion to get hardware timestep
         hardware_timestep_us = int(round((1000.0 * float(self.dt)) /
@@ -291,16 +429,19 @@ class State(common.control.BaseState):
                                        vertex_resources)
 
         logger.info("Allocating current input clusters")
-        for proj in self.projections:
-            # Create cluster
-            c = proj._create_current_input_cluster(
-                hardware_timestep_us, duration_timesteps,
-                vertex_load_applications, vertex_run_applications,
-                vertex_resources)
-
-            # Add cluster to data structures
-            if c is not None:
-                self.post_pop_current_input_clusters[proj.post].append(c)
+        for pop in self.populations:
+            # Loop through groups of directly connectable
+            # projections which should share a current input cluster
+            for group in pop._direct_projection_groups:
+                # Create cluster, using first projection
+                # in group to simulate all of them
+                c = group[0]._create_current_input_cluster(
+                    group[1:], hardware_timestep_us, duration_timesteps,
+                    vertex_load_applications, vertex_run_applications,
+                    vertex_resources)
+
+                # Add cluster to data structures
+                self.post_pop_current_input_clusters[pop].append(c)
 
         # Constrain all vertices in clusters to same chip
         constraints = self._constrain_clusters()
@@ -361,6 +502,9 @@ class State(common.control.BaseState):
             else:
                 hostname = self.spinnaker_hostname
 
+            # Convert Rig TruncationWarnings to errors
+            warnings.simplefilter("error", TruncationWarning)
+
             # Get machine controller from connected SpiNNaker board and boot
             self.machine_controller = MachineController(hostname)
             self.machine_controller.boot()
@@ -369,6 +513,11 @@ class State(common.control.BaseState):
             self.system_info = self.machine_controller.get_system_info()
             logger.debug("Found %u chip machine", len(self.system_info))
 
+            # If required, create bulk reader to read data back from machine
+            if self.bulk_readback:
+                self.bulk_reader = BulkReader(self.machine_controller,
+                                              self.readback_threads)
+
         # Place-and-route
         logger.info("Placing and routing")
         placements, allocations, run_app_map, routing_tables =\
@@ -409,11 +558,19 @@ class State(common.control.BaseState):
         for proj in self.projections:
             proj._load_verts(placements, allocations, self.machine_controller)
 
+        # If a directory has been specified, create
+        # cache for synaptic matrices generated on host
+        matrix_cache = None
+        if self.synaptic_matrix_cache_dir is not None:
+            matrix_cache = SynapticMatrixCache(
+                self.synaptic_matrix_cache_dir,
+                self.synaptic_matrix_cache_max_bytes)
+
         logger.info("Loading population vertices")
         flush_mask = keyspace.get_mask(field="flush")
         for pop in self.populations:
             pop._load_verts(placements, allocations,
-                            self.machine_controller, flush_mask)
+                            self.machine_controller, flush_mask, matrix_cache)
 
         # Load routing tables and applications
         logger.info("Loading routing tables")
@@ -452,9 +609,23 @@ class State(common.control.BaseState):
         # Sync!
         self.machine_controller.send_signal("sync0")
 
+        # Start injecting spikes and draining recording buffers if required
+        injection = self._start_spike_injection(
+            placements, allocations, hardware_timestep_us, duration_timesteps)
+        drain = self._start_recording_drain(hardware_timestep_us)
+
         # Wait for simulation to complete
         logger.info("Simulating")
-        time.sleep(float(duration_ms) / 1000.0)
+        try:
+            time.sleep(float(duration_ms) / 1000.0)
+        finally:
+            # Stop injection
+            if injection is not None:
+                injection.stop()
+
+            # Stop drain before anything else uses the machine controller
+            if drain is not None:
+                drain.stop()
 
         # Wait for all cores to exit
         logger.info("Waiting for exit")
@@ -462,5 +633,12 @@ class State(common.control.BaseState):
                                   AppState.run, AppState.exit,
                                   num_verts)
 
+        # Drain samples remaining in recording buffers
+        if drain is not None:
+            drain.drain(running=False)
+
+        # Prefetch data which is read back after simulation
+        self._prefetch_readback()
+
         self._read_stats(duration_ms)
 state = State()
@@ -0,0 +1,297 @@
+# Import modules
+import logging
+import os
+import time
+
+# Import classes
+from collections import defaultdict
+from multiprocessing.pool import ThreadPool
+
+# Import functions
+from six import iteritems, itervalues
+
+logger = logging.getLogger("pynn_spinnaker")
+
+
+# ----------------------------------------------------------------------------
+# CachedMemoryIO
+# ----------------------------------------------------------------------------
+class CachedMemoryIO(object):
+    """File-like wrapper around a view of SpiNNaker memory which serves reads
+    from chunks of data prefetched by :py:class:`BulkReader`. Reads not
+    covered by a prefetched chunk fall back to reading the memory itself and
+    writes are passed through to it so the cache never goes stale.
+    """
+    def __init__(self, memory):
+        self.memory = memory
+
+        # List of (offset, data) tuples of prefetched chunks
+        self._chunks = []
+
+        # Current offset from start of memory
+        self._offset = 0
+
+    def __len__(self):
+        return len(self.memory)
+
+    # --------------------------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------------------------
+    def add_chunk(self, offset, data):
+        """Add a chunk of data prefetched from `offset` bytes into memory."""
+        self._chunks.append((offset, data))
+
+    def covers(self, offset, length):
+        """Is the range of `length` bytes from `offset`
+        bytes into memory within a prefetched chunk?"""
+        return any(chunk_start <= offset and
+                   (offset + length) <= chunk_start + len(chunk_data)
+                   for chunk_start, chunk_data in self._chunks)
+
+    def read(self, n_bytes=-1):
+        # Clip read to the end of memory
+        if n_bytes < 0 or (self._offset + n_bytes) > len(self):
+            n_bytes = max(0, len(self) - self._offset)
+
+        # If the read falls entirely within a prefetched chunk, slice it out
+        start = self._offset
+        stop = start + n_bytes
+        for chunk_start, chunk_data in self._chunks:
+            if chunk_start <= start and stop <= chunk_start + len(chunk_data):
+                self._offset = stop
+                return chunk_data[start - chunk_start:stop - chunk_start]
+
+        # Otherwise, read from memory
+        self.memory.seek(start)
+        data = self.memory.read(n_bytes)
+        self._offset += len(data)
+        return data
+
+    def write(self, data):
+        # Write data through to memory
+        start = self._offset
+        self.memory.seek(start)
+        n_bytes = self.memory.write(data)
+        stop = start + n_bytes
+
+        # Update any prefetched chunks which overlap the write
+        for i, (chunk_start, chunk_data) in enumerate(self._chunks):
+            chunk_stop = chunk_start + len(chunk_data)
+            if start < chunk_stop and chunk_start < stop:
+                overlap_start = max(start, chunk_start)
+                overlap_stop = min(stop, chunk_stop)
+                self._chunks[i] = (
+                    chunk_start,
+                    chunk_data[:overlap_start - chunk_start] +
+                    data[overlap_start - start:overlap_stop - start] +
+                    chunk_data[overlap_stop - chunk_start:])
+
+        self._offset = stop
+        return n_bytes
+
+    def tell(self):
+        return self._offset
+
+    def seek(self, n_bytes, from_what=os.SEEK_SET):
+        if from_what == os.SEEK_SET:
+            self._offset = n_bytes
+        elif from_what == os.SEEK_CUR:
+            self._offset += n_bytes
+        elif from_what == os.SEEK_END:
+            self._offset = len(self) + n_bytes
+        else:
+            raise ValueError("from_what: can only take values 0 (SEEK_SET), "
+                             "1 (SEEK_CUR), or 2 (SEEK_END) not %s" % from_what)
+
+    def flush(self):
+        self.memory.flush()
+
+    # --------------------------------------------------------------------------
+    # Public properties
+    # --------------------------------------------------------------------------
+    @property
+    def chip(self):
+        """Co-ordinates of the chip whose memory this is."""
+        # **YUCK** rig doesn't expose this publicly
+        return (self.memory._parent._x, self.memory._parent._y)
+
+    @property
+    def address(self):
+        """Address in memory of the start of this view."""
+        # **YUCK** rig doesn't expose this publicly
+        return self.memory._start_address
+
+
+# ----------------------------------------------------------------------------
+# BulkReader
+# ----------------------------------------------------------------------------
+class BulkReader(object):
+    """Prefetches many ranges of SpiNNaker memory at once.
+
+    Ranges on the same chip which are adjacent (or separated by fewer than
+    `max_gap` bytes) are coalesced into a single read. The reads for chips
+    connected to the host through different Ethernet connections are then
+    issued concurrently by a pool of worker threads, reads sharing a
+    connection being issued one after another by the same worker.
+    """
+    def __init__(self, machine_controller, num_threads=None, max_gap=256):
+        self.machine_controller = machine_controller
+        self.num_threads = num_threads
+        self.max_gap = max_gap
+
+    # --------------------------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------------------------
+    def read(self, requests):
+        """Prefetch ranges of memory.
+
+        Parameters
+        ----------
+        requests : list
+            List of (:py:class:`CachedMemoryIO`, offset, length) tuples
+            specifying a range of bytes to prefetch into each memory.
+        """
+        # Remove empty requests
+        requests = [r for r in requests if r[2] > 0]
+        if len(requests) == 0:
+            return
+
+        start_time = time.time()
+
+        # Group requests by chip and, within each chip,
+        # sort them by the address they start at
+        chip_requests = defaultdict(list)
+        for memory, offset, length in requests:
+            chip_requests[memory.chip].append(
+                (memory.address + offset, memory, offset, length))
+        for r in itervalues(chip_requests):
+            r.sort(key=lambda r: r[0])
+
+        # Coalesce each chip's requests into spans of memory and group
+        # spans by the connection through which they will be read
+        # **YUCK** rig doesn't expose which connection it uses publicly
+        connection_spans = defaultdict(list)
+        for chip, r in iteritems(chip_requests):
+            connection = self.machine_controller._get_connection(*chip)
+            connection_spans[id(connection)].extend(
+                self._coalesce(chip, r))
+
+        # Read spans associated with each connection concurrently
+        num_threads = len(connection_spans)
+        if self.num_threads is not None:
+            num_threads = min(num_threads, self.num_threads)
+        pool = ThreadPool(num_threads)
+        try:
+            pool.map(self._read_spans, list(itervalues(connection_spans)))
+        finally:
+            pool.close()
+            pool.join()
+
+        num_spans = sum(len(s) for s in itervalues(connection_spans))
+        logger.info("\tPrefetched %u ranges of memory from %u chips in %u "
+                    "reads using %u threads in %fs", len(requests),
+                    len(chip_requests), num_spans, num_threads,
+                    time.time() - start_time)
+
+    # --------------------------------------------------------------------------
+    # Private methods
+    # --------------------------------------------------------------------------
+    def _coalesce(self, chip, requests):
+        # Loop through requests, sorted by address
+        spans = []
+        for address, memory, offset, length in requests:
+            # If this request starts close enough to the end
+            # of the previous span, extend span to cover it
+            if (len(spans) > 0 and
+                    address <= (spans[-1][1] + spans[-1][2] + self.max_gap)):
+                span_end = max(spans[-1][1] + spans[-1][2], address + length)
+                spans[-1][2] = span_end - spans[-1][1]
+                spans[-1][3].append((address, memory, offset, length))
+            # Otherwise, start a new span
+            else:
+                spans.append([chip, address, length,
+                              [(address, memory, offset, length)]])
+
+        return spans
+
+    def _read_spans(self, spans):
+        # Loop through spans
+        for (x, y), address, length, span_requests in spans:
+            # Read span
+            data = self.machine_controller.read(address, length, x, y)
+
+            # Add the part of the span covered by
+            # each request to the request's memory
+            for r_address, memory, offset, r_length in span_requests:
+                r_start = r_address - address
+                memory.add_chunk(offset, data[r_start:r_start + r_length])
+
+
+# ----------------------------------------------------------------------------
+# Functions
+# ----------------------------------------------------------------------------
+def cache_region_memory(verts, region_indices):
+    """Wrap the memory of regions of vertices in :py:class:`CachedMemoryIO`
+    objects so they can be prefetched in their entirety. Regions which have
+    already been prefetched are skipped.
+
+    Parameters
+    ----------
+    verts : iterable
+        Vertices whose region memory should be wrapped.
+    region_indices : iterable
+        Indices of regions to wrap.
+
+    Returns
+    -------
+    list
+        List of requests to pass to :py:meth:`BulkReader.read`.
+    """
+    requests = []
+    for v in verts:
+        for r in region_indices:
+            # Wrap memory unless this has already been done
+            memory = v.region_memory[r]
+            if not isinstance(memory, CachedMemoryIO):
+                memory = CachedMemoryIO(memory)
+                v.region_memory[r] = memory
+
+            # If region hasn't already been prefetched, add request
+            if not memory.covers(0, len(memory)):
+                requests.append((memory, 0, len(memory)))
+
+    return requests
+
+
+def prefetch_recording(bulk_reader, verts, region_index, region,
+                       tick_window=None):
+    """If the entire contents of a recording region are going to be read
+    from vertices, prefetch the region memory of all of them at once.
+
+    Parameters
+    ----------
+    bulk_reader : :py:class:`BulkReader` or None
+        Bulk reader to prefetch with or None if data should be read on demand.
+    verts : iterable
+        Vertices whose recordings are going to be read.
+    region_index : int
+        Index of recording region.
+    region : :py:class:`~rig_cpp_common.regions.Region`
+        Recording region.
+    tick_window : (int, int) or None
+        Window of ticks which is going to be read, if any.
+    """
+    # If recordings are read on demand, there's nothing to do
+    if bulk_reader is None:
+        return
+
+    # If only a window of ticks is going to be read, only the slots within
+    # it are read from memory so prefetching entire regions would be wasteful
+    if tick_window is not None:
+        return
+
+    # Likewise, samples in streamed regions have already been drained
+    if getattr(region, "streaming", False):
+        return
+
+    bulk_reader.read(cache_region_memory(verts, [region_index]))
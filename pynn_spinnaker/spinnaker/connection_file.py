@@ -0,0 +1,125 @@
+# Import modules
+import itertools
+import logging
+import numpy as np
+import os
+
+logger = logging.getLogger("pynn_spinnaker")
+
+
+# ----------------------------------------------------------------------------
+# Functions
+# ----------------------------------------------------------------------------
+def _read_text_chunks(filename, chunk_lines):
+    # Open text file and loop through chunks of lines
+    with open(filename, "r") as f:
+        while True:
+            lines = list(itertools.islice(f, chunk_lines))
+            if len(lines) == 0:
+                break
+
+            # Strip out comments and blank lines
+            lines = [l for l in lines
+                     if len(l.strip()) > 0 and not l.startswith("#")]
+
+            # If any lines remain, parse them
+            if len(lines) > 0:
+                yield np.loadtxt(lines, ndmin=2)
+
+
+def convert_text_connection_file(text_filename, binary_filename,
+                                 chunk_lines=1000000):
+    """Convert a PyNN text connection file into a memory-mappable
+    binary connection file.
+
+    The binary file is a .npy file containing a column-major array with
+    a row for each connection and the same columns as the text file. The
+    rows are grouped by post-synaptic index so all of the connections
+    to a slice of post-synaptic neurons are contiguous. A counting sort
+    is used so only `chunk_lines` connections are in memory at once.
+
+    Parameters
+    ----------
+    text_filename : str
+        Filename of text connection file.
+    binary_filename : str
+        Filename to write binary connection file to.
+    chunk_lines : int
+        Number of lines of text connection file to read at once.
+    """
+    logger.info("Converting connection file %s to %s",
+                text_filename, binary_filename)
+
+    # First pass - count connections to each post-synaptic neuron
+    post_counts = np.zeros(0, dtype=np.int64)
+    num_columns = None
+    for chunk in _read_text_chunks(text_filename, chunk_lines):
+        num_columns = chunk.shape[1]
+
+        # Add counts of this chunk's connections, growing count array
+        chunk_counts = np.bincount(chunk[:, 1].astype(np.int64),
+                                   minlength=len(post_counts))
+        chunk_counts[:len(post_counts)] += post_counts
+        post_counts = chunk_counts
+
+    # Calculate where the connections to each post-synaptic
+    # neuron start in the grouped connection array
+    num_connections = post_counts.sum()
+    next_row = np.hstack(([0], np.cumsum(post_counts)[:-1]))
+
+    # Create temporary memory-mapped file to write into
+    temp_filename = binary_filename + ".tmp"
+    connections = np.lib.format.open_memmap(
+        temp_filename, mode="w+", dtype=np.float64,
+        shape=(num_connections, num_columns or 2), fortran_order=True)
+
+    # Second pass - scatter connections into their groups
+    for chunk in _read_text_chunks(text_filename, chunk_lines):
+        # Sort chunk by post-synaptic index
+        post_indices = chunk[:, 1].astype(np.int64)
+        order = np.argsort(post_indices, kind="mergesort")
+        post_indices = post_indices[order]
+
+        # Calculate rank of each connection within its group in this chunk
+        rank = (np.arange(len(post_indices)) -
+                np.searchsorted(post_indices, post_indices, side="left"))
+
+        # Write connections to next free rows of their group
+        connections[next_row[post_indices] + rank, :] = chunk[order]
+
+        # Advance next free row of each group
+        next_row += np.bincount(post_indices, minlength=len(next_row))
+
+    # Flush and close memory-mapped file before renaming it into place
+    connections.flush()
+    del connections
+    os.rename(temp_filename, binary_filename)
+
+
+def load_binary_connection_file(filename, chunk_rows=1000000):
+    """Memory-map a binary connection file.
+
+    Parameters
+    ----------
+    filename : str
+        Filename of .npy connection file with a row for each connection
+        grouped by post-synaptic index (column 1).
+    chunk_rows : int
+        Number of rows to check at once when validating the grouping.
+
+    Returns
+    -------
+    :py:class:`numpy.memmap`
+        Read-only, memory-mapped connection array.
+    """
+    connections = np.load(filename, mmap_mode="r")
+
+    # Check, chunk by chunk, that connections are sorted by post index
+    post_indices = connections[:, 1]
+    for start in range(0, len(connections), chunk_rows):
+        chunk = post_indices[start:start + chunk_rows + 1]
+        if np.any(chunk[1:] < chunk[:-1]):
+            raise ValueError("Binary connection file %s is not sorted by "
+                             "post-synaptic index" % filename)
+
+    return connections
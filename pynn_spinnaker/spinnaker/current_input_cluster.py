@@ -1,16 +1,17 @@
 # Import modules
 import enum
 import logging
+import numpy as np
 import regions
-from rig import machine
 
 # Import classes
 from collections import defaultdict
 from rig_cpp_common.utils import Args
 from rig_cpp_common.regions import Profiler, System
-from utils import InputVertex
+from utils import InputVertex, UnitStrideSlice
 
 # Import functions
+from bulk_read import cache_region_memory, prefetch_recording
 from rig_cpp_common.utils import load_regions
 from six import iteritems
 from utils import get_model_executable_filename, split_slice
@@ -29,6 +30,8 @@ class Regions(enum.IntEnum):
     output_weight = 3
     spike_recording = 4
     profiler = 5
+    spike_count_recording = 6
+    population_rate_recording = 7
 
 
 # ------------------------------------------------------------------------------
@@ -41,19 +44,37 @@ class CurrentInputCluster(object):
     }
 
     def __init__(self, cell_type, parameters, initial_values, sim_timestep_ms,
-                 timer_period_us, sim_ticks, indices_to_record, config,
+                 timer_period_us, sim_ticks, record_sample_interval,
+                 indices_to_record, config,
                  receptor_index, vertex_load_applications,
                  vertex_run_applications, vertex_resources,
-                 post_synaptic_width, pop_size):
+                 post_synaptic_width, pop_size, sources_per_output=1):
+        from rig.place_and_route import Cores, SDRAM
+
+        # If several projections are merged into this cluster, each
+        # post-synaptic neuron has multiple sources which are interleaved so
+        # those of a neuron are adjacent and can be sliced alongside it
+        # **NOTE** parameters and recording indices are per-source
+        self.sources_per_output = sources_per_output
+
         # Create standard regions
         self.regions = {}
         self.regions[Regions.system] = System(timer_period_us, sim_ticks)
         self.regions[Regions.neuron] = cell_type._neuron_region_class(
-            cell_type, parameters, initial_values, sim_timestep_ms, pop_size)
+            cell_type, parameters, initial_values, sim_timestep_ms,
+            pop_size * sources_per_output)
         self.regions[Regions.output_buffer] = regions.OutputBuffer()
         self.regions[Regions.output_weight] = regions.OutputWeight()
         self.regions[Regions.spike_recording] = regions.SpikeRecording(
-            indices_to_record, sim_timestep_ms, sim_ticks)
+            indices_to_record, sim_timestep_ms, sim_ticks,
+            config.recording_buffer_time, config.spike_recording_format,
+            config.mean_firing_rate)
+        self.regions[Regions.spike_count_recording] =\
+            regions.SpikeCountRecording(indices_to_record)
+        self.regions[Regions.population_rate_recording] =\
+            regions.PopulationRateRecording(
+                indices_to_record, record_sample_interval, sim_timestep_ms,
+                sim_ticks, config.recording_buffer_time)
 
         # Add profiler region if required
         if config.num_profile_samples is not None:
@@ -86,13 +107,15 @@ class CurrentInputCluster(object):
             vertex_run_applications[input_vert] = current_input_app
 
             # Add resources to dictionary
-            vertex_resources[input_vert] = {machine.Cores: 1, machine.SDRAM: sdram}
+            vertex_resources[input_vert] = {Cores: 1, SDRAM: sdram}
 
     # --------------------------------------------------------------------------
     # Public methods
     # --------------------------------------------------------------------------
     def allocate_out_buffers(self, placements, allocations,
                              machine_controller):
+        from rig.place_and_route import Cores
+
         # Loop through synapse verts
         for v in self.verts:
             # Get placement and allocation
@@ -100,7 +123,7 @@ class CurrentInputCluster(object):
             vertex_allocation = allocations[v]
 
             # Get core this vertex should be run on
-            core = vertex_allocation[machine.Cores]
+            core = vertex_allocation[Cores]
             assert (core.stop - core.start) == 1
 
             logger.debug("\t\tVertex %s (%u, %u, %u)",
@@ -119,6 +142,8 @@ class CurrentInputCluster(object):
 
     def load(self, placements, allocations, machine_controller,
              direct_weights):
+        from rig.place_and_route import Cores
+
         # Loop through synapse verts
         for v in self.verts:
             # Use native S16.15 format
@@ -129,7 +154,7 @@ class CurrentInputCluster(object):
             vertex_allocation = allocations[v]
 
             # Get core this vertex should be run on
-            core = vertex_allocation[machine.Cores]
+            core = vertex_allocation[Cores]
             assert (core.stop - core.start) == 1
 
             logger.debug("\t\tVertex %s (%u, %u, %u)",
@@ -148,16 +173,95 @@ class CurrentInputCluster(object):
                                                machine_controller, core,
                                                logger)
 
-    def read_recorded_spikes(self):
-        # Loop through all current input vertices
-        # and read spike times into dictionary
-        spike_times = {}
+    def read_recorded_spikes(self, indices=None, tick_window=None,
+                             bulk_reader=None):
+        # Get current input vertices containing requested indices in
+        # order and, if required, prefetch their spike recording regions
         region = self.regions[Regions.spike_recording]
-        for v in self.verts:
-            region_mem = v.region_memory[Regions.spike_recording]
-            spike_times.update(region.read_spike_times(v.post_neuron_slice,
-                                                       region_mem))
-        return spike_times
+        verts = self._get_sorted_verts(indices)
+        prefetch_recording(bulk_reader, verts, Regions.spike_recording,
+                           region, tick_window)
+
+        # Loop through vertices and read spikes
+        vert_spikes = [
+            region.read_spikes(v.post_neuron_slice,
+                               v.region_memory[Regions.spike_recording],
+                               tick_window)
+            for v in verts]
+
+        # If no vertices were read, return empty arrays
+        if len(vert_spikes) == 0:
+            return (np.empty(0, dtype=int), np.empty(0, dtype=np.float32))
+
+        # Concatenate the indices and times of spikes from each vertex
+        return (np.hstack([s[0] for s in vert_spikes]),
+                np.hstack([s[1] for s in vert_spikes]))
+
+    def read_recorded_spike_counts(self, indices=None, bulk_reader=None):
+        # Get current input vertices containing requested indices in order
+        # and, if required, prefetch their spike count recording regions
+        region = self.regions[Regions.spike_count_recording]
+        verts = self._get_sorted_verts(indices)
+        prefetch_recording(bulk_reader, verts, Regions.spike_count_recording,
+                           region)
+
+        # Loop through vertices and read spike counts
+        vert_counts = [
+            region.read_counts(v.post_neuron_slice,
+                               v.region_memory[Regions.spike_count_recording])
+            for v in verts]
+
+        # If no vertices were read, return empty arrays
+        if len(vert_counts) == 0:
+            return (np.empty(0, dtype=int), np.empty(0, dtype=np.uint32))
+
+        # Concatenate the recorded indices and spike counts from each vertex
+        return (np.hstack([c[0] for c in vert_counts]),
+                np.hstack([c[1] for c in vert_counts]))
+
+    def read_recorded_population_rate(self, tick_window=None,
+                                      bulk_reader=None):
+        # If required, prefetch recording regions of all vertices
+        region = self.regions[Regions.population_rate_recording]
+        prefetch_recording(bulk_reader, self.verts,
+                           Regions.population_rate_recording, region,
+                           tick_window)
+
+        # Combine the spike counts recorded by all vertices into a rate
+        return region.read_rate(
+            [(v.post_neuron_slice,
+              v.region_memory[Regions.population_rate_recording])
+             for v in self.verts], tick_window)
+
+    def get_streamed_recordings(self):
+        # Loop through spike and population rate recording regions
+        streamed = []
+        for r in (Regions.spike_recording, Regions.population_rate_recording):
+            # If region needs draining while simulation is running,
+            # add it to list along with each vertex's memory
+            region = self.regions[r]
+            if region.streaming:
+                streamed.extend((region, v.post_neuron_slice,
+                                 v.region_memory[r])
+                                for v in self.verts)
+
+        return streamed
+
+    def get_readback_requests(self):
+        # Wrap memory of profile region, which is read back
+        # after every simulation, so it can be prefetched
+        # **NOTE** recording regions are only prefetched when they're read
+        return cache_region_memory(
+            self.verts, [r for r in (Regions.profiler,)
+                         if r in self.regions])
+
+    def get_spike_recording_statistics(self):
+        region = self.regions[Regions.spike_recording]
+        return region.get_statistics(v.post_neuron_slice for v in self.verts)
+
+    def get_population_rate_recording_statistics(self):
+        region = self.regions[Regions.population_rate_recording]
+        return region.get_statistics(v.post_neuron_slice for v in self.verts)
 
     def read_profile(self):
         # Get the profile recording region and
@@ -172,10 +276,34 @@ class CurrentInputCluster(object):
     # --------------------------------------------------------------------------
     # Private methods
     # --------------------------------------------------------------------------
-    def _estimate_sdram(self, vertex_slice):
+    def _get_source_slice(self, post_vertex_slice):
+        # Get slice of sources which provide input to post-synaptic slice
+        return UnitStrideSlice(post_vertex_slice.start * self.sources_per_output,
+                               post_vertex_slice.stop * self.sources_per_output)
+
+    def _get_sorted_verts(self, indices):
+        # Sort vertices by the start of their post-neuron slice and,
+        # if indices are specified, remove any which contain none
+        verts = sorted(self.verts, key=lambda v: v.post_neuron_slice.start)
+        if indices is None:
+            return verts
+        else:
+            return [v for v in verts
+                    if v.post_neuron_slice.contains_any(indices)]
+
+    def _estimate_sdram(self, post_vertex_slice):
+        # Get slice of sources
+        vertex_slice = self._get_source_slice(post_vertex_slice)
+
         # Begin with size of spike recording region
         sdram = self.regions[Regions.spike_recording].sizeof(vertex_slice);
 
+        # Add on size of spike count and population rate recording regions
+        sdram += self.regions[Regions.spike_count_recording].sizeof(
+            vertex_slice)
+        sdram += self.regions[Regions.population_rate_recording].sizeof(
+            vertex_slice)
+
         # Add on size of neuron region
         sdram += self.regions[Regions.neuron].sizeof(vertex_slice)
 
@@ -188,15 +316,18 @@ class CurrentInputCluster(object):
     def _get_region_arguments(self, post_vertex_slice, weights, out_buffers):
         region_arguments = defaultdict(Args)
 
-        # Add vertex slice to regions that require it
+        # Add slice of sources to regions that require it
+        source_slice = self._get_source_slice(post_vertex_slice)
         for r in (Regions.neuron,
                   Regions.output_weight,
-                  Regions.spike_recording):
-            region_arguments[r] = Args(post_vertex_slice)
+                  Regions.spike_recording,
+                  Regions.spike_count_recording,
+                  Regions.population_rate_recording):
+            region_arguments[r] = Args(source_slice)
 
         # Add kwargs for regions that require them
         region_arguments[Regions.system].kwargs["application_words"] =\
-            [len(post_vertex_slice)]
+            [len(source_slice), self.sources_per_output]
 
         region_arguments[Regions.output_buffer].kwargs["out_buffers"] =\
             out_buffers
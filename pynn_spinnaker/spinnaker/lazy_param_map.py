@@ -8,7 +8,6 @@ import sentinel
 from utils import LazyArrayFloatToFixConverter
 
 # Import functions
-from copy import deepcopy
 from functools import partial
 from six import callable
 
@@ -54,6 +53,7 @@ def apply(lazy_params, param_map, size, **kwargs):
     param_names = (params.dtype.names
                    if params.dtype.names is not None
                    else (slice(None, None, None),))
+    evaluated_params = {}
     for field_name, param in zip(param_names, param_map):
         # If this map entry has a constant value,
         if len(param) == 2:
@@ -74,11 +74,18 @@ def apply(lazy_params, param_map, size, **kwargs):
         else:
             param_name, _, param_mapping = param
 
-            # Set parameter size
-            lazy_params[param_name].shape = (size,)
+            # If this parameter hasn't already been evaluated for an earlier
+            # field, set its size and evaluate it into a NumPy array
+            # **NOTE** mappings operate on these arrays directly rather than
+            # on copies of the lazy array and the stack of operations within
+            if param_name not in evaluated_params:
+                lazy_params[param_name].shape = (size,)
+                evaluated_params[param_name] =\
+                    lazy_params[param_name].evaluate()
 
-            # Apply lazy transformation and evaluate
-            params[field_name] = param_mapping(lazy_params[param_name], **kwargs).evaluate()
+            # Apply transformation and evaluate
+            params[field_name] = param_mapping(evaluated_params[param_name],
+                                               **kwargs).evaluate()
 
     return params
 
@@ -91,112 +98,123 @@ def apply_attributes(obj, param_map, **kwargs):
     # Apply parameter map to dictionary
     return apply(params, param_map, 1, **kwargs)
 
+# -----------------------------------------------------------------------------
+# Mappings
+# -----------------------------------------------------------------------------
+# **NOTE** mappings may be passed NumPy arrays owned by the caller so, rather
+# than modifying them in place, the first operation in each creates a new
+# array which any subsequent operations can then modify in place
+def _evaluate(values):
+    # If values are a lazy array, evaluate them
+    # into a NumPy array, otherwise wrap them in one
+    return (values.evaluate() if isinstance(values, la.larray)
+            else np.asarray(values))
+
 def integer(values, **kwargs):
-    vals = deepcopy(values)
-    return la.rint(vals)
+    return la.larray(np.rint(_evaluate(values)))
 
 
 def integer_time_divide(values, sim_timestep_ms, **kwargs):
-    # Copy values and divide by timestep
-    scaled_vals = deepcopy(values)
-    scaled_vals /= sim_timestep_ms
+    # Divide values by timestep
+    scaled_vals = _evaluate(values) / sim_timestep_ms
 
     # Round and return
-    return la.rint(scaled_vals)
+    return la.larray(np.rint(scaled_vals, out=scaled_vals))
 
 
 def s1615(values, **kwargs):
-    return float_to_s1615_no_copy(deepcopy(values))
+    return la.larray(float_to_s1615_no_copy(_evaluate(values)))
 
 def s2011(values, **kwargs):
-    return float_to_s2011_no_copy(deepcopy(values))
+    return la.larray(float_to_s2011_no_copy(_evaluate(values)))
 
 def u032(values, **kwargs):
-    return float_to_u032_no_copy(deepcopy(values))
+    return la.larray(float_to_u032_no_copy(_evaluate(values)))
 
 def u32_fixed_point(values, fixed_point, **kwargs):
     float_to_weight_no_copy = LazyArrayFloatToFixConverter(
         False, 32, fixed_point, False)
-    return float_to_weight_no_copy(deepcopy(values))
+    return la.larray(float_to_weight_no_copy(_evaluate(values)))
 
 def s32_fixed_point(values, fixed_point, **kwargs):
     float_to_weight_no_copy = LazyArrayFloatToFixConverter(
         True, 32, fixed_point, False)
-    return float_to_weight_no_copy(deepcopy(values))
+    return la.larray(float_to_weight_no_copy(_evaluate(values)))
 
 def s32_fixed_point_scale_abs(values, fixed_point, scale, absolute, **kwargs):
-    # Copy values and apply scale
-    scaled_values = deepcopy(values)
-    scaled_values *= scale
+    # Apply scale
+    scaled_values = _evaluate(values) * scale
 
     # If absolute flag is set, take absolute
     if absolute:
-        scaled_values = la.abs(scaled_values)
+        np.abs(scaled_values, out=scaled_values)
 
     float_to_weight_no_copy = LazyArrayFloatToFixConverter(
         True, 32, fixed_point, False)
-    return float_to_weight_no_copy(scaled_values)
+    return la.larray(float_to_weight_no_copy(scaled_values))
 
 def time_multiply(values, sim_timestep_ms, float_to_fixed, **kwargs):
-    # Copy values and divide by timestep
-    scaled_vals = deepcopy(values)
-    scaled_vals /= sim_timestep_ms
+    # Divide values by timestep
+    scaled_vals = _evaluate(values) / sim_timestep_ms
 
     # Convert to fixed-point and return
-    return float_to_fixed(scaled_vals)
+    return la.larray(float_to_fixed(scaled_vals))
 
 
 def exp_decay(values, sim_timestep_ms, float_to_fixed, **kwargs):
-    # Copy values and calculate exponential decay
-    exp_decay_vals = deepcopy(values)
-    exp_decay_vals = la.exp(-sim_timestep_ms / exp_decay_vals)
+    # Calculate exponential decay
+    exp_decay_vals = -sim_timestep_ms / _evaluate(values)
+    np.exp(exp_decay_vals, out=exp_decay_vals)
 
     # Convert to fixed-point and return
-    return float_to_fixed(exp_decay_vals)
+    return la.larray(float_to_fixed(exp_decay_vals))
 
 
 def exp_init(values, sim_timestep_ms, float_to_fixed, **kwargs):
-    # Copy values and calculate exponential init
-    exp_init_vals = deepcopy(values)
-    exp_init_vals = 1.0 - la.exp(-sim_timestep_ms / exp_init_vals)
+    # Calculate exponential init
+    values = _evaluate(values)
+    exp_init_vals = -sim_timestep_ms / values
+    np.exp(exp_init_vals, out=exp_init_vals)
+    np.subtract(1.0, exp_init_vals, out=exp_init_vals)
     exp_init_vals *= (values / sim_timestep_ms)
 
     # Convert to fixed-point and return
-    return float_to_fixed(exp_init_vals)
+    return la.larray(float_to_fixed(exp_init_vals))
 
 
 def rate_isi(values, sim_timestep_ms, float_to_fixed, **kwargs):
-    # Copy values and convert rates to isis
-    isi_vals = deepcopy(values)
-    isi_vals = 1000.0 / (isi_vals * sim_timestep_ms)
+    # Convert rates to isis
+    isi_vals = _evaluate(values) * sim_timestep_ms
+    np.divide(1000.0, isi_vals, out=isi_vals)
 
     # Convert to fixed-point and return
-    return float_to_fixed(isi_vals)
+    return la.larray(float_to_fixed(isi_vals))
 
 
 def rate_exp_minus_lambda(values, sim_timestep_ms, float_to_fixed, **kwargs):
-    # Copy values and convert to spikes per-tick
-    lambda_vals = deepcopy(values)
-    lambda_vals = (lambda_vals * sim_timestep_ms) / 1000.0
+    # Convert to spikes per-tick
+    lambda_vals = _evaluate(values) * sim_timestep_ms
+    lambda_vals /= 1000.0
 
     # Calculate exponential
-    lambda_vals = la.exp(-1.0 * lambda_vals)
+    lambda_vals *= -1.0
+    np.exp(lambda_vals, out=lambda_vals)
 
     # Convert to fixed point and return
-    return float_to_fixed(lambda_vals)
+    return la.larray(float_to_fixed(lambda_vals))
 
 def exp_decay_lut(values, num_entries, time_shift, sim_timestep_ms,
                   float_to_fixed, **kwargs):
     # Determine the time step of the LUT in milliseconds
     timestep_ms = sim_timestep_ms * float(2 ** time_shift)
 
-    # Build a lazy array of times to calculate decay values for
-    time_ms = la.larray(
-        np.arange(0.0, -timestep_ms * float(num_entries), -timestep_ms))
+    # Build an array of times to calculate decay values for
+    time_ms = np.arange(0.0, -timestep_ms * float(num_entries), -timestep_ms)
 
     # Calculate exponential decay
-    values.shape = time_ms.shape
-    decay_vals = la.exp(time_ms / values)
+    values = _evaluate(values)
+    decay_vals = time_ms / values
+    np.exp(decay_vals, out=decay_vals)
 
     # Check last entry is zero(ish)
     if decay_vals[-1] > (1.0 / float(1 << float_to_fixed.n_frac)):
@@ -206,7 +224,7 @@ def exp_decay_lut(values, num_entries, time_shift, sim_timestep_ms,
                     sim_timestep_ms, values[0])
 
     # Convert to fixed-point and return
-    return float_to_fixed(decay_vals)
+    return la.larray(float_to_fixed(decay_vals))
 
 def random_seed(max_value, num_words, **kwargs):
     # Return random vector
@@ -222,13 +240,14 @@ def its_lut(distribution, n_frac):
 
 def choose(param, mask_function, a_function, b_function, **kwargs):
     # Call mask function and evaluate
-    # **NOTE** slicinc on non-evaluated lazyarrays doens't work
+    # **NOTE** slicing on non-evaluated lazyarrays doesn't work
     mask_a = mask_function(param, **kwargs).evaluate()
     mask_b = np.logical_not(mask_a)
 
-    # Split the parameter into two lazy arrays based on mask
-    param_a = la.larray(param[mask_a])
-    param_b = la.larray(param[mask_b])
+    # Split the parameter into two arrays based on mask
+    param = _evaluate(param)
+    param_a = param[mask_a]
+    param_b = param[mask_b]
 
     # Evaluate two halves of parameter space
     a = a_function(param_a, **kwargs).evaluate()
@@ -0,0 +1,263 @@
+# Import modules
+import hashlib
+import lazyarray as la
+import logging
+import numpy as np
+import os
+import tempfile
+
+# Import classes
+from pyNN.random import AbstractRNG, RandomDistribution
+from pyNN.recording.files import BaseFile
+
+# Import functions
+from six import integer_types, iteritems, string_types, text_type
+
+logger = logging.getLogger("pynn_spinnaker")
+
+
+# ----------------------------------------------------------------------------
+# Uncachable
+# ----------------------------------------------------------------------------
+class Uncachable(Exception):
+    """Raised when a projection contains something
+    which cannot be reliably hashed"""
+    pass
+
+
+# ----------------------------------------------------------------------------
+# Functions
+# ----------------------------------------------------------------------------
+def _get_random_state(rng):
+    # Unwrap native RNGs to get the RNG actually used on the host
+    rng = getattr(rng, "_host_rng", rng)
+
+    # Only RNGs backed by numpy RandomStates can be saved and restored
+    random_state = getattr(rng, "rng", None)
+    if not isinstance(random_state, np.random.RandomState):
+        raise Uncachable("Cannot cache connections generated using %s" %
+                         type(rng).__name__)
+    return random_state
+
+
+def _hash_value(h, value, chunk_rows=1000000):
+    # Hash type of value so e.g. 1 and 1.0 hash differently
+    h.update(type(value).__name__.encode("utf-8"))
+
+    if (value is None or isinstance(value, (bool, float) + integer_types +
+                                    string_types + (text_type,))):
+        h.update(repr(value).encode("utf-8"))
+    elif isinstance(value, np.generic):
+        h.update(repr(value.item()).encode("utf-8"))
+    elif isinstance(value, np.ndarray):
+        h.update(repr((value.dtype.str, value.shape)).encode("utf-8"))
+
+        # Hash arrays in chunks of rows so
+        # memory-mapped arrays aren't read entirely into memory
+        if value.ndim == 0:
+            h.update(value.tostring())
+        else:
+            for start in range(0, len(value), chunk_rows):
+                chunk = value[start:start + chunk_rows]
+                h.update(np.ascontiguousarray(chunk).tostring())
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _hash_value(h, v)
+    elif isinstance(value, dict):
+        for k, v in sorted(iteritems(value)):
+            _hash_value(h, k)
+            _hash_value(h, v)
+    elif isinstance(value, la.larray):
+        _hash_value(h, (value.shape, value.base_value))
+        for f, arg in value.operations:
+            _hash_value(h, (f.__name__, arg))
+    elif isinstance(value, RandomDistribution):
+        _hash_value(h, (value.name, value.parameters))
+    elif isinstance(value, AbstractRNG):
+        _hash_value(h, _get_random_state(value).get_state())
+    else:
+        raise Uncachable("Cannot hash %s" % type(value).__name__)
+
+
+def _get_projection_rngs(projection):
+    # Find any RNGs used by connector
+    rngs = [v for v in projection._connector.__dict__.values()
+            if isinstance(v, AbstractRNG)]
+
+    # Add RNGs used by any randomly-distributed synapse parameters
+    s_params = projection.synapse_type.native_parameters._parameters
+    for _, p in sorted(iteritems(s_params)):
+        if isinstance(p.base_value, RandomDistribution):
+            rngs.append(p.base_value.rng)
+
+    return rngs
+
+
+# ----------------------------------------------------------------------------
+# SynapticMatrixCache
+# ----------------------------------------------------------------------------
+class SynapticMatrixCache(object):
+    """On-disk cache of synaptic matrix rows generated on the host.
+
+    Entries are keyed by a hash of the definition of the projections
+    whose synapses they contain, the state of any RNGs used to generate
+    them and the post-synaptic slice they were generated for. When the
+    total size of entries exceeds `max_bytes`, the least recently used
+    entries are evicted.
+    """
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        # Make sure cache directory exists
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        # Cache of connector digests so connectors which reorder
+        # their internal state while connecting (e.g. FromListConnector)
+        # don't change keys of later post-slices
+        self._connector_digests = {}
+
+    # --------------------------------------------------------------------------
+    # Public methods
+    # --------------------------------------------------------------------------
+    def get_key(self, projections, post_slice, num_post_slices):
+        """Get cache key for synapses generated by projections in post slice.
+
+        Returns
+        -------
+        str or None
+            Key or None if the projections cannot be cached.
+        """
+        h = hashlib.sha1()
+        try:
+            _hash_value(h, (post_slice.start, post_slice.stop,
+                            num_post_slices))
+
+            for p in projections:
+                _hash_value(h, (p.pre.size, p.post.size, p.receptor_type,
+                                p._simulator.state.dt,
+                                type(p.synapse_type).__name__,
+                                p.synapse_type.native_parameters._parameters))
+                h.update(self._get_connector_digest(p._connector))
+
+                # Hash current state of RNGs
+                for rng in _get_projection_rngs(p):
+                    _hash_value(h, rng)
+        except Uncachable as e:
+            logger.debug("\t\t\t\tNot caching: %s", str(e))
+            return None
+
+        return h.hexdigest()
+
+    def get(self, key, projections):
+        """Read cached rows and restore RNGs to their state after generation.
+
+        Returns
+        -------
+        tuple or None
+            List of rows and (min, max) absolute weight or None if key
+            isn't in cache.
+        """
+        filename = self._get_filename(key)
+        if not os.path.exists(filename):
+            return None
+
+        logger.debug("\t\t\t\tReading cached rows from %s", filename)
+        with np.load(filename) as entry:
+            # Split synapses back into rows
+            row_ends = np.cumsum(entry["row_lengths"])
+            rows = np.split(entry["synapses"], row_ends[:-1])
+
+            # Restore RNGs to the state they were in after generation
+            rngs = list(self._iter_random_states(projections))
+            for i, r in enumerate(rngs):
+                r.set_state(("MT19937", entry["rng_%u_keys" % i],
+                             int(entry["rng_%u_pos" % i]),
+                             int(entry["rng_%u_has_gauss" % i]),
+                             float(entry["rng_%u_cached_gaussian" % i])))
+
+            weight_min, weight_max = entry["weight_range"]
+
+        # Update modification time to mark entry as recently used
+        os.utime(filename, None)
+        return rows, (weight_min, weight_max)
+
+    def put(self, key, rows, weight_min, weight_max, projections):
+        """Write generated rows and RNG states to cache and evict
+        least recently used entries if the cache is too large."""
+        # Build dictionary of arrays to write
+        arrays = {"synapses": np.concatenate(rows),
+                  "row_lengths": np.asarray([len(r) for r in rows]),
+                  "weight_range": np.asarray([weight_min, weight_max])}
+        for i, r in enumerate(self._iter_random_states(projections)):
+            _, keys, pos, has_gauss, cached_gaussian = r.get_state()
+            arrays["rng_%u_keys" % i] = keys
+            arrays["rng_%u_pos" % i] = pos
+            arrays["rng_%u_has_gauss" % i] = has_gauss
+            arrays["rng_%u_cached_gaussian" % i] = cached_gaussian
+
+        # Write to temporary file and then move into
+        # place so partially-written entries are never read
+        handle, temp_filename = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(handle, "wb") as f:
+            np.savez(f, **arrays)
+        os.rename(temp_filename, self._get_filename(key))
+
+        self._evict()
+
+    # --------------------------------------------------------------------------
+    # Private methods
+    # --------------------------------------------------------------------------
+    def _get_filename(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def _get_connector_digest(self, connector):
+        # If connector hasn't been hashed yet
+        if id(connector) not in self._connector_digests:
+            h = hashlib.sha1()
+            _hash_value(h, type(connector).__name__)
+
+            # Hash public attributes, skipping RNGs (whose state is
+            # hashed seperately), callbacks and PyNN file objects
+            # (whose contents are represented by other attributes)
+            for name, value in sorted(iteritems(connector.__dict__)):
+                if (name.startswith("_") or name == "callback" or
+                        isinstance(value, (AbstractRNG, BaseFile))):
+                    continue
+
+                _hash_value(h, (name, value))
+
+            # **NOTE** connector is stored alongside its
+            # digest so its id cannot be reused
+            self._connector_digests[id(connector)] = (connector, h.digest())
+
+        return self._connector_digests[id(connector)][1]
+
+    def _iter_random_states(self, projections):
+        # Yield each unique random state used by projections
+        seen = set()
+        for p in projections:
+            for rng in _get_projection_rngs(p):
+                r = _get_random_state(rng)
+                if id(r) not in seen:
+                    seen.add(id(r))
+                    yield r
+
+    def _evict(self):
+        # Get size and modification time of all entries
+        entries = []
+        for f in os.listdir(self.directory):
+            if f.endswith(".npz"):
+                stat = os.stat(os.path.join(self.directory, f))
+                entries.append((stat.st_mtime, stat.st_size, f))
+
+        # Remove least recently used entries until cache is small enough
+        total_bytes = sum(e[1] for e in entries)
+        for mtime, size, f in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+
+            logger.debug("\t\t\t\tEvicting cached rows %s", f)
+            os.remove(os.path.join(self.directory, f))
+            total_bytes -= size
@@ -4,7 +4,6 @@ import itertools
 import logging
 import numpy as np
 import regions
-from rig import machine
 
 # Import classes
 from collections import defaultdict
@@ -12,6 +11,7 @@ from rig_cpp_common.regions import Profiler, Statistics, System
 from rig_cpp_common.utils import Args
 
 # Import functions
+from bulk_read import cache_region_memory, prefetch_recording
 from rig_cpp_common.utils import load_regions
 from six import iteritems
 from utils import (calc_bitfield_words, calc_slice_bitfield_words,
@@ -41,6 +41,8 @@ class Regions(enum.IntEnum):
     analogue_recording_end = analogue_recording_3 + 1
     profiler = analogue_recording_end
     statistics = analogue_recording_end + 1
+    spike_count_recording = analogue_recording_end + 2
+    population_rate_recording = analogue_recording_end + 3
 
 
 # ----------------------------------------------------------------------------
@@ -159,6 +161,8 @@ class NeuralCluster(object):
                  vertex_load_applications, vertex_run_applications,
                  vertex_resources, keyspace, post_synaptic_width,
                  requires_back_prop, pop_size):
+        from rig.place_and_route import Cores, SDRAM
+
         # Create standard regions
         self.regions = {}
         self.regions[Regions.system] = System(timer_period_us, sim_ticks)
@@ -169,7 +173,15 @@ class NeuralCluster(object):
         self.regions[Regions.flush] = regions.Flush(config.flush_time,
                                                     sim_timestep_ms)
         self.regions[Regions.spike_recording] = regions.SpikeRecording(
-            indices_to_record, sim_timestep_ms, sim_ticks)
+            indices_to_record, sim_timestep_ms, sim_ticks,
+            config.recording_buffer_time, config.spike_recording_format,
+            config.mean_firing_rate)
+        self.regions[Regions.spike_count_recording] =\
+            regions.SpikeCountRecording(indices_to_record)
+        self.regions[Regions.population_rate_recording] =\
+            regions.PopulationRateRecording(
+                indices_to_record, record_sample_interval, sim_timestep_ms,
+                sim_ticks, config.recording_buffer_time)
         self.regions[Regions.statistics] = Statistics(len(self.statistic_names))
 
         # If cell type has any receptors i.e. any need for synaptic input
@@ -202,9 +214,12 @@ class NeuralCluster(object):
         # **HACK** this assumes the first entry is spike
         for i, v in enumerate(cell_type.recordable[1:]):
             self.regions[Regions(Regions.analogue_recording_start + i)] =\
-                regions.AnalogueRecording(indices_to_record, v,
-                                          record_sample_interval,
-                                          sim_timestep_ms, sim_ticks)
+                regions.AnalogueRecording(
+                    indices_to_record, v, record_sample_interval,
+                    sim_timestep_ms, sim_ticks, config.recording_buffer_time,
+                    config.analogue_recording_precision.get(v, 32),
+                    config.analogue_recording_average.get(v, False),
+                    config.analogue_recording_aggregate.get(v, False))
 
         # Add profiler region if required
         if config.num_profile_samples is not None:
@@ -239,13 +254,15 @@ class NeuralCluster(object):
             logger.debug("\t\t\tVertex %s: %u bytes SDRAM", v, sdram)
 
             # Add resources to dictionary
-            vertex_resources[v] = {machine.Cores: 1, machine.SDRAM: sdram}
+            vertex_resources[v] = {Cores: 1, SDRAM: sdram}
 
     # --------------------------------------------------------------------------
     # Public methods
     # --------------------------------------------------------------------------
     def allocate_out_buffers(self, placements, allocations,
                              machine_controller):
+        from rig.place_and_route import Cores
+
         # Loop through vertices
         for v in self.verts:
             # Get placement and allocation
@@ -253,7 +270,7 @@ class NeuralCluster(object):
             vertex_allocation = allocations[v]
 
             # Get core this vertex should be run on
-            core = vertex_allocation[machine.Cores]
+            core = vertex_allocation[Cores]
             assert (core.stop - core.start) == 1
 
             logger.debug("\t\tVertex %s (%u, %u, %u)",
@@ -274,6 +291,8 @@ class NeuralCluster(object):
                         for _ in range(2)]
 
     def load(self, placements, allocations, machine_controller):
+        from rig.place_and_route import Cores
+
         # Loop through vertices
         for v in self.verts:
             # Get placement and allocation
@@ -281,7 +300,7 @@ class NeuralCluster(object):
             vertex_allocation = allocations[v]
 
             # Get core this vertex should be run on
-            core = vertex_allocation[machine.Cores]
+            core = vertex_allocation[Cores]
             assert (core.stop - core.start) == 1
 
             logger.debug("\t\t\tVertex %s (%u, %u, %u): Spike key:%08x, Flush key:%08x",
@@ -306,28 +325,143 @@ class NeuralCluster(object):
                                                machine_controller, core,
                                                logger)
 
-    def read_recorded_spikes(self):
-        # Loop through all neuron vertices and read spike times into dictionary
-        spike_times = {}
+    def read_recorded_spikes(self, indices=None, tick_window=None,
+                             bulk_reader=None):
+        # Get neuron vertices containing requested indices in order
+        # and, if required, prefetch their spike recording regions
         region = self.regions[Regions.spike_recording]
-        for v in self.verts:
-            region_mem = v.region_memory[Regions.spike_recording]
-            spike_times.update(region.read_spike_times(v.neuron_slice,
-                                                       region_mem))
-        return spike_times
+        verts = self._get_sorted_verts(indices)
+        prefetch_recording(bulk_reader, verts, Regions.spike_recording,
+                           region, tick_window)
+
+        # Loop through vertices and read spikes
+        vert_spikes = [
+            region.read_spikes(v.neuron_slice,
+                               v.region_memory[Regions.spike_recording],
+                               tick_window)
+            for v in verts]
+
+        # If no vertices were read, return empty arrays
+        if len(vert_spikes) == 0:
+            return (np.empty(0, dtype=int), np.empty(0, dtype=np.float32))
+
+        # Concatenate the indices and times of spikes from each vertex
+        return (np.hstack([s[0] for s in vert_spikes]),
+                np.hstack([s[1] for s in vert_spikes]))
+
+    def read_recorded_signal(self, channel, indices=None, tick_window=None,
+                             bulk_reader=None):
+        # Get index of channel
+        region_index = Regions(Regions.analogue_recording_start + channel)
+        region = self.regions[region_index]
 
-    def read_recorded_signal(self, channel):
-        # Get index of channelread_profile
+        # Get neuron vertices containing requested indices in
+        # order and, if required, prefetch their recording regions
+        verts = self._get_sorted_verts(indices)
+        prefetch_recording(bulk_reader, verts, region_index, region,
+                           tick_window)
+
+        # Loop through vertices and read signal
+        vert_signals = [
+            region.read_signal(v.neuron_slice, v.region_memory[region_index],
+                               tick_window)
+            for v in verts]
+
+        # If no vertices were read, return empty arrays
+        if len(vert_signals) == 0:
+            return (np.empty(0, dtype=int),
+                    np.empty((0, 0), dtype=np.float32))
+
+        # Concatenate the recorded indices and
+        # (time x neuron) signal arrays from each vertex
+        return (np.hstack([s[0] for s in vert_signals]),
+                np.hstack([s[1] for s in vert_signals]))
+
+    def read_recorded_aggregate_signal(self, channel, tick_window=None,
+                                       bulk_reader=None):
+        # If required, prefetch recording regions of all vertices
         region_index = Regions(Regions.analogue_recording_start + channel)
         region = self.regions[region_index]
+        prefetch_recording(bulk_reader, self.verts, region_index, region,
+                           tick_window)
+
+        # Combine the totals recorded by all vertices into a mean and variance
+        return region.read_aggregate_signal(
+            [(v.neuron_slice, v.region_memory[region_index])
+             for v in self.verts], tick_window)
+
+    def read_recorded_spike_counts(self, indices=None, bulk_reader=None):
+        # Get neuron vertices containing requested indices in order
+        # and, if required, prefetch their spike count recording regions
+        region = self.regions[Regions.spike_count_recording]
+        verts = self._get_sorted_verts(indices)
+        prefetch_recording(bulk_reader, verts, Regions.spike_count_recording,
+                           region)
+
+        # Loop through vertices and read spike counts
+        vert_counts = [
+            region.read_counts(v.neuron_slice,
+                               v.region_memory[Regions.spike_count_recording])
+            for v in verts]
+
+        # If no vertices were read, return empty arrays
+        if len(vert_counts) == 0:
+            return (np.empty(0, dtype=int), np.empty(0, dtype=np.uint32))
+
+        # Concatenate the recorded indices and spike counts from each vertex
+        return (np.hstack([c[0] for c in vert_counts]),
+                np.hstack([c[1] for c in vert_counts]))
+
+    def read_recorded_population_rate(self, tick_window=None,
+                                      bulk_reader=None):
+        # If required, prefetch recording regions of all vertices
+        region = self.regions[Regions.population_rate_recording]
+        prefetch_recording(bulk_reader, self.verts,
+                           Regions.population_rate_recording, region,
+                           tick_window)
+
+        # Combine the spike counts recorded by all vertices into a rate
+        return region.read_rate(
+            [(v.neuron_slice,
+              v.region_memory[Regions.population_rate_recording])
+             for v in self.verts], tick_window)
+
+    def get_streamed_recordings(self):
+        # Loop through spike, population rate and analogue recording regions
+        streamed = []
+        for r in itertools.chain([Regions.spike_recording,
+                                  Regions.population_rate_recording],
+                                 range(Regions.analogue_recording_start,
+                                       Regions.analogue_recording_end)):
+            # If region exists and needs draining while simulation
+            # is running, add it to list with each vertex's memory
+            region = self.regions.get(Regions(r))
+            if region is not None and region.streaming:
+                streamed.extend((region, v.neuron_slice, v.region_memory[r])
+                                for v in self.verts)
+
+        return streamed
+
+    def get_readback_requests(self):
+        # Wrap memory of profile and statistics regions, which are
+        # read back after every simulation, so it can be prefetched
+        # **NOTE** recording regions are only prefetched when they're read
+        return cache_region_memory(
+            self.verts, [r for r in (Regions.profiler, Regions.statistics)
+                         if r in self.regions])
+
+    def get_spike_recording_statistics(self):
+        region = self.regions[Regions.spike_recording]
+        return region.get_statistics(v.neuron_slice for v in self.verts)
 
-        # Loop through all neuron vertices and read signal
-        signal = {}
-        for v in self.verts:
-            region_mem = v.region_memory[region_index]
-            signal.update(region.read_signal(v.neuron_slice, region_mem))
+    def get_population_rate_recording_statistics(self):
+        region = self.regions[Regions.population_rate_recording]
+        return region.get_statistics(v.neuron_slice for v in self.verts)
 
-        return signal
+    def get_signal_recording_statistics(self, channel):
+        region = self.regions[Regions(Regions.analogue_recording_start +
+                                      channel)]
+        return region.get_statistics(v.neuron_slice for v in self.verts)
 
     def read_profile(self):
         # Get the profile recording region and
@@ -351,10 +485,25 @@ class NeuralCluster(object):
     # --------------------------------------------------------------------------
     # Private methods
     # --------------------------------------------------------------------------
+    def _get_sorted_verts(self, indices):
+        # Sort vertices by the start of their neuron slice and,
+        # if indices are specified, remove any which contain none
+        verts = sorted(self.verts, key=lambda v: v.neuron_slice.start)
+        if indices is None:
+            return verts
+        else:
+            return [v for v in verts if v.neuron_slice.contains_any(indices)]
+
     def _estimate_sdram(self, vertex_slice):
         # Begin with size of spike recording region
         sdram = self.regions[Regions.spike_recording].sizeof(vertex_slice);
 
+        # Add on size of spike count and population rate recording regions
+        sdram += self.regions[Regions.spike_count_recording].sizeof(
+            vertex_slice)
+        sdram += self.regions[Regions.population_rate_recording].sizeof(
+            vertex_slice)
+
         # Add on size of neuron region
         sdram += self.regions[Regions.neuron].sizeof(vertex_slice)
         
@@ -380,7 +529,9 @@ class NeuralCluster(object):
         # Add vertex slice to regions that require it
         for r in itertools.chain((Regions.neuron,
                                   Regions.synapse,
-                                  Regions.spike_recording),
+                                  Regions.spike_recording,
+                                  Regions.spike_count_recording,
+                                  Regions.population_rate_recording),
                                  analogue_recording_regions):
             region_arguments[r] = Args(vertex_slice)
 
@@ -0,0 +1,113 @@
+# Import modules
+import logging
+import numpy as np
+import os
+import struct
+import zipfile
+
+# Import functions
+from six import iteritems
+
+logger = logging.getLogger("pynn_spinnaker")
+
+
+# ----------------------------------------------------------------------------
+# Functions
+# ----------------------------------------------------------------------------
+def _is_hdf5_filename(filename):
+    return os.path.splitext(filename)[1].lower() in (".h5", ".hdf5")
+
+
+def _memmap_npz(filename, mmap_mode):
+    # Get list of members in zip file
+    with zipfile.ZipFile(filename) as z:
+        members = z.infolist()
+
+    arrays = {}
+    with open(filename, "rb") as f:
+        for m in members:
+            # Compressed members can't be memory-mapped
+            if m.compress_type != zipfile.ZIP_STORED:
+                raise ValueError("Member %s of %s is compressed so cannot be "
+                                 "memory-mapped" % (m.filename, filename))
+
+            # Read the lengths of the variable-length fields of the
+            # member's local file header to find where its data starts
+            f.seek(m.header_offset + 26)
+            name_length, extra_length = struct.unpack("<HH", f.read(4))
+            f.seek(m.header_offset + 30 + name_length + extra_length)
+
+            # Read .npy header
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                header = np.lib.format.read_array_header_1_0(f)
+            else:
+                header = np.lib.format.read_array_header_2_0(f)
+            shape, fortran_order, dtype = header
+
+            # If array has data, memory-map it
+            name = os.path.splitext(m.filename)[0]
+            count = int(np.prod(shape))
+            if count > 0 and len(shape) > 0:
+                arrays[name] = np.memmap(
+                    filename, dtype=dtype, mode=mmap_mode, offset=f.tell(),
+                    shape=shape, order="F" if fortran_order else "C")
+            # Otherwise read scalars and empty arrays directly
+            else:
+                arrays[name] = np.fromfile(f, dtype=dtype,
+                                           count=count).reshape(shape)
+
+    return arrays
+
+
+def write_arrays(filename, arrays):
+    """Write a dictionary of arrays to an uncompressed NPZ or, if
+    `filename` has an .h5 or .hdf5 extension, an HDF5 file.
+
+    Parameters
+    ----------
+    filename : str
+        Filename to write to.
+    arrays : dict
+        Dictionary mapping names to arrays.
+    """
+    logger.info("Writing arrays to %s", filename)
+
+    if _is_hdf5_filename(filename):
+        import h5py
+
+        with h5py.File(filename, "w") as f:
+            for name, array in iteritems(arrays):
+                f.create_dataset(name, data=array)
+    else:
+        # **NOTE** arrays are stored uncompressed so they can be memory-mapped
+        with open(filename, "wb") as f:
+            np.savez(f, **arrays)
+
+
+def read_arrays(filename, mmap_mode="r"):
+    """Read arrays written by :py:func:`write_arrays` without reading their
+    data into memory.
+
+    Parameters
+    ----------
+    filename : str
+        Filename to read from.
+    mmap_mode : str
+        Mode with which to memory-map NPZ members (see
+        :py:class:`numpy.memmap`) or None to read them into memory.
+
+    Returns
+    -------
+    dict or :py:class:`h5py.File`
+        For NPZ files, a dictionary mapping names to memory-mapped arrays.
+        For HDF5 files, the open file whose datasets are read on demand.
+    """
+    if _is_hdf5_filename(filename):
+        import h5py
+        return h5py.File(filename, "r")
+    elif mmap_mode is None:
+        with np.load(filename) as f:
+            return {name: f[name] for name in f.files}
+    else:
+        return _memmap_npz(filename, mmap_mode)
@@ -0,0 +1,89 @@
+# Import modules
+import logging
+import sys
+import threading
+import time
+
+# Import functions
+from six import reraise
+
+logger = logging.getLogger("pynn_spinnaker")
+
+
+# ----------------------------------------------------------------------------
+# RecordingDrain
+# ----------------------------------------------------------------------------
+class RecordingDrain(threading.Thread):
+    """Background thread which periodically drains the SDRAM ring buffers of
+    recording regions while the simulation is running.
+
+    **NOTE** the machine controller is not thread-safe so nothing else should
+    communicate with SpiNNaker between :py:meth:`start` and :py:meth:`stop`.
+    """
+    def __init__(self, recordings, interval):
+        super(RecordingDrain, self).__init__(name="RecordingDrain")
+
+        # Don't keep process alive if simulation is interrupted
+        self.daemon = True
+
+        # List of (region, vertex slice, region memory) tuples to drain
+        self.recordings = recordings
+
+        # How long to wait between drains (in seconds)
+        self.interval = interval
+
+        # Statistics
+        self.num_drains = 0
+        self.max_drain_time = 0.0
+
+        self._stop_event = threading.Event()
+        self._exc_info = None
+
+    # --------------------------------------------------------------------------
+    # Thread methods
+    # --------------------------------------------------------------------------
+    def run(self):
+        try:
+            # Until stopped, wait for interval and then drain
+            while not self._stop_event.wait(self.interval):
+                self.drain(running=True)
+        except:
+            # Store exception so it can be re-raised in main thread
+            self._exc_info = sys.exc_info()
+
+    # --------------------------------------------------------------------------
+    # Public methods
+    # --------------------------------------------------------------------------
+    def drain(self, running):
+        # Drain all recordings, timing how long it takes
+        start_time = time.time()
+        num_samples = sum(r.drain(s, m, running)
+                          for r, s, m in self.recordings)
+        drain_time = time.time() - start_time
+
+        # Update statistics
+        self.num_drains += 1
+        self.max_drain_time = max(self.max_drain_time, drain_time)
+
+        logger.debug("\tDrained %u recording samples in %fs",
+                     num_samples, drain_time)
+
+    def stop(self):
+        # Signal thread to stop and wait for it to do so
+        self._stop_event.set()
+        self.join()
+
+        logger.info("Drained recording buffers %u times, "
+                    "maximum drain time %fs (interval %fs)",
+                    self.num_drains, self.max_drain_time, self.interval)
+
+        # If draining takes longer than the interval,
+        # it's likely that buffers are overflowing
+        if self.max_drain_time > self.interval:
+            logger.warn("Draining recording buffers took longer than the "
+                        "drain interval - consider increasing "
+                        "recording_buffer_time")
+
+        # If thread raised an exception, re-raise it here
+        if self._exc_info is not None:
+            reraise(*self._exc_info)
@@ -11,10 +11,13 @@ from output_buffer import OutputBuffer
 from output_weight import OutputWeight
 from parameter_space import ParameterSpace
 from plastic_synaptic_matrix import PlasticSynapticMatrix
+from population_rate_recording import PopulationRateRecording
 from sdram_back_prop_input import SDRAMBackPropInput
 from sdram_back_prop_output import SDRAMBackPropOutput
+from spike_count_recording import SpikeCountRecording
+from spike_injection_buffer import SpikeInjectionBuffer
 from spike_recording import SpikeRecording
-from spike_source_array import SpikeSourceArray
+from spike_source_array import SpikeSourceArray, SpikeSourceArrayFormat
 from spike_source_poisson import SpikeSourcePoisson
 from static_synaptic_matrix import StaticSynapticMatrix
 from synaptic_matrix import SynapticMatrix
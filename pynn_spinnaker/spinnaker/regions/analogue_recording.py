@@ -1,131 +1,205 @@
 # Import modules
 import math
 import numpy as np
-import struct
 
 # Import classes
-from rig_cpp_common.regions import Region
-from rig.type_casts import NumpyFixToFloatConverter
-
-# Import functions
-from ..utils import calc_slice_bitfield_words
+from recording_buffer import RecordingBuffer
 
 
 # ------------------------------------------------------------------------------
 # AnalogueRecording
 # ------------------------------------------------------------------------------
-class AnalogueRecording(Region):
+class AnalogueRecording(RecordingBuffer):
+    # Analogue recording header contains sampling interval, precision
+    # and whether values are averaged and aggregated across neurons
+    num_header_words = 4
+
+    # Number of fractional bits in 32 and 16-bit samples
+    fractional_bits = {32: 15, 16: 8}
+
     def __init__(self, indices_to_record, channel, record_sample_interval,
-                 sim_timestep_ms, simulation_ticks):
-        self.indices_to_record = indices_to_record[channel]
+                 sim_timestep_ms, simulation_ticks, buffer_time=None,
+                 precision=32, average=False, aggregate=False):
+        # Check precision is supported
+        if precision not in self.fractional_bits:
+            raise ValueError("Analogue recording precision must be "
+                             "16 or 32 bits, not %s" % str(precision))
+
+        self.precision = precision
+        self.average = average
+        self.aggregate = aggregate
+        self.sim_timestep_ms = sim_timestep_ms
 
         # Convert recording sample intervals to ticks
         self.record_sample_ticks = int(math.ceil(
             float(record_sample_interval) / float(sim_timestep_ms)))
 
-        # Convert simulation duration into a number of these ticks
-        self.record_ticks = int(math.ceil(
-            float(simulation_ticks) / float(self.record_sample_ticks)))
+        super(AnalogueRecording, self).__init__(
+            indices_to_record[channel], self.record_sample_ticks,
+            simulation_ticks, sim_timestep_ms, buffer_time)
 
     # --------------------------------------------------------------------------
-    # Region methods
+    # Public API
     # --------------------------------------------------------------------------
-    def sizeof(self, vertex_slice):
-        """Get the size requirements of the region in bytes.
+    def read_signal(self, vertex_slice, region_memory, tick_window=None):
+        """Read signal recorded by a vertex.
 
         Parameters
         ----------
-        vertex_slice : :py:func:`slice`
-            A slice object which indicates which rows, columns or other
-            elements of the region should be included.
+        vertex_slice : :py:class:`~pynn_spinnaker.spinnaker.utils.UnitStrideSlice`
+            Slice of neurons simulated by vertex.
+        region_memory : file-like object
+            Memory of the region in which vertex recorded signal.
+        tick_window : (int, int) or None
+            If specified, only samples recorded at or after the first
+            tick and before the second are read from memory.
 
         Returns
         -------
-        int
-            The number of bytes required to store the data in the given slice
-            of the region.
+        (:py:class:`numpy.ndarray`, :py:class:`numpy.ndarray`)
+            Sorted population indices of the recorded neurons and a
+            float32 (time x neuron) array containing their signals, with a
+            row for each sample the simulation (or tick window) spans.
         """
-        #
-        # Determine how many bytes are required for each neuron in slice
-        indices_bytes = calc_slice_bitfield_words(vertex_slice) * 4
+        # Aggregated signals must be read with read_aggregate_signal
+        assert not self.aggregate
 
-        # Slice out the vertex indices to record
-        vertex_indices = self.indices_to_record[vertex_slice.python_slice]
+        # Determine which samples the simulation or tick window spans
+        first_sample, stop_sample = self._get_sample_range(tick_window)
+        num_samples = stop_sample - first_sample
 
-        # Each sample requires one word per neuron
-        sample_bytes = vertex_indices.count() * 4
-
-        # Header word specifiying how many words are in each sample, indices
-        # bit field and a sample bit field for each tick we're recording
-        return 4 + indices_bytes + int(sample_bytes * self.record_ticks)
+        # Get the indices within this vertes that were recorded
+        vertex_indices = self.indices_to_record[vertex_slice.python_slice]
 
-    def write_subregion_to_file(self, fp, vertex_slice):
-        """Write a portion of the region to a file applying the formatter.
+        # Convert bits back into the population indices of recorded neurons
+        recorded_indices = np.flatnonzero(
+            np.frombuffer(vertex_indices.unpack(), dtype=np.uint8))
+        recorded_indices += vertex_slice.start
+
+        # If there are no neurons in this vertex
+        # being recorded, return an empty array
+        num_recorded = len(recorded_indices)
+        if num_recorded == 0:
+            return (recorded_indices,
+                    np.empty((num_samples, 0), dtype=np.float32))
+
+        # Read ticks and samples which have a row per sample
+        ticks, data = self._read_samples(vertex_slice, region_memory,
+                                         tick_window)
+
+        # Reinterpret sample words as signed values of correct precision,
+        # slicing off any padding after the last recorded neuron
+        data = np.ascontiguousarray(data)
+        data = data.view(np.int16 if self.precision == 16 else np.int32)
+        data = data[:, :num_recorded]
+
+        # Scatter samples into rows of array with a row for every sample
+        # **NOTE** any samples dropped as the buffer was full remain NaN
+        samples = np.empty((num_samples, num_recorded), dtype=np.float32)
+        samples.fill(np.nan)
+        samples[(ticks // self.record_sample_ticks) - first_sample] = data
+
+        # Convert from fixed point in place
+        samples *= 2.0 ** -self.fractional_bits[self.precision]
+        return recorded_indices, samples
+
+    def read_aggregate_signal(self, vertex_memories, tick_window=None):
+        """Read the mean and variance of the signal across the neurons
+        recorded by vertices which aggregated them on-core.
 
         Parameters
         ----------
-        vertex_slice : :py:func:`slice`
-            A slice object which indicnamedtupleates which rows,
-            columns or other elements of the region should be included.
-        fp : file-like object
-            The file-like object to which data from the region will be written.
-            This must support a `write` method.
-        """
-        # Slice out the vertex indices to record
-        vertex_indices = self.indices_to_record[vertex_slice.python_slice]
-
-        # Write record sample ticks
-        fp.write(struct.pack("I", self.record_sample_ticks))
+        vertex_memories : iterable
+            (:py:class:`~pynn_spinnaker.spinnaker.utils.UnitStrideSlice`,
+            file-like object) tuples specifying the slice of neurons simulated
+            by each vertex and the memory of the region in which it recorded.
+        tick_window : (int, int) or None
+            If specified, only samples recorded at or after the first
+            tick and before the second are read from memory.
 
-        # Write bitfield to file
-        # **NOTE** as there's no neurons after this,
-        # the word-aligned bits don't matter
-        fp.write(vertex_indices.tobytes())
+        Returns
+        -------
+        (:py:class:`numpy.ndarray`, :py:class:`numpy.ndarray`, :py:class:`numpy.ndarray`)
+            Times in ms of each sample the simulation (or tick window) spans
+            and the mean and variance of the signal across all recorded
+            neurons at each. Samples which any vertex dropped because its
+            buffer was full are NaN.
+        """
+        assert self.aggregate
+
+        # Determine which samples the simulation or tick window spans
+        first_sample, stop_sample = self._get_sample_range(tick_window)
+        num_samples = stop_sample - first_sample
+
+        # Sum the totals recorded by each vertex in each sample
+        # **NOTE** any samples dropped as a buffer was full remain NaN
+        totals = np.zeros((num_samples, 2))
+        num_recorded = 0
+        for vertex_slice, region_memory in vertex_memories:
+            vertex_indices = self.indices_to_record[vertex_slice.python_slice]
+            if vertex_indices.count() == 0:
+                continue
+
+            ticks, data = self._read_samples(vertex_slice, region_memory,
+                                             tick_window)
+
+            # Reinterpret pairs of sample words as 64-bit
+            # sum and sum of squares of S16.15 values
+            data = np.ascontiguousarray(data).view(np.int64)
+
+            vertex_totals = np.empty((num_samples, 2))
+            vertex_totals.fill(np.nan)
+            vertex_totals[(ticks // self.record_sample_ticks) -
+                          first_sample] = data
+
+            totals += vertex_totals
+            num_recorded += vertex_indices.count()
+
+        # If no neurons were recorded, return empty arrays
+        if num_recorded == 0:
+            return np.empty(0), np.empty(0), np.empty(0)
+
+        # Convert from fixed point and calculate mean and variance
+        totals *= 2.0 ** -self.fractional_bits[32]
+        mean = totals[:, 0] / num_recorded
+        variance = (totals[:, 1] / num_recorded) - np.square(mean)
+
+        # Calculate time of each sample
+        times = np.arange(first_sample, stop_sample) *\
+            (self.record_sample_ticks * self.sim_timestep_ms)
+        return times, mean, variance
 
     # --------------------------------------------------------------------------
-    # Public API
+    # Private methods
     # --------------------------------------------------------------------------
-    def read_signal(self, vertex_slice, region_memory):
-        # Get the indices within this vertes that were recorded
-        vertex_indices = self.indices_to_record[vertex_slice.python_slice]
-
-        # Each sample requires one word per neuron
-        # If there are none i.e. no neurons in this vertex
-        # are being recorded, return an empty dictionary
-        sample_words = vertex_indices.count()
-        if sample_words == 0:
-            return {}
-
-        # Seek to start of recording memory
-        region_memory.seek(4 + (calc_slice_bitfield_words(vertex_slice) * 4))
-
-        # Read data from memory
-        data = region_memory.read(sample_words * 4 * self.record_ticks)
-
-        # Load into numpy
-        data = np.fromstring(data, dtype=np.int32)
-
-        # Finally reshape into a sample shaped vector
-        data = data.reshape((-1, sample_words))
-
-        # Convert to fixed point
-        data = NumpyFixToFloatConverter(15)(data)
-        
-        # Loop through bits of vertex indices
-        # **YUCK** this seems mega-innefficient
-        signals = {}
-        c = 0
-        for i, b in enumerate(vertex_indices):
-            # If bit is set
-            if b:
-                # Extract neuron column
-                vector = data[:, c]
-
-                # Go onto next column
-                c += 1
-
-                # Add to dictionary
-                signals[i + vertex_slice.start] = vector
-
-        # Return dictionary of signals
-        return signals
+    def _get_header_words(self, vertex_indices):
+        # Header specifies how many ticks between each sample, how many bits
+        # each value has and whether they are averaged and aggregated
+        return (self.record_sample_ticks, self.precision,
+                int(self.average), int(self.aggregate))
+
+    def _get_sample_range(self, tick_window):
+        # Determine which samples the simulation or tick window spans
+        first_sample = 0
+        stop_sample = self.num_samples
+        if tick_window is not None:
+            first_sample = min(stop_sample, int(math.ceil(
+                float(tick_window[0]) / float(self.record_sample_ticks))))
+            stop_sample = max(first_sample, min(stop_sample, int(math.ceil(
+                float(tick_window[1]) / float(self.record_sample_ticks)))))
+        return first_sample, stop_sample
+
+    def _get_sample_words(self, num_recorded):
+        # If no neurons are recorded, no samples are required
+        if num_recorded == 0:
+            return 0
+        # Otherwise, if values are aggregated, samples
+        # contain a 64-bit sum and sum of squares
+        elif self.aggregate:
+            return 4
+        # Otherwise, 16-bit samples require one word for every two neurons
+        elif self.precision == 16:
+            return (num_recorded + 1) // 2
+        # Otherwise, each sample requires one word per neuron
+        else:
+            return num_recorded
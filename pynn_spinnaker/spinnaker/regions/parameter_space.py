@@ -5,6 +5,7 @@ from .. import lazy_param_map
 
 # Import classes
 from rig_cpp_common.regions import Region
+from ..utils import PayloadCache
 
 
 # ------------------------------------------------------------------------------
@@ -29,6 +30,10 @@ class ParameterSpace(Region):
         else:
             self.immutable_params = None
 
+        # Cache of data encoded for each vertex, shared between sizing and
+        # writing, so the unique immutable parameters are only found once
+        self._payloads = PayloadCache(self._encode)
+
     # --------------------------------------------------------------------------
     # Region methods
     # --------------------------------------------------------------------------
@@ -47,25 +52,7 @@ class ParameterSpace(Region):
             The number of bytes required to store the data in the given slice
             of the region.
         """
-        # If there are any mutable parameters
-        size = 0
-        if self.mutable_params is not None:
-            size += self.mutable_params[vertex_slice.python_slice].nbytes
-
-        # If there are any immutable parameters
-        if self.immutable_params is not None:
-            # Find unique immutable synapse parameter slice
-            unique_immutable = np.unique(
-                self.immutable_params[vertex_slice.python_slice])
-
-            # Add size of unique parameter count and mutable parameters slice
-            num_index_bytes = len(vertex_slice) * 2
-            if len(vertex_slice) % 2 != 0:
-                num_index_bytes += 2
-            size += (4 + num_index_bytes + unique_immutable.nbytes)
-
-        return size
-
+        return len(self._payloads.get(vertex_slice))
 
     def write_subregion_to_file(self, fp, vertex_slice):
         """Write a portion of the region to a file applying the formatter.
@@ -79,10 +66,21 @@ class ParameterSpace(Region):
             A slice object which indicates which rows, columns or other
             elements of the region should be included.
         """
+        # Write encoded data, removing it from the cache
+        # as it shouldn't be required again once written
+        fp.write(self._payloads.get(vertex_slice))
+        self._payloads.evict(vertex_slice)
 
-        # Write mutable parameter slice as string
+    # --------------------------------------------------------------------------
+    # Private methods
+    # --------------------------------------------------------------------------
+    def _encode(self, vertex_slice):
+        data = []
+
+        # Add mutable parameter slice as string
         if self.mutable_params is not None:
-            fp.write(self.mutable_params[vertex_slice.python_slice].tostring())
+            data.append(
+                self.mutable_params[vertex_slice.python_slice].tostring())
 
         # If there are any immutable parameters
         if self.immutable_params is not None:
@@ -91,15 +89,17 @@ class ParameterSpace(Region):
                 self.immutable_params[vertex_slice.python_slice],
                 return_inverse=True)
 
-            # Write number of unique immutable parameters
-            fp.write(struct.pack("I", len(unique_immutable[0])))
+            # Add number of unique immutable parameters
+            data.append(struct.pack("I", len(unique_immutable[0])))
 
-            # Write indices into unique_immutable array,
+            # Add indices into unique_immutable array,
             # adding a padding half-word to word-align
             indices = unique_immutable[1].astype(np.uint16)
-            fp.write(indices.tostring())
+            data.append(indices.tostring())
             if len(indices) % 2 != 0:
-                fp.write(b"\x00\x00")
+                data.append(b"\x00\x00")
+
+            # Add unique immutable parameters
+            data.append(unique_immutable[0].tostring())
 
-            # Write unique immutable parameters
-            fp.write(unique_immutable[0].tostring())
+        return b"".join(data)
@@ -0,0 +1,112 @@
+# Import modules
+import math
+import numpy as np
+
+# Import classes
+from recording_buffer import RecordingBuffer
+
+
+# ------------------------------------------------------------------------------
+# PopulationRateRecording
+# ------------------------------------------------------------------------------
+class PopulationRateRecording(RecordingBuffer):
+    """Recording region in which a vertex records how many spikes its
+    recorded neurons emit in each bin of ticks, corresponding to
+    `population_rate_recording.h`. Each sample contains a single spike
+    count and is stamped with the first tick of its bin.
+    """
+    # Population rate recording header contains
+    # bin size and simulation duration in ticks
+    num_header_words = 2
+
+    def __init__(self, indices_to_record, record_sample_interval,
+                 sim_timestep_ms, simulation_ticks, buffer_time=None):
+        self.sim_timestep_ms = sim_timestep_ms
+
+        # Convert recording sample interval to ticks
+        self.record_sample_ticks = int(math.ceil(
+            float(record_sample_interval) / float(sim_timestep_ms)))
+
+        super(PopulationRateRecording, self).__init__(
+            indices_to_record["population_rate"], self.record_sample_ticks,
+            simulation_ticks, sim_timestep_ms, buffer_time)
+
+    # --------------------------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------------------------
+    def read_rate(self, vertex_memories, tick_window=None):
+        """Read the mean firing rate of the neurons recorded by vertices.
+
+        Parameters
+        ----------
+        vertex_memories : iterable
+            (:py:class:`~pynn_spinnaker.spinnaker.utils.UnitStrideSlice`,
+            file-like object) tuples specifying the slice of neurons simulated
+            by each vertex and the memory of the region in which it recorded.
+        tick_window : (int, int) or None
+            If specified, only bins starting at or after the first
+            tick and before the second are read from memory.
+
+        Returns
+        -------
+        (:py:class:`numpy.ndarray`, :py:class:`numpy.ndarray`)
+            Times in ms at which each bin starts and the mean firing rate
+            in Hz of the recorded neurons within it. Rates of bins any
+            vertex dropped because its buffer was full are NaN.
+        """
+        # Determine which bins the simulation or tick window spans
+        first_bin = 0
+        stop_bin = self.num_samples
+        if tick_window is not None:
+            first_bin = min(stop_bin, int(math.ceil(
+                float(tick_window[0]) / float(self.record_sample_ticks))))
+            stop_bin = max(first_bin, min(stop_bin, int(math.ceil(
+                float(tick_window[1]) / float(self.record_sample_ticks)))))
+
+        # Sum the spike counts recorded by each vertex in each bin
+        # **NOTE** any bins dropped as a buffer was full remain NaN
+        counts = np.zeros(stop_bin - first_bin)
+        num_recorded = 0
+        for vertex_slice, region_memory in vertex_memories:
+            vertex_indices = self.indices_to_record[vertex_slice.python_slice]
+            if vertex_indices.count() == 0:
+                continue
+
+            ticks, data = self._read_samples(vertex_slice, region_memory,
+                                             tick_window)
+
+            vertex_counts = np.empty(stop_bin - first_bin)
+            vertex_counts.fill(np.nan)
+            vertex_counts[(ticks // self.record_sample_ticks) - first_bin] =\
+                data[:, 0]
+
+            counts += vertex_counts
+            num_recorded += vertex_indices.count()
+
+        # If no neurons were recorded, return empty arrays
+        if num_recorded == 0:
+            return np.empty(0), np.empty(0)
+
+        # Calculate the first tick of each bin and its
+        # duration, the last of which may be truncated
+        bin_ticks = np.arange(first_bin, stop_bin) * self.record_sample_ticks
+        bin_duration_ticks = np.minimum(self.record_sample_ticks,
+                                        self.simulation_ticks - bin_ticks)
+
+        # Convert counts to mean rate in Hz
+        bin_duration_s = bin_duration_ticks * self.sim_timestep_ms / 1000.0
+        return (bin_ticks * self.sim_timestep_ms,
+                counts / (num_recorded * bin_duration_s))
+
+    # --------------------------------------------------------------------------
+    # Private methods
+    # --------------------------------------------------------------------------
+    def _get_header_words(self, vertex_indices):
+        # Header specifies how many ticks are in each bin
+        # and how many the simulation runs for, at the end
+        # of which any partially complete bin is recorded
+        return (self.record_sample_ticks, self.simulation_ticks)
+
+    def _get_sample_words(self, num_recorded):
+        # If any neurons are recorded, each sample is a single spike count
+        return 0 if num_recorded == 0 else 1
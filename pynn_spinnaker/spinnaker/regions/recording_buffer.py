@@ -0,0 +1,318 @@
+# Import modules
+import math
+import numpy as np
+import struct
+
+# Import classes
+from collections import defaultdict
+from rig_cpp_common.regions import Region
+
+# Import functions
+from ..utils import calc_slice_bitfield_words
+
+
+# ------------------------------------------------------------------------------
+# RecordingBuffer
+# ------------------------------------------------------------------------------
+class RecordingBuffer(Region):
+    """Base class for recording regions whose samples are stored in an SDRAM
+    ring buffer, corresponding to `recording_buffer.h`.
+
+    The region consists of header words, a bitfield of the indices to
+    record, a control block and then the ring buffer. Each slot of the ring
+    buffer contains the tick a sample was recorded in followed by the sample.
+    If `buffer_time` is specified, the ring buffer only holds that many ms of
+    samples and must be drained by the host while the simulation is running.
+    """
+    # Format of control block: capacity, write index,
+    # read index and overflow count, corresponding to ControlWord
+    control_format = "4I"
+
+    # Number of header words preceding indices bitfield
+    num_header_words = 1
+
+    def __init__(self, indices_to_record, sample_ticks, simulation_ticks,
+                 sim_timestep_ms, buffer_time):
+        self.indices_to_record = indices_to_record
+        self.sample_ticks = sample_ticks
+        self.simulation_ticks = simulation_ticks
+
+        # Convert simulation duration into a number of samples
+        self.num_samples = int(math.ceil(
+            float(simulation_ticks) / float(sample_ticks)))
+
+        # Convert buffer time to ticks, leaving it as None if no buffer
+        # time is specified or the buffer can hold the entire simulation
+        self.buffer_ticks = None
+        if buffer_time is not None:
+            buffer_ticks = int(math.ceil(
+                float(buffer_time) / float(sim_timestep_ms)))
+            if buffer_ticks < simulation_ticks:
+                self.buffer_ticks = buffer_ticks
+
+        # Samples drained from each vertex's buffer and drain statistics
+        # **NOTE** these are keyed by the start and stop of the vertex slice
+        self._drained = defaultdict(list)
+        self._statistics = defaultdict(lambda: {"samples_drained": 0,
+                                                "max_occupancy": 0,
+                                                "overflows": 0})
+
+    # --------------------------------------------------------------------------
+    # Region methods
+    # --------------------------------------------------------------------------
+    def sizeof(self, vertex_slice):
+        """Get the size requirements of the region in bytes.
+
+        Parameters
+        ----------
+        vertex_slice : :py:func:`slice`
+            A slice object which indicates which rows, columns or other
+            elements of the region should be included.
+
+        Returns
+        -------
+        int
+            The number of bytes required to store the data in the given slice
+            of the region.
+        """
+        # Header words, indices bitfield and control block
+        size = self._get_data_offset(vertex_slice)
+
+        # If any neurons are recorded, add a
+        # tick word and sample to each slot
+        sample_words = self._get_vertex_sample_words(vertex_slice)
+        if sample_words > 0:
+            size += (sample_words + 1) * 4 * self._get_capacity(vertex_slice)
+
+        return size
+
+    def write_subregion_to_file(self, fp, vertex_slice):
+        """Write a portion of the region to a file applying the formatter.
+
+        Parameters
+        ----------
+        fp : file-like object
+            The file-like object to which data from the region will be written.
+            This must support a `write` method.
+        vertex_slice : :py:func:`slice`
+            A slice object which indicates which rows, columns or other
+            elements of the region should be included.
+        """
+        # Slice out the vertex indices to record
+        vertex_indices = self.indices_to_record[vertex_slice.python_slice]
+
+        # Write header words
+        fp.write(struct.pack("%uI" % self.num_header_words,
+                             *self._get_header_words(vertex_indices)))
+
+        # Write bitfield to file, padded to a whole number of words
+        # **NOTE** as the control block follows the bitfield, unlike the
+        # bits past the last neuron, the padding bytes matter
+        indices_bytes = vertex_indices.tobytes()
+        indices_words = calc_slice_bitfield_words(vertex_slice)
+        fp.write(indices_bytes.ljust(indices_words * 4, b"\0"))
+
+        # Write control block with empty buffer
+        fp.write(struct.pack(self.control_format,
+                             self._get_capacity(vertex_slice), 0, 0, 0))
+
+    # --------------------------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------------------------
+    def drain(self, vertex_slice, region_memory, running=True):
+        """Drain samples recorded by a vertex from its ring buffer.
+
+        Parameters
+        ----------
+        vertex_slice : :py:class:`~pynn_spinnaker.spinnaker.utils.UnitStrideSlice`
+            Slice of neurons simulated by vertex.
+        region_memory : file-like object
+            Memory of the region in which vertex records.
+        running : bool
+            Is the simulation still running? If so, the most recent
+            sample is left in the buffer as it may still be being written.
+
+        Returns
+        -------
+        int
+            Number of samples drained.
+        """
+        # If no neurons in this vertex are recorded, there's nothing to drain
+        if self._get_vertex_sample_words(vertex_slice) == 0:
+            return 0
+
+        # Read control block
+        write_index, read_index, overflows = self._read_control(
+            vertex_slice, region_memory)
+
+        # Update statistics
+        # **NOTE** indices are free-running 32-bit counters
+        stats = self._statistics[(vertex_slice.start, vertex_slice.stop)]
+        occupancy = (write_index - read_index) & 0xFFFFFFFF
+        stats["max_occupancy"] = max(stats["max_occupancy"], occupancy)
+        stats["overflows"] = overflows
+
+        # Determine how many samples can be drained
+        num_samples = max(0, occupancy - 1) if running else occupancy
+        if num_samples == 0:
+            return 0
+
+        # Add samples to those already drained from this vertex
+        self._drained[(vertex_slice.start, vertex_slice.stop)].append(
+            self._read_slots(vertex_slice, region_memory,
+                             read_index, num_samples))
+
+        # Advance read index to free the slots that have been drained
+        region_memory.seek(self._get_data_offset(vertex_slice) - 8)
+        region_memory.write(struct.pack(
+            "I", (read_index + num_samples) & 0xFFFFFFFF))
+
+        stats["samples_drained"] += num_samples
+        return num_samples
+
+    def get_statistics(self, vertex_slices):
+        """Get statistics about how samples recorded by vertices were drained.
+
+        Parameters
+        ----------
+        vertex_slices : iterable
+            Slices of neurons simulated by vertices.
+
+        Returns
+        -------
+        dict
+            Total number of samples drained, maximum number of samples
+            found waiting in any one ring buffer and total number of
+            samples dropped because ring buffers were full.
+        """
+        stats = [self._statistics[(s.start, s.stop)] for s in vertex_slices]
+        return {
+            "samples_drained": sum(s["samples_drained"] for s in stats),
+            "max_occupancy": max([s["max_occupancy"] for s in stats] + [0]),
+            "overflows": sum(s["overflows"] for s in stats)}
+
+    # --------------------------------------------------------------------------
+    # Public properties
+    # --------------------------------------------------------------------------
+    @property
+    def streaming(self):
+        """Must the ring buffer be drained while the simulation is running?"""
+        return self.buffer_ticks is not None
+
+    # --------------------------------------------------------------------------
+    # Private methods
+    # --------------------------------------------------------------------------
+    def _get_header_words(self, vertex_indices):
+        raise NotImplementedError()
+
+    def _get_sample_words(self, num_recorded):
+        raise NotImplementedError()
+
+    def _get_capacity(self, vertex_slice):
+        # If buffer holds entire simulation, it needs a slot for each sample
+        if self.buffer_ticks is None:
+            return self.num_samples
+        # Otherwise, it needs a slot for each sample in buffer time
+        # **NOTE** the host never drains the most recent sample as it may
+        # still be being written so the buffer must hold at least two
+        else:
+            buffer_samples = int(math.ceil(
+                float(self.buffer_ticks) / float(self.sample_ticks)))
+            return min(self.num_samples, max(2, buffer_samples))
+
+    def _get_vertex_sample_words(self, vertex_slice):
+        # Count the vertex indices to record
+        vertex_indices = self.indices_to_record[vertex_slice.python_slice]
+        return self._get_sample_words(vertex_indices.count())
+
+    def _get_data_offset(self, vertex_slice):
+        # Header words, indices bitfield and control block
+        return ((self.num_header_words * 4) +
+                (calc_slice_bitfield_words(vertex_slice) * 4) +
+                struct.calcsize(self.control_format))
+
+    def _read_control(self, vertex_slice, region_memory):
+        # Read write index, read index and overflow count from control block
+        control_size = struct.calcsize(self.control_format)
+        region_memory.seek(self._get_data_offset(vertex_slice) - control_size)
+        return struct.unpack(self.control_format,
+                             region_memory.read(control_size))[1:]
+
+    def _read_slots(self, vertex_slice, region_memory, index, num_samples):
+        # Read samples, splitting the read in two if it wraps around
+        sample_words = self._get_vertex_sample_words(vertex_slice)
+        data_offset = self._get_data_offset(vertex_slice)
+        capacity = self._get_capacity(vertex_slice)
+        slot_bytes = (sample_words + 1) * 4
+        first_slot = index % capacity
+        num_first_samples = min(num_samples, capacity - first_slot)
+        region_memory.seek(data_offset + (first_slot * slot_bytes))
+        data = region_memory.read(num_first_samples * slot_bytes)
+        if num_first_samples < num_samples:
+            region_memory.seek(data_offset)
+            data += region_memory.read(
+                (num_samples - num_first_samples) * slot_bytes)
+
+        # Convert to array with a row per slot
+        data = np.fromstring(data, dtype=np.uint32)
+        return data.reshape((-1, sample_words + 1))
+
+    def _find_slot(self, vertex_slice, region_memory, index, num_samples,
+                   tick):
+        # Binary search for the first of the samples in the ring buffer
+        # recorded at or after tick, reading only the tick of each slot
+        # **NOTE** samples are written in tick order
+        data_offset = self._get_data_offset(vertex_slice)
+        capacity = self._get_capacity(vertex_slice)
+        slot_bytes = (self._get_vertex_sample_words(vertex_slice) + 1) * 4
+        lo, hi = 0, num_samples
+        while lo < hi:
+            mid = (lo + hi) // 2
+            region_memory.seek(data_offset +
+                               (((index + mid) % capacity) * slot_bytes))
+            if struct.unpack("I", region_memory.read(4))[0] < tick:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _read_samples(self, vertex_slice, region_memory, tick_window=None):
+        # If no window is specified, drain any samples remaining in buffer
+        if tick_window is None:
+            self.drain(vertex_slice, region_memory, running=False)
+
+        # Stack all samples drained from this vertex and
+        # replace list with stacked array so it's only stacked once
+        key = (vertex_slice.start, vertex_slice.stop)
+        sample_words = self._get_vertex_sample_words(vertex_slice)
+        if len(self._drained[key]) == 0:
+            data = np.empty((0, sample_words + 1), dtype=np.uint32)
+        else:
+            data = np.vstack(self._drained[key])
+            self._drained[key] = [data]
+
+        # If a window is specified
+        if tick_window is not None:
+            start_tick, stop_tick = tick_window
+
+            # Select the samples already drained that fall within it
+            data = data[(data[:, 0] >= start_tick) & (data[:, 0] < stop_tick)]
+
+            # Find the range of samples remaining in the buffer which fall
+            # within window and read only these, leaving buffer untouched
+            if sample_words > 0:
+                write_index, read_index, _ = self._read_control(
+                    vertex_slice, region_memory)
+                num_samples = (write_index - read_index) & 0xFFFFFFFF
+                first = self._find_slot(vertex_slice, region_memory,
+                                        read_index, num_samples, start_tick)
+                last = first + self._find_slot(
+                    vertex_slice, region_memory, read_index + first,
+                    num_samples - first, stop_tick)
+                if last > first:
+                    data = np.vstack((data, self._read_slots(
+                        vertex_slice, region_memory, read_index + first,
+                        last - first)))
+
+        # Split into ticks and samples
+        return data[:, 0], data[:, 1:]
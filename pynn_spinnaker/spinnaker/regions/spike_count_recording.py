@@ -0,0 +1,106 @@
+# Import modules
+import numpy as np
+
+# Import classes
+from rig_cpp_common.regions import Region
+
+# Import functions
+from ..utils import calc_slice_bitfield_words
+
+
+# ------------------------------------------------------------------------------
+# SpikeCountRecording
+# ------------------------------------------------------------------------------
+class SpikeCountRecording(Region):
+    """Region in which a vertex counts the spikes emitted by each recorded
+    neuron, corresponding to `spike_count_recording.h`.
+
+    The region consists of a bitfield of the indices to record followed by
+    a count for each recorded neuron which the vertex increments in place.
+    """
+    def __init__(self, indices_to_record):
+        self.indices_to_record = indices_to_record["spike_count"]
+
+    # --------------------------------------------------------------------------
+    # Region methods
+    # --------------------------------------------------------------------------
+    def sizeof(self, vertex_slice):
+        """Get the size requirements of the region in bytes.
+
+        Parameters
+        ----------
+        vertex_slice : :py:func:`slice`
+            A slice object which indicates which rows, columns or other
+            elements of the region should be included.
+
+        Returns
+        -------
+        int
+            The number of bytes required to store the data in the given slice
+            of the region.
+        """
+        # Indices bitfield followed by a count for each recorded neuron
+        num_recorded = self.indices_to_record[vertex_slice.python_slice].count()
+        return (calc_slice_bitfield_words(vertex_slice) + num_recorded) * 4
+
+    def write_subregion_to_file(self, fp, vertex_slice):
+        """Write a portion of the region to a file applying the formatter.
+
+        Parameters
+        ----------
+        fp : file-like object
+            The file-like object to which data from the region will be written.
+            This must support a `write` method.
+        vertex_slice : :py:func:`slice`
+            A slice object which indicates which rows, columns or other
+            elements of the region should be included.
+        """
+        # Slice out the vertex indices to record
+        vertex_indices = self.indices_to_record[vertex_slice.python_slice]
+
+        # Write bitfield to file, padded to a whole number of words
+        indices_bytes = vertex_indices.tobytes()
+        indices_words = calc_slice_bitfield_words(vertex_slice)
+        fp.write(indices_bytes.ljust(indices_words * 4, b"\0"))
+
+        # Write zeroed count for each recorded neuron
+        fp.write(b"\0" * (vertex_indices.count() * 4))
+
+    # --------------------------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------------------------
+    def read_counts(self, vertex_slice, region_memory):
+        """Read spike counts recorded by a vertex.
+
+        Parameters
+        ----------
+        vertex_slice : :py:class:`~pynn_spinnaker.spinnaker.utils.UnitStrideSlice`
+            Slice of neurons simulated by vertex.
+        region_memory : file-like object
+            Memory of the region in which vertex counted spikes.
+
+        Returns
+        -------
+        (:py:class:`numpy.ndarray`, :py:class:`numpy.ndarray`)
+            Sorted population indices of the recorded neurons
+            and the number of spikes each one emitted.
+        """
+        # Get the indices within this vertex that were recorded
+        vertex_indices = self.indices_to_record[vertex_slice.python_slice]
+
+        # If no neurons were recorded, return empty arrays
+        num_recorded = vertex_indices.count()
+        if num_recorded == 0:
+            return (np.empty(0, dtype=int), np.empty(0, dtype=np.uint32))
+
+        # Read counts which follow the indices bitfield
+        region_memory.seek(calc_slice_bitfield_words(vertex_slice) * 4)
+        counts = np.fromstring(region_memory.read(num_recorded * 4),
+                               dtype=np.uint32)
+
+        # Get the population indices of recorded neurons
+        recorded_indices = np.flatnonzero(
+            np.frombuffer(vertex_indices.unpack(), dtype=np.uint8))
+        recorded_indices += vertex_slice.start
+
+        return recorded_indices, counts
@@ -0,0 +1,51 @@
+# Import modules
+import struct
+
+# Import classes
+from rig_cpp_common.regions import Region
+
+
+# ------------------------------------------------------------------------------
+# SpikeInjectionBuffer
+# ------------------------------------------------------------------------------
+class SpikeInjectionBuffer(Region):
+    def __init__(self, cell_type, parameters, initial_values,
+                 sim_timestep_ms, pop_size):
+        # Cache number of spikes injector cores should be able to buffer
+        self.buffer_spikes = cell_type._injection_buffer_spikes
+
+    # --------------------------------------------------------------------------
+    # Region methods
+    # --------------------------------------------------------------------------
+    def sizeof(self, vertex_slice):
+        """Get the size requirements of the region in bytes.
+
+        Parameters
+        ----------
+        vertex_slice : :py:func:`slice`
+            A slice object which indicates which rows, columns or other
+            elements of the region should be included.
+
+        Returns
+        -------
+        int
+            The number of bytes required to store the data in the given slice
+            of the region.
+        """
+        # Buffer capacity
+        return 4
+
+    def write_subregion_to_file(self, fp, vertex_slice):
+        """Write a portion of the region to a file applying the formatter.
+
+        Parameters
+        ----------
+        fp : file-like object
+            The file-like object to which data from the region will be written.
+            This must support a `write` method.
+        vertex_slice : :py:func:`slice`
+            A slice object which indicates which rows, columns or other
+            elements of the region should be included.
+        """
+        # Write data to filelike
+        fp.write(struct.pack("I", self.buffer_spikes))
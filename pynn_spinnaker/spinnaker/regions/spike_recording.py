@@ -1,127 +1,164 @@
 # Import modules
+import enum
+import math
 import numpy as np
-import struct
 
 # Import classes
-from rig_cpp_common.regions import Region
+from recording_buffer import RecordingBuffer
 
 # Import functions
-from ..utils import (calc_bitfield_words, calc_slice_bitfield_words)
+from ..utils import calc_bitfield_words
 
 
 # ------------------------------------------------------------------------------
-# SpikeRecording
+# SpikeRecordingFormat
 # ------------------------------------------------------------------------------
-class SpikeRecording(Region):
-    def __init__(self, indices_to_record, sim_timestep_ms, simulation_ticks):
-        self.indices_to_record = indices_to_record["spikes"]
-        self.sim_timestep_ms = sim_timestep_ms
-        self.simulation_ticks = simulation_ticks
+class SpikeRecordingFormat(enum.IntEnum):
+    """Spike recording formats, corresponding to those in spike_recording.h"""
+    # A bitfield with a bit for each recorded neuron every tick
+    bitfield = 0
 
-    # --------------------------------------------------------------------------
-    # Region methods
-    # --------------------------------------------------------------------------
-    def sizeof(self, vertex_slice):
-        """Get the size requirements of the region in bytes.
+    # A (tick, recorded neuron index) event for each spike
+    event_list = 1
 
-        Parameters
-        ----------
-        vertex_slice : :py:func:`slice`
-            A slice object which indicates which rows, columns or other
-            elements of the region should be included.
 
-        Returns
-        -------
-        int
-            The number of bytes required to store the data in the given slice
-            of the region.
-        """
-        #
-        # Determine how many bytes are required for each neuron in slice
-        indices_bytes = calc_slice_bitfield_words(vertex_slice) * 4
-
-        # Slice out the vertex indices to record
-        vertex_indices = self.indices_to_record[vertex_slice.python_slice]
+# ------------------------------------------------------------------------------
+# SpikeRecording
+# ------------------------------------------------------------------------------
+class SpikeRecording(RecordingBuffer):
+    # Spike recording header contains format and number of words per sample
+    num_header_words = 2
 
-        # Each sample is a word-aligned bitfield
-        # with a bit for each neuron in slice
-        sample_bytes = calc_bitfield_words(vertex_indices.count()) * 4
+    # How many times more events than would be emitted by neurons
+    # firing at their mean firing rate should event lists hold
+    event_list_headroom = 2.0
 
-        # Header word specifiying how many words are in each sample, indices
-        # bit field and a sample bit field for each simulation tick
-        return 4 + indices_bytes + (sample_bytes * self.simulation_ticks)
+    # Minimum number of events event lists should hold
+    min_event_list_capacity = 64
 
-    def write_subregion_to_file(self, fp, vertex_slice):
-        """Write a portion of the region to a file applying the formatter.
+    def __init__(self, indices_to_record, sim_timestep_ms, simulation_ticks,
+                 buffer_time=None, recording_format="bitfield",
+                 mean_firing_rate=10.0):
+        # Spikes are sampled every tick
+        super(SpikeRecording, self).__init__(
+            indices_to_record["spikes"], 1, simulation_ticks,
+            sim_timestep_ms, buffer_time)
 
-        Parameters
-        ----------
-        fp : file-like object
-            The file-like object to which data from the region will be written.
-            This must support a `write` method.
-        vertex_slice : :py:func:`slice`
-            A slice object which indicates which rows, columns or other
-            elements of the region should be included.
-        """
-        # Slice out the vertex indices to record
-        vertex_indices = self.indices_to_record[vertex_slice.python_slice]
+        self.sim_timestep_ms = sim_timestep_ms
 
-        # Write number of words required to contain a suitable bitfield
-        fp.write(struct.pack("I", calc_bitfield_words(vertex_indices.count())))
+        # Look up format by name
+        # **NOTE** event lists are only used if explicitly requested as
+        # spikes emitted beyond their capacity are dropped
+        self.recording_format = SpikeRecordingFormat[recording_format]
 
-        # Write bitfield to file
-        # **NOTE** as there's no neurons after this,
-        # the word-aligned bits don't matter
-        fp.write(vertex_indices.tobytes())
+        # Convert mean firing rate to spikes per tick
+        self.mean_spikes_per_tick =\
+            float(mean_firing_rate) * float(sim_timestep_ms) / 1000.0
 
     # --------------------------------------------------------------------------
     # Public API
     # --------------------------------------------------------------------------
-    def read_spike_times(self, vertex_slice, region_memory):
+    def read_spikes(self, vertex_slice, region_memory, tick_window=None):
+        """Read spikes recorded by a vertex.
+
+        Parameters
+        ----------
+        vertex_slice : :py:class:`~pynn_spinnaker.spinnaker.utils.UnitStrideSlice`
+            Slice of neurons simulated by vertex.
+        region_memory : file-like object
+            Memory of the region in which vertex recorded spikes.
+        tick_window : (int, int) or None
+            If specified, only spikes emitted at or after the first
+            tick and before the second are read from memory.
+
+        Returns
+        -------
+        (:py:class:`numpy.ndarray`, :py:class:`numpy.ndarray`)
+            Population indices of the neurons which spiked and the times
+            in ms at which they did so, sorted by index and then time.
+        """
         # Get the indices within this vertes that were recorded
         vertex_indices = self.indices_to_record[vertex_slice.python_slice]
 
-        # Determine how many bytes each bitfield sample will be
+        # If no neurons were recorded, return empty arrays
         num_bits = vertex_indices.count()
-        sample_bytes = calc_bitfield_words(num_bits) * 4
+        if num_bits == 0:
+            return (np.empty(0, dtype=int), np.empty(0, dtype=np.float32))
 
-        # Seek to start of recording memory
-        region_memory.seek(4 + (calc_slice_bitfield_words(vertex_slice) * 4))
+        # Read ticks and samples which have a row of words per tick
+        ticks, data = self._read_samples(vertex_slice, region_memory,
+                                         tick_window)
 
-        # Read data from memory
-        data = region_memory.read(sample_bytes * self.simulation_ticks)
+        # Get the population indices of recorded neurons
+        recorded_indices = np.flatnonzero(
+            np.frombuffer(vertex_indices.unpack(), dtype=np.uint8))
+        recorded_indices += vertex_slice.start
 
-        # Load into numpy
-        data = np.fromstring(data, dtype=np.uint8)
+        # If vertex recorded spikes as an event list, each sample
+        # contains the recorded neuron index of a single spike
+        if self.recording_format == SpikeRecordingFormat.event_list:
+            indices = recorded_indices[data[:, 0]]
+            times = ticks.astype(np.float32)
+            times *= self.sim_timestep_ms
 
-        # Swap endianness
-        data = data.view(dtype=np.uint32).byteswap().view(dtype=np.uint8)
+            # Spikes are in time order so stable sort by index
+            order = np.argsort(indices, kind="mergesort")
+            return indices[order], times[order]
 
-        # Reverse bit order within each word
-        data = np.fliplr(np.unpackbits(data).reshape(-1, 32))
+        # Find the words which contain any spikes
+        spike_ticks, spike_words = np.nonzero(data)
 
-        # Finally reshape into a sample shaped vector
-        data = data.reshape((-1, sample_bytes * 8))
+        # Expand these words into bits and find the set ones
+        bits = ((data[spike_ticks, spike_words][:, np.newaxis] >>
+                 np.arange(32, dtype=np.uint32)) & 1)
+        word_spikes, word_bits = np.nonzero(bits)
 
-        # Loop through bits of vertex indices
-        # **YUCK** this seems mega-innefficient
-        spike_times = {}
-        for i, b in enumerate(vertex_indices):
-            # If bit is set
-            if b:
-                # Extract spike vector column
-                # **THINK** is this the right i
-                vector = data[:, i]
+        # Convert bits back into the population indices of recorded neurons
+        indices = recorded_indices[(spike_words[word_spikes] * 32) + word_bits]
 
-                # Find times where neuron fired
-                times = np.where(vector == 1)[0]
+        # Scale ticks into floating point ms
+        times = ticks[spike_ticks[word_spikes]].astype(np.float32)
+        times *= self.sim_timestep_ms
 
-                # Scale these into floating point ms
-                times = times.astype(np.float32, copy=False)
-                times *= self.sim_timestep_ms
+        # Spikes are in time order so stable sort by index
+        order = np.argsort(indices, kind="mergesort")
+        return indices[order], times[order]
 
-                # Add to dictionary
-                spike_times[i + vertex_slice.start] = times
-
-        # Return dictionary of spike times
-        return spike_times
+    # --------------------------------------------------------------------------
+    # Private methods
+    # --------------------------------------------------------------------------
+    def _get_header_words(self, vertex_indices):
+        # Header specifies format and how many words are in each sample
+        num_recorded = vertex_indices.count()
+        return (self.recording_format,
+                self._get_sample_words(num_recorded))
+
+    def _get_sample_words(self, num_recorded):
+        # If no neurons are recorded, no samples are required
+        if num_recorded == 0:
+            return 0
+        # Otherwise, if spikes are recorded as an event list,
+        # each sample contains the index of one recorded neuron
+        elif self.recording_format == SpikeRecordingFormat.event_list:
+            return 1
+        # Otherwise, each sample is a word-aligned bitfield
+        # with a bit for each recorded neuron
+        else:
+            return calc_bitfield_words(num_recorded)
+
+    def _get_capacity(self, vertex_slice):
+        # If spikes are recorded as a bitfield, there is a sample per tick
+        if self.recording_format == SpikeRecordingFormat.bitfield:
+            return super(SpikeRecording, self)._get_capacity(vertex_slice)
+
+        # Otherwise, there's a sample for each spike so size buffer based on
+        # the number of spikes expected to be emitted within the buffer time
+        num_recorded = self.indices_to_record[vertex_slice.python_slice].count()
+        buffer_ticks = (self.simulation_ticks if self.buffer_ticks is None
+                        else self.buffer_ticks)
+        return self._get_event_list_capacity(num_recorded, buffer_ticks)
+
+    def _get_event_list_capacity(self, num_recorded, buffer_ticks):
+        expected_spikes = self.mean_spikes_per_tick * num_recorded * buffer_ticks
+        return max(self.min_event_list_capacity,
+                   int(math.ceil(expected_spikes * self.event_list_headroom)))
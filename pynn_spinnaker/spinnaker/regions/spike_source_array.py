@@ -1,4 +1,5 @@
 # Import modules
+import enum
 import logging
 import numpy as np
 import struct
@@ -9,13 +10,34 @@ from rig_cpp_common.regions import Region
 # Import functions
 from ..utils import calc_slice_bitfield_words
 
+# Import classes
+from ..utils import PayloadCache
+
 logger = logging.getLogger("pynn_spinnaker")
 
 
+# ----------------------------------------------------------------------------
+# SpikeSourceArrayFormat
+# ----------------------------------------------------------------------------
+class SpikeSourceArrayFormat(enum.IntEnum):
+    """Spike source array formats, corresponding to those in array_source.h"""
+    # A chain of (next tick, bitfield) blocks, one for every tick any neuron
+    # spikes, preceded by the tick of the first block
+    block = 0
+
+    # A stream of 16-bit tick deltas for each neuron, terminated with zero
+    delta = 1
+
+
 # ----------------------------------------------------------------------------
 # SpikeSourceArray
 # ----------------------------------------------------------------------------
 class SpikeSourceArray(Region):
+    # Deltas of this value advance a neuron's next spike
+    # tick by max_delta without emitting a spike
+    delta_escape = 0xFFFF
+    max_delta = 0xFFFE
+
     def __init__(self, cell_type, parameters, initial_values,
                  sim_timestep_ms, pop_size):
         # Cache spike times and timestep
@@ -25,6 +47,9 @@ class SpikeSourceArray(Region):
         # Set shape of spike times
         self.spike_times.shape = (pop_size,)
 
+        # Spike data encoded for each vertex, shared between sizing and writing
+        self._payloads = PayloadCache(self._encode)
+
     # --------------------------------------------------------------------------
     # Region methods
     # --------------------------------------------------------------------------
@@ -43,18 +68,7 @@ class SpikeSourceArray(Region):
             The number of bytes required to store the data in the given slice
             of the region.
         """
-        # Calculate the size of each spike block
-        # (1 extra word for next spike time)
-        spike_block_bytes = (calc_slice_bitfield_words(vertex_slice) + 1) * 4
-
-        # Find the largest number of spikes in any of the neurons in the slice
-        slice_spike_times = self.spike_times[vertex_slice.python_slice]
-        max_spike_blocks = max(s.max() if len(s.value) > 0 else 0
-                               for s in slice_spike_times)
-
-        # Total size is a single word to specify time of first spike
-        # block and maximum number of spike blocks required
-        return 4 + int(max_spike_blocks * spike_block_bytes)
+        return len(self._payloads.get(vertex_slice))
 
     def write_subregion_to_file(self, fp, vertex_slice):
         """Write a portion of the region to a file applying the formatter.
@@ -68,74 +82,152 @@ class SpikeSourceArray(Region):
             A slice object which indicates which rows, columns or other
             elements of the region should be included.
         """
-        # Get slice of spike times for this vertex
-        slice_spike_times = self.spike_times[vertex_slice.python_slice]
+        # Write encoded spike data, removing it from the cache
+        # as it shouldn't be required again once written
+        fp.write(self._payloads.get(vertex_slice))
+        self._payloads.evict(vertex_slice)
 
-        # Determine time of last spike and convert to ms
-        max_time_ms = max(s.max() if len(s.value) > 0 else 0
-                          for s in slice_spike_times)
-        max_timestep = int(round(max_time_ms / self.sim_timestep_ms))
+    # --------------------------------------------------------------------------
+    # Private methods
+    # --------------------------------------------------------------------------
+    def _encode(self, vertex_slice):
+        # Encode spike data in most compact format
+        spike_format, spike_data = self._encode_spike_data(vertex_slice)
+        logger.debug("\t\t\tFormat %s", spike_format.name)
 
-        # Build mask array to hold spikes
-        vertex_words = calc_slice_bitfield_words(vertex_slice)
-        spike_vector = np.zeros((max_timestep + 1,
-                                 vertex_words * 32), dtype=np.uint8)
+        # Data consists of a single word to specify
+        # the format followed by the spike data
+        return struct.pack("I", spike_format) + spike_data.tostring()
 
-        # Loop through neurons
-        num_multiple_spikes = 0
-        for i, s in enumerate(slice_spike_times):
-            # Round spiketimes to nearest timestep and
-            # bin to create spike vector
-            n_spike_vector = np.bincount(
-                np.rint(s.value / self.sim_timestep_ms).astype(int))
+    def _encode_spike_data(self, vertex_slice):
+        # Get timesteps and neurons of all spikes emitted by vertex
+        neurons, timesteps = self._get_slice_spikes(vertex_slice)
 
-            # Add count of timesteps in which multiple
-            # spikes are specified to total
-            num_multiple_spikes += (n_spike_vector > 1).sum()
+        # Calculate words required to encode spikes as blocks - a first
+        # timestep word followed by a block for every spiking timestep
+        vertex_words = calc_slice_bitfield_words(vertex_slice)
+        num_blocks = len(np.unique(timesteps))
+        block_words = 1 + (num_blocks * (vertex_words + 1))
+
+        # Calculate words required to encode spikes as
+        # deltas - a 16-bit delta for each spike, along with any
+        # required escapes, and a terminator for each neuron
+        delta_neurons, deltas = self._get_deltas(neurons, timesteps)
+        num_neurons = vertex_slice.stop - vertex_slice.start
+        num_escapes = np.sum((deltas - 1) // self.max_delta)
+        num_halfwords = len(deltas) + num_escapes + num_neurons
+        delta_words = (num_halfwords + 1) // 2
+
+        # Encode spikes in smallest format
+        # **NOTE** blocks are preferred if sizes are equal as
+        # they are read by DMA rather than directly from SDRAM
+        if delta_words < block_words:
+            return (SpikeSourceArrayFormat.delta,
+                    self._build_delta_streams(vertex_slice, delta_neurons,
+                                              deltas, num_halfwords))
+        else:
+            return (SpikeSourceArrayFormat.block,
+                    self._build_spike_blocks(vertex_words, neurons,
+                                             timesteps))
 
-            # Copy bit vector into mask array
-            spike_vector[0:len(n_spike_vector), i] = (n_spike_vector > 0)
+    def _get_slice_spikes(self, vertex_slice):
+        # Get slice of spike times for this vertex
+        slice_spike_times = self.spike_times[vertex_slice.python_slice]
 
+        # Round each neuron's spike times to the nearest timestep
+        neuron_timesteps = [np.rint(s.value / self.sim_timestep_ms).astype(int)
+                            for s in slice_spike_times]
+
+        # Flatten into arrays of spike timesteps and the neurons they belong to
+        neurons = np.repeat(np.arange(len(neuron_timesteps)),
+                            [len(t) for t in neuron_timesteps])
+        timesteps = (np.empty(0, dtype=int) if len(neurons) == 0
+                     else np.hstack(neuron_timesteps))
+
+        # Sort spikes by timestep and then neuron
+        order = np.lexsort((neurons, timesteps))
+        neurons = neurons[order]
+        timesteps = timesteps[order]
+
+        # Find spikes which are in the same timestep as
+        # the previous spike emitted by the same neuron
+        duplicate = np.zeros(len(neurons), dtype=bool)
+        duplicate[1:] = ((timesteps[1:] == timesteps[:-1]) &
+                         (neurons[1:] == neurons[:-1]))
+
+        # Count timesteps in which neurons have multiple spikes
+        num_multiple_spikes = np.count_nonzero(duplicate[1:] &
+                                               ~duplicate[:-1])
         if num_multiple_spikes > 0:
             logger.warn("Spike source array spike data contains %u "
                         "%f ms timesteps, in which there are multiple spikes. "
                         "These will each be treated as single spikes",
                         num_multiple_spikes, self.sim_timestep_ms)
 
-        # Determine which columns have any spike blocks associated
-        timestep_mask = np.any(spike_vector, axis=1)
-
-        # Get timesteps in which there are spike blocks
-        timesteps = np.where(timestep_mask)[0]
-
-        # If there are no spike blocks, write magic number to signify
+        # Remove duplicate spikes
+        return neurons[~duplicate], timesteps[~duplicate]
+
+    def _get_deltas(self, neurons, timesteps):
+        # Calculate the delta between each spike and the previous spike
+        # emitted by the same neuron, or tick -1 if it's the neuron's first
+        # **NOTE** as spikes are sorted by timestep and duplicates are
+        # removed, stable sorting by neuron orders each neuron's spikes
+        # by timestep and means every delta is at least one
+        order = np.argsort(neurons, kind="mergesort")
+        neurons = neurons[order]
+        timesteps = timesteps[order]
+
+        previous = np.empty(len(timesteps), dtype=timesteps.dtype)
+        previous[0:1] = -1
+        previous[1:] = np.where(neurons[1:] == neurons[:-1],
+                                timesteps[:-1], -1)
+        return neurons, timesteps - previous
+
+    def _build_delta_streams(self, vertex_slice, neurons,
+                             deltas, num_halfwords):
+        # Calculate how many escapes are required before each delta
+        num_escapes = (deltas - 1) // self.max_delta
+
+        # Calculate index of each spike's final delta in the stream,
+        # taking into account escapes and preceding neurons' terminators
+        spike_end = np.cumsum(num_escapes + 1)
+        delta_indices = spike_end - 1 + neurons
+
+        # Calculate index of each neuron's terminator
+        num_neurons = vertex_slice.stop - vertex_slice.start
+        neuron_end = np.searchsorted(neurons, np.arange(num_neurons),
+                                     side="right")
+        terminator_indices = np.append(0, spike_end)[neuron_end] +\
+            np.arange(num_neurons)
+
+        # Build streams of escapes, padded to a whole number of words,
+        # then fill in the remaining delta of each spike and terminators
+        streams = np.empty(num_halfwords + (num_halfwords % 2),
+                           dtype=np.uint16)
+        streams.fill(self.delta_escape)
+        streams[delta_indices] = deltas - (num_escapes * self.max_delta)
+        streams[terminator_indices] = 0
+        streams[num_halfwords:] = 0
+        return streams
+
+    def _build_spike_blocks(self, vertex_words, neurons, timesteps):
+        # If there are no spikes, return magic number
+        # to signify that there are no spike blocks
         if len(timesteps) == 0:
-            fp.write(struct.pack("I", 0xFFFFFFFF))
-        # Otherwise
-        else:
-            spike_vector = spike_vector[timestep_mask, :]
-
-            # Seperate out first timestep from the next timesteps
-            # to be  written with each spike block
-            first_timestep = timesteps[0]
-            next_timesteps = np.append(timesteps[1:], 0xFFFFFFFF)
-            logger.debug("\t\t\tFirst timestep %u", first_timestep)
-
-            # Reverse bit order within each word
-            spike_vector = np.fliplr(spike_vector.reshape(-1, 32))
-
-            # Pack into bytes and swap word endianess
-            spike_vector = np.packbits(spike_vector, axis=1)
-            spike_vector = spike_vector.view(dtype=np.uint32).byteswap()
-
-            # Reshape spike vectors into rows for each timestep
-            spike_vector = spike_vector.reshape(-1, vertex_words)
-
-            # Stack spike vector next to next timesteps to form spike blocks
-            # **NOTE** cast to uint32 as np.where dumps out int64
-            spike_blocks = np.hstack((next_timesteps[:, np.newaxis],
-                                    spike_vector)).astype(np.uint32)
-
-            # Write first timestep followed by spike blocks
-            fp.write(struct.pack("I", first_timestep))
-            fp.write(spike_blocks.tostring())
+            return np.asarray([0xFFFFFFFF], dtype=np.uint32)
+
+        # Group spikes by timestep
+        block_timesteps, block_indices = np.unique(timesteps,
+                                                   return_inverse=True)
+
+        # Build spike blocks consisting of the timestep of the next spike
+        # block followed by a bitfield of the neurons which spike
+        spike_blocks = np.zeros((len(block_timesteps), vertex_words + 1),
+                                dtype=np.uint32)
+        spike_blocks[:-1, 0] = block_timesteps[1:]
+        spike_blocks[-1, 0] = 0xFFFFFFFF
+        np.bitwise_or.at(spike_blocks, (block_indices, 1 + (neurons // 32)),
+                         np.left_shift(1, neurons % 32).astype(np.uint32))
+
+        # Precede spike blocks with timestep of first block
+        return np.append(np.uint32(block_timesteps[0]), spike_blocks)
@@ -1,23 +1,38 @@
 # Import modules
 import numpy as np
+import struct
+from .. import lazy_param_map
 
 # Import classes
-from parameter_space import ParameterSpace
+from rig_cpp_common.regions import Region
+from ..utils import PayloadCache
 
 # ------------------------------------------------------------------------------
 # SpikeSourcePoisson
 # ------------------------------------------------------------------------------
-class SpikeSourcePoisson(ParameterSpace):
+class SpikeSourcePoisson(Region):
     SeedWords = 4
 
     def __init__(self, cell_type, parameters, initial_values,
                  sim_timestep_ms, pop_size):
-        # Superclass
-        super(SpikeSourcePoisson, self).__init__(
-            None, cell_type._immutable_param_map,
-            parameters, initial_values, pop_size,
+        # Get each neuron's schedule of constant-rate epochs
+        # as parameters for all epochs and a count for each neuron
+        epoch_params, num_epochs = cell_type._get_rate_epochs(parameters,
+                                                              pop_size)
+
+        # Use immutable parameter map to transform
+        # epoch parameters into a record per epoch
+        self.epochs = lazy_param_map.apply(
+            epoch_params, cell_type._immutable_param_map, np.sum(num_epochs),
             sim_timestep_ms=sim_timestep_ms)
 
+        # Calculate the offset of each neuron's first epoch
+        self.epoch_offsets = np.zeros(pop_size + 1, dtype=int)
+        np.cumsum(num_epochs, out=self.epoch_offsets[1:])
+
+        # Schedules encoded for each vertex, shared between sizing and writing
+        self._payloads = PayloadCache(self._encode)
+
     # --------------------------------------------------------------------------
     # Region methods
     # --------------------------------------------------------------------------
@@ -36,10 +51,9 @@ class SpikeSourcePoisson(ParameterSpace):
             The number of bytes required to store the data in the given slice
             of the region.
         """
-        # Add size of seed to size of base class parameters
-        return (SpikeSourcePoisson.SeedWords * 4) +\
-            super(SpikeSourcePoisson, self).sizeof(vertex_slice)
-
+        # Add size of seed to encoded schedules
+        return ((SpikeSourcePoisson.SeedWords * 4) +
+                len(self._payloads.get(vertex_slice)))
 
     def write_subregion_to_file(self, fp, vertex_slice):
         """Write a portion of the region to a file applying the formatter.
@@ -53,12 +67,59 @@ class SpikeSourcePoisson(ParameterSpace):
             A slice object which indicates which rows, columns or other
             elements of the region should be included.
         """
-
         # Write seed
         seed = np.random.randint(
             0x7FFFFFFF, size=SpikeSourcePoisson.SeedWords).astype(np.uint32)
         fp.write(seed.tostring())
 
-        # Write parameter space to file
-        super(SpikeSourcePoisson, self).write_subregion_to_file(fp,
-                                                                vertex_slice)
+        # Write encoded schedules, removing them from the
+        # cache as they shouldn't be required again once written
+        fp.write(self._payloads.get(vertex_slice))
+        self._payloads.evict(vertex_slice)
+
+    # --------------------------------------------------------------------------
+    # Private methods
+    # --------------------------------------------------------------------------
+    def _encode(self, vertex_slice):
+        # Get unique epochs and the schedule of each neuron
+        epochs, schedules = self._get_slice_schedules(vertex_slice)
+
+        # Data consists of number of epochs, followed by schedules and epochs
+        return (struct.pack("I", len(epochs)) + schedules.tostring() +
+                epochs.tostring())
+
+    def _get_slice_schedules(self, vertex_slice):
+        # Loop through neurons in slice
+        unique_schedules = {}
+        epoch_slices = []
+        schedules = np.empty(len(vertex_slice),
+                             dtype=[("first", "u2"), ("count", "u2")])
+        num_epochs = 0
+        for i, n in enumerate(range(vertex_slice.start, vertex_slice.stop)):
+            # Get neuron's epochs
+            epoch_slice = slice(self.epoch_offsets[n],
+                                self.epoch_offsets[n + 1])
+            count = epoch_slice.stop - epoch_slice.start
+
+            # If an identical schedule has already been added, share its
+            # epochs, otherwise add this neuron's epochs after previous ones
+            key = self.epochs[epoch_slice].tostring()
+            first = unique_schedules.get(key)
+            if first is None:
+                first = num_epochs
+                unique_schedules[key] = first
+                epoch_slices.append(epoch_slice)
+                num_epochs += count
+
+            schedules[i] = (first, count)
+
+        # Check epoch indices fit in schedule
+        if num_epochs > 0xFFFF:
+            raise ValueError("Poisson sources simulated on one core can have "
+                             "at most %u distinct rate epochs" % 0xFFFF)
+
+        # Gather unique epochs
+        epochs = (np.hstack([self.epochs[s] for s in epoch_slices])
+                  if len(epoch_slices) > 0
+                  else self.epochs[0:0])
+        return epochs, schedules
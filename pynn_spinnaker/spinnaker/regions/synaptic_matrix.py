@@ -319,17 +319,21 @@ class SynapticMatrix(Region):
 
         return sub_matrix_props, sub_matrix_projs
 
+    def get_sub_matrix_request(self, pre_n_vert, post_s_vert, region_mem):
+        # Find the matrix properties and placement of sub-matrix
+        vert_matrix_prop, vert_matrix_placement =\
+            self._get_sub_matrix_placement(pre_n_vert, post_s_vert)
+
+        # Return request to read the bytes of the sub-matrix
+        # **NOTE** placement is in WORDS
+        return (region_mem, vert_matrix_placement * 4,
+                vert_matrix_prop.size_words * 4)
+
     def read_sub_matrix(self, pre_n_vert, post_s_vert, names,
                         region_mem, sim_timestep_ms, is_inhibitory):
         # Find the matrix properties and placement of sub-matrix
-        # associated with pre-synaptic neuron vertex
-        vert_matrix_prop, vert_matrix_placement = next((
-            (s, p) for s, p in zip(post_s_vert.sub_matrix_props,
-                                   post_s_vert.matrix_placements)
-            if s.key == pre_n_vert.routing_key),
-            (None, None))
-        assert vert_matrix_prop is not None
-        assert vert_matrix_placement is not None
+        vert_matrix_prop, vert_matrix_placement =\
+            self._get_sub_matrix_placement(pre_n_vert, post_s_vert)
 
         # Calculate the size of the ragged matrix
         num_rows = len(pre_n_vert.neuron_slice)
@@ -427,6 +431,19 @@ class SynapticMatrix(Region):
     # --------------------------------------------------------------------------
     # Private methods
     # --------------------------------------------------------------------------
+    def _get_sub_matrix_placement(self, pre_n_vert, post_s_vert):
+        # Find the matrix properties and placement of sub-matrix
+        # associated with pre-synaptic neuron vertex
+        vert_matrix_prop, vert_matrix_placement = next((
+            (s, p) for s, p in zip(post_s_vert.sub_matrix_props,
+                                   post_s_vert.matrix_placements)
+            if s.key == pre_n_vert.routing_key),
+            (None, None))
+        assert vert_matrix_prop is not None
+        assert vert_matrix_placement is not None
+
+        return vert_matrix_prop, vert_matrix_placement
+
     def _read_row(self, pre_idx, row_words, pre_slice, post_slice,
                   weight_to_float, dtype, negate_weights):
         num_synapses = row_words[0]
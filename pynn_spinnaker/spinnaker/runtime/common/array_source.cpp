@@ -12,6 +12,23 @@ bool ArraySource::ReadSDRAMData(uint32_t *region, uint32_t, unsigned int numNeur
 {
   LOG_PRINT(LOG_LEVEL_INFO, "ArraySource::ReadSDRAMData");
 
+  // Read format from first word
+  m_Format = (Format)*region++;
+  LOG_PRINT(LOG_LEVEL_INFO, "\tFormat:%u", m_Format);
+
+  // Read remainder of region using method appropriate to format
+  if(m_Format == FormatDelta)
+  {
+    return ReadDeltaSDRAMData(region, numNeurons);
+  }
+  else
+  {
+    return ReadBlockSDRAMData(region, numNeurons);
+  }
+}
+//-----------------------------------------------------------------------------
+bool ArraySource::ReadBlockSDRAMData(uint32_t *region, unsigned int numNeurons)
+{
   // Read the time of the next spike block and store pointer to the start of the spike data region
   m_NextSpikeTick = (uint)region[0];
   m_NextSpikeBlockAddress = &region[1];
@@ -37,11 +54,10 @@ bool ArraySource::ReadSDRAMData(uint32_t *region, uint32_t, unsigned int numNeur
     LOG_PRINT(LOG_LEVEL_INFO, "Synchronously copying first spike block into DMA buffer");
 
     // Synchronously copy next block into DMA buffer
+    // **NOTE** next spike block address is advanced when
+    // this block is processed, just as if it had been DMAed
     spin1_memcpy(m_DMABuffer, m_NextSpikeBlockAddress, numBytes);
 
-    // Advance next spike block address
-    m_NextSpikeBlockAddress += m_SpikeBlockSizeWords;
-
     // Set state to reflect that there is data already in the buffer
     m_State = StateSpikeBlockInBuffer;
 
@@ -81,4 +97,52 @@ bool ArraySource::DMATransferDone(uint tag)
     return false;
   }
 }
+//-----------------------------------------------------------------------------
+bool ArraySource::ReadDeltaSDRAMData(uint32_t *region, unsigned int numNeurons)
+{
+  // Allocate arrays to hold the tick at which each neuron
+  // next spikes and a pointer to its next delta
+  m_NeuronNextSpikeTick = (uint*)spin1_malloc(numNeurons * sizeof(uint));
+  if(m_NeuronNextSpikeTick == NULL)
+  {
+    LOG_PRINT(LOG_LEVEL_ERROR, "Unable to allocate neuron next spike tick array");
+    return false;
+  }
+
+  m_NeuronDelta = (const uint16_t**)spin1_malloc(numNeurons * sizeof(const uint16_t*));
+  if(m_NeuronDelta == NULL)
+  {
+    LOG_PRINT(LOG_LEVEL_ERROR, "Unable to allocate neuron delta array");
+    return false;
+  }
+
+  // Loop through each neuron's delta stream
+  m_NextSpikeTick = UINT32_MAX;
+  const uint16_t *delta = (const uint16_t*)region;
+  for(unsigned int n = 0; n < numNeurons; n++)
+  {
+    // Decode time of first spike
+    // **NOTE** deltas are relative to the previous spike so
+    // the first is relative to tick -1, which wraps to UINT32_MAX
+    m_NeuronNextSpikeTick[n] = UINT32_MAX;
+    m_NeuronDelta[n] = delta;
+    AdvanceNeuron(n);
+
+    // Track the earliest first spike of any neuron
+    if(m_NeuronNextSpikeTick[n] < m_NextSpikeTick)
+    {
+      m_NextSpikeTick = m_NeuronNextSpikeTick[n];
+    }
+
+    // Skip over the remainder of the stream and its terminator
+    while(*delta != 0)
+    {
+      delta++;
+    }
+    delta++;
+  }
+
+  LOG_PRINT(LOG_LEVEL_INFO, "\tNext spike tick:%u", m_NextSpikeTick);
+  return true;
+}
 } // namespace Common
\ No newline at end of file
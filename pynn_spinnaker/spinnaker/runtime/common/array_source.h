@@ -6,9 +6,6 @@
 #include "rig_cpp_common/spinnaker.h"
 #include "rig_cpp_common/utils.h"
 
-// Common includes
-#include "spike_recording.h"
-
 // Namespaces
 using namespace Common;
 using namespace Common::Utils;
@@ -30,8 +27,9 @@ public:
     DMATagMax,
   };
 
-  ArraySource() : m_NextSpikeTick(0), m_SpikeBlockSizeWords(0),
-    m_NextSpikeBlockAddress(NULL), m_DMABuffer(NULL), m_State(StateInactive)
+  ArraySource() : m_Format(FormatBlock), m_NextSpikeTick(0), m_SpikeBlockSizeWords(0),
+    m_NextSpikeBlockAddress(NULL), m_DMABuffer(NULL), m_State(StateInactive),
+    m_NeuronNextSpikeTick(NULL), m_NeuronDelta(NULL)
   {
   }
 
@@ -41,9 +39,61 @@ public:
   bool ReadSDRAMData(uint32_t *region, uint32_t, unsigned int numNeurons);
   bool DMATransferDone(uint tag);
 
-  template<typename E>
-  void Update(uint tick, E emitSpikeFunction, SpikeRecording &spikeRecording,
+  bool SDPReceived(const sdp_msg_t*, uint)
+  {
+    return false;
+  }
+
+  template<typename E, typename R>
+  void Update(uint tick, E emitSpikeFunction, R recordSpikeFunction,
               unsigned int numNeurons)
+  {
+    // Emit spikes using method appropriate to format
+    if(m_Format == FormatDelta)
+    {
+      UpdateDelta(tick, emitSpikeFunction, recordSpikeFunction, numNeurons);
+    }
+    else
+    {
+      UpdateBlock(tick, emitSpikeFunction, recordSpikeFunction, numNeurons);
+    }
+  }
+
+private:
+  //-----------------------------------------------------------------------------
+  // Enumerations
+  //-----------------------------------------------------------------------------
+  enum State
+  {
+    StateInactive,
+    StateDMAInProgress,
+    StateSpikeBlockInBuffer,
+  };
+
+  // Spike data formats, corresponding to SpikeSourceArrayFormat in spike_source_array.py
+  enum Format
+  {
+    FormatBlock,
+    FormatDelta,
+  };
+
+  //-----------------------------------------------------------------------------
+  // Constants
+  //-----------------------------------------------------------------------------
+  // Deltas of this value advance a neuron's next
+  // spike tick by MaxDelta without emitting a spike
+  static const uint16_t DeltaEscape = 0xFFFF;
+  static const uint16_t MaxDelta = 0xFFFE;
+
+  //-----------------------------------------------------------------------------
+  // Private methods
+  //-----------------------------------------------------------------------------
+  bool ReadBlockSDRAMData(uint32_t *region, unsigned int numNeurons);
+  bool ReadDeltaSDRAMData(uint32_t *region, unsigned int numNeurons);
+
+  template<typename E, typename R>
+  void UpdateBlock(uint tick, E emitSpikeFunction, R recordSpikeFunction,
+                   unsigned int numNeurons)
   {
     // If we should be transmitting spikes this tick
     if(m_NextSpikeTick == tick)
@@ -64,7 +114,7 @@ public:
           }
 
           // Record spike
-          spikeRecording.RecordSpike(s, spiked);
+          recordSpikeFunction(s, spiked);
         }
 
         // Read next spike tick from start of block and
@@ -100,24 +150,97 @@ public:
     }
   }
 
-private:
-  //-----------------------------------------------------------------------------
-  // Enumerations
-  //-----------------------------------------------------------------------------
-  enum State
+  template<typename E, typename R>
+  void UpdateDelta(uint tick, E emitSpikeFunction, R recordSpikeFunction,
+                   unsigned int numNeurons)
   {
-    StateInactive,
-    StateDMAInProgress,
-    StateSpikeBlockInBuffer,
-  };
+    // If any neuron should be transmitting spikes this tick
+    if(m_NextSpikeTick == tick)
+    {
+      // Loop through sources
+      uint nextSpikeTick = UINT32_MAX;
+      for(unsigned int s = 0; s < numNeurons; s++)
+      {
+        // If this source spikes this tick
+        bool spiked = (m_NeuronNextSpikeTick[s] == tick);
+        if(spiked)
+        {
+          // Emit a spike
+          LOG_PRINT(LOG_LEVEL_TRACE, "\tEmitting spike");
+          emitSpikeFunction(s);
+
+          // Decode the time of this source's next spike
+          AdvanceNeuron(s);
+        }
+
+        // Record spike
+        recordSpikeFunction(s, spiked);
+
+        // Track the earliest next spike of any source
+        if(m_NeuronNextSpikeTick[s] < nextSpikeTick)
+        {
+          nextSpikeTick = m_NeuronNextSpikeTick[s];
+        }
+      }
+
+      m_NextSpikeTick = nextSpikeTick;
+      LOG_PRINT(LOG_LEVEL_TRACE, "\tNext spike tick:%u", m_NextSpikeTick);
+    }
+  }
+
+  void AdvanceNeuron(unsigned int n)
+  {
+    // Loop through neuron's deltas
+    // **NOTE** these are read directly from SDRAM, which is
+    // slower than DMA but only happens once for each spike
+    uint nextSpikeTick = m_NeuronNextSpikeTick[n];
+    const uint16_t *delta = m_NeuronDelta[n];
+    while(true)
+    {
+      // If stream is terminated, neuron will never spike again
+      // **NOTE** pointer isn't advanced so this remains the case
+      if(*delta == 0)
+      {
+        nextSpikeTick = UINT32_MAX;
+        break;
+      }
+      // Otherwise, if this is an escape, advance without spiking
+      else if(*delta == DeltaEscape)
+      {
+        nextSpikeTick += MaxDelta;
+        delta++;
+      }
+      // Otherwise, advance to tick of next spike
+      else
+      {
+        nextSpikeTick += *delta;
+        delta++;
+        break;
+      }
+    }
+
+    m_NeuronNextSpikeTick[n] = nextSpikeTick;
+    m_NeuronDelta[n] = delta;
+  }
 
   //-----------------------------------------------------------------------------
   // Members
   //-----------------------------------------------------------------------------
+  // Format spike data is stored in
+  Format m_Format;
+
+  // Tick at which any neuron next spikes
   uint m_NextSpikeTick;
+
+  // Block format state
   unsigned int m_SpikeBlockSizeWords;
   const uint32_t *m_NextSpikeBlockAddress;
   uint32_t *m_DMABuffer;
   State m_State;
+
+  // Delta format state - the tick at which each neuron next
+  // spikes and the next delta to read from its stream in SDRAM
+  uint *m_NeuronNextSpikeTick;
+  const uint16_t **m_NeuronDelta;
 };
 } // namespace Common
\ No newline at end of file
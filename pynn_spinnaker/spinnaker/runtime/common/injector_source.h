@@ -0,0 +1,221 @@
+#pragma once
+
+// Rig CPP common includes
+#include "rig_cpp_common/bit_field.h"
+#include "rig_cpp_common/log.h"
+#include "rig_cpp_common/spinnaker.h"
+#include "rig_cpp_common/utils.h"
+
+// Namespaces
+using namespace Common;
+using namespace Common::Utils;
+
+//-----------------------------------------------------------------------------
+// Common::InjectorSource
+//-----------------------------------------------------------------------------
+namespace Common
+{
+class InjectorSource
+{
+public:
+  //-----------------------------------------------------------------------------
+  // Constants
+  //-----------------------------------------------------------------------------
+  // Injector source doesn't use any DMA tags
+  static const uint DMATagMax = 0;
+
+  // SDP port on which spikes are received, corresponding
+  // to SDP_PORT in spike_injection.py
+  static const uint SDPPort = 1;
+
+  InjectorSource() : m_Spikes(NULL), m_Capacity(0), m_Head(0), m_Count(0),
+    m_TickSpikes(NULL), m_NumWords(0), m_NumSources(0)
+  {
+  }
+
+  //-----------------------------------------------------------------------------
+  // Public API
+  //-----------------------------------------------------------------------------
+  bool ReadSDRAMData(uint32_t *region, uint32_t, unsigned int numSources)
+  {
+    LOG_PRINT(LOG_LEVEL_INFO, "InjectorSource::ReadSDRAMData");
+
+    // Read capacity of spike buffer
+    m_Capacity = *region++;
+    LOG_PRINT(LOG_LEVEL_INFO, "\tBuffer capacity:%u spikes", m_Capacity);
+
+    // Allocate buffer to hold spikes received ahead of when they are due
+    m_Spikes = (Spike*)spin1_malloc(sizeof(Spike) * m_Capacity);
+    if(m_Spikes == NULL)
+    {
+      LOG_PRINT(LOG_LEVEL_ERROR, "Unable to allocate spike buffer");
+      return false;
+    }
+
+    // Allocate bitfield to gather spikes due in each tick
+    m_NumSources = numSources;
+    m_NumWords = BitField::GetWordSize(numSources);
+    m_TickSpikes = (uint32_t*)spin1_malloc(sizeof(uint32_t) * m_NumWords);
+    if(m_TickSpikes == NULL)
+    {
+      LOG_PRINT(LOG_LEVEL_ERROR, "Unable to allocate tick spike bitfield");
+      return false;
+    }
+    BitField::Clear(m_TickSpikes, m_NumWords);
+
+    return true;
+  }
+
+  bool DMATransferDone(uint)
+  {
+    return false;
+  }
+
+  bool SDPReceived(const sdp_msg_t *msg, uint port)
+  {
+    // If packet hasn't arrived on spike port, it can't be handled
+    if(port != SDPPort)
+    {
+      return false;
+    }
+
+    // Payload, starting where SCP fields would be, consists of a base
+    // tick followed by words containing a neuron index in the low bits
+    // and a tick, relative to the base tick, in the remaining bits
+    const uint32_t *payload = (const uint32_t*)&msg->cmd_rc;
+    const unsigned int numWords = (msg->length - sizeof(sdp_hdr_t)) / sizeof(uint32_t);
+    if(numWords == 0)
+    {
+      return true;
+    }
+
+    // Loop through spikes
+    const uint32_t baseTick = payload[0];
+    for(unsigned int w = 1; w < numWords; w++)
+    {
+      // If buffer is full, drop remaining spikes
+      if(m_Count == m_Capacity)
+      {
+        LOG_PRINT(LOG_LEVEL_WARN, "Spike buffer full - dropping %u spikes",
+                  numWords - w);
+        break;
+      }
+
+      // Decode spike
+      const uint32_t neuron = payload[w] & NeuronMask;
+      const uint32_t tick = baseTick + (payload[w] >> NeuronBits);
+      if(neuron >= m_NumSources)
+      {
+        LOG_PRINT(LOG_LEVEL_WARN, "Spike received for invalid neuron %u", neuron);
+        continue;
+      }
+
+      // Working back from the end of the buffer, shift spikes
+      // due after this one along to make space to insert it
+      // **NOTE** spikes pushed later on the host may be due before ones
+      // already sent but, as most arrive in order, few are usually shifted
+      unsigned int i = m_Count;
+      while(i > 0)
+      {
+        const Spike &previous = m_Spikes[(m_Head + i - 1) % m_Capacity];
+        if(previous.m_Tick <= tick)
+        {
+          break;
+        }
+
+        m_Spikes[(m_Head + i) % m_Capacity] = previous;
+        i--;
+      }
+
+      // Insert spike so buffer remains sorted by tick
+      Spike &spike = m_Spikes[(m_Head + i) % m_Capacity];
+      spike.m_Tick = tick;
+      spike.m_Neuron = neuron;
+      m_Count++;
+    }
+
+    return true;
+  }
+
+  template<typename E, typename R>
+  void Update(uint tick, E emitSpikeFunction, R recordSpikeFunction,
+              unsigned int numSources)
+  {
+    // Move spikes due by this tick from the front of buffer into bitfield
+    // **NOTE** as buffer is sorted by tick, the first spike that isn't yet
+    // due is followed by no others that are and spikes which arrived too
+    // late are emitted this tick
+    bool anySpikes = false;
+    while(m_Count > 0 && m_Spikes[m_Head].m_Tick <= tick)
+    {
+      const Spike &spike = m_Spikes[m_Head];
+      if(spike.m_Tick < tick)
+      {
+        LOG_PRINT(LOG_LEVEL_TRACE, "\tSpike due at tick %u arrived late",
+                  spike.m_Tick);
+      }
+      BitField::SetBit(m_TickSpikes, spike.m_Neuron);
+
+      m_Head = (m_Head + 1) % m_Capacity;
+      m_Count--;
+      anySpikes = true;
+    }
+
+    // If any spikes are due
+    if(anySpikes)
+    {
+      // Loop through sources
+      for(unsigned int s = 0; s < numSources; s++)
+      {
+        // If this source has spiked
+        bool spiked = BitField::TestBit(m_TickSpikes, s);
+        if(spiked)
+        {
+          // Emit a spike
+          LOG_PRINT(LOG_LEVEL_TRACE, "\tEmitting spike");
+          emitSpikeFunction(s);
+        }
+
+        // Record spike
+        recordSpikeFunction(s, spiked);
+      }
+
+      // Clear bitfield ready for next tick
+      BitField::Clear(m_TickSpikes, m_NumWords);
+    }
+  }
+
+private:
+  //-----------------------------------------------------------------------------
+  // Constants
+  //-----------------------------------------------------------------------------
+  // Bits of each spike word used for the neuron
+  // index, corresponding to NEURON_BITS in spike_injection.py
+  static const uint32_t NeuronBits = 10;
+  static const uint32_t NeuronMask = (1 << NeuronBits) - 1;
+
+  //-----------------------------------------------------------------------------
+  // Spike
+  //-----------------------------------------------------------------------------
+  struct Spike
+  {
+    uint32_t m_Tick;
+    uint32_t m_Neuron;
+  };
+
+  //-----------------------------------------------------------------------------
+  // Members
+  //-----------------------------------------------------------------------------
+  // Ring buffer of spikes received but not yet due, sorted by tick
+  Spike *m_Spikes;
+  unsigned int m_Capacity;
+  unsigned int m_Head;
+  unsigned int m_Count;
+
+  // Bitfield of sources which spike in current tick
+  uint32_t *m_TickSpikes;
+  unsigned int m_NumWords;
+
+  unsigned int m_NumSources;
+};
+} // namespace Common
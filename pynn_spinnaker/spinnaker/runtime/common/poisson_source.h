@@ -10,9 +10,6 @@
 #include "rig_cpp_common/utils.h"
 #include "rig_cpp_common/random/non_uniform.h"
 
-// Common includes
-#include "spike_recording.h"
-
 // Namespaces
 using namespace Common::FixedPointNumber;
 using namespace Common::Random;
@@ -34,7 +31,8 @@ public:
   // Poisson source doesn't use any DMA tags
   static const uint DMATagMax = 0;
 
-  PoissonSource() : m_ImmutableState(NULL), m_ImmutableStateIndices(NULL), m_SlowTimeToSpike(NULL)
+  PoissonSource() : m_ImmutableState(NULL), m_Schedules(NULL), m_CurrentEpochs(NULL),
+    m_SlowTimeToSpike(NULL)
   {
   }
 
@@ -55,14 +53,35 @@ public:
     }
     m_RNG.SetState(seed);
 
+    // Read number of constant-rate epochs
+    const unsigned int numEpochs = *region++;
+    LOG_PRINT(LOG_LEVEL_INFO, "\t%u rate epochs", numEpochs);
+
+    // Copy the schedule of epochs each spike source follows
+    LOG_PRINT(LOG_LEVEL_TRACE, "\tPoisson spike source schedules");
+    if(!AllocateCopyStructArray(numSources, region, m_Schedules))
+    {
+      LOG_PRINT(LOG_LEVEL_ERROR, "Unable to allocate spike source schedule array");
+      return false;
+    }
+
+    // Copy the immutable state of each epoch
+    // **NOTE** if no spike sources have any epochs, there's nothing to copy
     LOG_PRINT(LOG_LEVEL_TRACE, "\tPoisson spike source immutable state");
-    if(!AllocateCopyIndexedStructArray(numSources, region,
-      m_ImmutableStateIndices, m_ImmutableState))
+    if(numEpochs > 0 && !AllocateCopyStructArray(numEpochs, region, m_ImmutableState))
     {
       LOG_PRINT(LOG_LEVEL_ERROR, "Unable to allocate spike source immutable state array");
       return false;
     }
 
+    // Allocate array to hold the epoch each spike source is currently in
+    m_CurrentEpochs = (uint16_t*)spin1_malloc(sizeof(uint16_t) * numSources);
+    if(m_CurrentEpochs == NULL)
+    {
+      LOG_PRINT(LOG_LEVEL_ERROR, "Unable to allocate spike source current epoch array");
+      return false;
+    }
+
     // Allocate time to spike array
     // **NOTE** this is only USED by slow spike sources but
     // for simplicity we allocate one for each neuron
@@ -70,21 +89,26 @@ public:
 
     // Loop through spike sources
     S1615 *tts = m_SlowTimeToSpike;
-    const uint16_t *immutableStateIndex = m_ImmutableStateIndices;
     for(unsigned int s = 0; s < numSources; s++)
     {
       LOG_PRINT(LOG_LEVEL_TRACE, "\tSimulating spike source %u", s);
 
-      // Get mutable and immutable state for spike source
-      auto &sourceTTS = *tts++;
-      auto &sourceImmutableState = m_ImmutableState[*immutableStateIndex++];
+      // Start spike source in first epoch of its schedule
+      const auto &schedule = m_Schedules[s];
+      m_CurrentEpochs[s] = schedule.m_FirstEpoch;
 
-      // Initialize spike source
-      sourceImmutableState.Initialize(sourceTTS, m_RNG);
+      // If spike source has any epochs, initialize it using the first
+      auto &sourceTTS = *tts++;
+      if(schedule.m_NumEpochs > 0)
+      {
+        const auto &sourceImmutableState = m_ImmutableState[schedule.m_FirstEpoch];
+        sourceImmutableState.Initialize(sourceTTS, m_RNG);
 
 #if LOG_LEVEL <= LOG_LEVEL_TRACE
-      sourceImmutableState.Print(IO_BUF, sourceTTS);
+        io_printf(IO_BUF, "\t%u epochs\n", schedule.m_NumEpochs);
+        sourceImmutableState.Print(IO_BUF, sourceTTS);
 #endif
+      }
     }
 
     return true;
@@ -95,27 +119,53 @@ public:
     return false;
   }
 
-  template<typename E>
-  void Update(uint tick, E emitSpikeFunction, SpikeRecording &spikeRecording,
+  bool SDPReceived(const sdp_msg_t*, uint)
+  {
+    return false;
+  }
+
+  template<typename E, typename F>
+  void Update(uint tick, E emitSpikeFunction, F recordSpikeFunction,
               unsigned int numSources)
   {
     // Loop through spike sources
     auto *tts = m_SlowTimeToSpike;
-    const uint16_t *immutableStateIndex = m_ImmutableStateIndices;
     for(unsigned int s = 0; s < numSources; s++)
     {
       LOG_PRINT(LOG_LEVEL_TRACE, "\tSimulating spike source %u", s);
 
-      // Get mutable and immutable state for spike source
+      // If spike source has no epochs, it never spikes
       auto &sourceTTS = *tts++;
-      const auto &sourceImmutableState = m_ImmutableState[*immutableStateIndex++];
+      const auto &schedule = m_Schedules[s];
+      if(schedule.m_NumEpochs == 0)
+      {
+        recordSpikeFunction(s, false);
+        continue;
+      }
+
+      // While the current epoch has ended and there are more
+      // in the schedule, advance to the next epoch
+      // **NOTE** time-to-spike is exponentially distributed so
+      // can simply be redrawn using the new epoch's rate
+      uint16_t &currentEpoch = m_CurrentEpochs[s];
+      const uint16_t lastEpoch = schedule.m_FirstEpoch + schedule.m_NumEpochs - 1;
+      while(currentEpoch < lastEpoch && m_ImmutableState[currentEpoch].HasEnded(tick))
+      {
+        currentEpoch++;
+        m_ImmutableState[currentEpoch].Initialize(sourceTTS, m_RNG);
+
+        LOG_PRINT(LOG_LEVEL_TRACE, "\t\tAdvancing to epoch %u", currentEpoch);
+      }
+
+      // Get immutable state for spike source's current epoch
+      const auto &sourceImmutableState = m_ImmutableState[currentEpoch];
 
       // Bind source ID to emit spike function
       auto sourceEmitSpikeFunction = std::bind(emitSpikeFunction, s);
 
       // Update spike
       const bool spiked = sourceImmutableState.Update(tick, sourceTTS, m_RNG, sourceEmitSpikeFunction);
-      spikeRecording.RecordSpike(s, spiked);
+      recordSpikeFunction(s, spiked);
     }
   }
 
@@ -169,6 +219,11 @@ private:
       }
     }
 
+    bool HasEnded(uint tick) const
+    {
+      return (tick >= m_EndTick);
+    }
+
     void Initialize(S1615 &slowTimeToSpike, R &rng) const
     {
       // If this is a slow spike source, calculate the initial time to spike
@@ -250,11 +305,22 @@ private:
     TypeSpecificData m_Data;
   };
 
+  //-----------------------------------------------------------------------------
+  // Schedule
+  //-----------------------------------------------------------------------------
+  // Range of epochs, in order of start time, which a spike source follows
+  struct Schedule
+  {
+    uint16_t m_FirstEpoch;
+    uint16_t m_NumEpochs;
+  };
+
   //-----------------------------------------------------------------------------
   // Members
   //-----------------------------------------------------------------------------
   ImmutableState *m_ImmutableState;
-  uint16_t *m_ImmutableStateIndices;
+  Schedule *m_Schedules;
+  uint16_t *m_CurrentEpochs;
   S1615 *m_SlowTimeToSpike;
 
   R m_RNG;
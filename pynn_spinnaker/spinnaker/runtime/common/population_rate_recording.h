@@ -0,0 +1,151 @@
+#pragma once
+
+// Standard includes
+#include <cstdint>
+
+// Rig CPP common includes
+#include "rig_cpp_common/bit_field.h"
+#include "rig_cpp_common/log.h"
+#include "rig_cpp_common/spinnaker.h"
+#include "rig_cpp_common/utils.h"
+
+// Common includes
+#include "recording_buffer.h"
+
+//-----------------------------------------------------------------------------
+// Common::PopulationRateRecording
+//-----------------------------------------------------------------------------
+namespace Common
+{
+class PopulationRateRecording
+{
+public:
+  PopulationRateRecording() : m_BinTicks(0), m_SimulationTicks(0),
+    m_IndicesToRecord(NULL), m_NumRecorded(0), m_TicksUntilRecord(0),
+    m_BinStartTick(0), m_BinSpikes(0), m_Tick(0) {}
+
+  //-----------------------------------------------------------------------------
+  // Public API
+  //-----------------------------------------------------------------------------
+  bool ReadSDRAMData(uint32_t *region, uint32_t, unsigned int numNeurons)
+  {
+    LOG_PRINT(LOG_LEVEL_INFO, "PopulationRateRecording::ReadSDRAMData");
+
+    // Read bin size and simulation duration from first two words
+    m_BinTicks = *region++;
+    m_SimulationTicks = *region++;
+    LOG_PRINT(LOG_LEVEL_INFO, "\tBin size:%u (ticks), Simulation ticks:%u",
+              m_BinTicks, m_SimulationTicks);
+
+    // Calculate number of words that are required to build a bitfield for ALL neurons
+    unsigned int numWords = BitField::GetWordSize(numNeurons);
+    LOG_PRINT(LOG_LEVEL_INFO, "\tNum words per population:%u", numWords);
+
+    // Copy indices to record
+    if(!Utils::AllocateCopyStructArray(numWords, region, m_IndicesToRecord))
+    {
+      LOG_PRINT(LOG_LEVEL_ERROR, "Unable to allocate indices to record array");
+      return false;
+    }
+
+#if LOG_LEVEL <= LOG_LEVEL_TRACE
+    BitField::PrintBits(IO_BUF, m_IndicesToRecord, numWords);
+    io_printf(IO_BUF, "\n");
+#endif
+
+    // Count neurons to record
+    m_NumRecorded = 0;
+    for(unsigned int n = 0; n < numNeurons; n++)
+    {
+      if(BitField::TestBit(m_IndicesToRecord, n))
+      {
+        m_NumRecorded++;
+      }
+    }
+
+    // Subsequent data is a ring buffer of samples, each of which consists
+    // of the first tick of a bin followed by the number of spikes within it
+    m_RecordingBuffer.ReadSDRAMData(region, 2);
+
+    // Begin first bin
+    m_Tick = 0;
+    m_TicksUntilRecord = m_BinTicks;
+    m_BinStartTick = 0;
+    m_BinSpikes = 0;
+
+    return true;
+  }
+
+  void RecordSpike(unsigned int neuron, bool spiked)
+  {
+    // If this neuron has spiked and we should record it, count spike
+    if(spiked && BitField::TestBit(m_IndicesToRecord, neuron))
+    {
+      m_BinSpikes++;
+    }
+  }
+
+  void EndTick()
+  {
+    // Advance tick
+    m_Tick++;
+    m_TicksUntilRecord--;
+
+    // If this tick ends a bin or the simulation
+    if(m_TicksUntilRecord == 0 || m_Tick == m_SimulationTicks)
+    {
+      // If we're recording anything, write bin to next free slot
+      // in SDRAM ring buffer (if there is space) and commit it
+      if(m_NumRecorded > 0)
+      {
+        uint32_t *recordSDRAM = m_RecordingBuffer.GetNextSlot();
+        if(recordSDRAM != NULL)
+        {
+          LOG_PRINT(LOG_LEVEL_TRACE, "\tRecording bin starting at tick:%u, spikes:%u",
+                    m_BinStartTick, m_BinSpikes);
+
+          recordSDRAM[0] = m_BinStartTick;
+          recordSDRAM[1] = m_BinSpikes;
+          m_RecordingBuffer.CommitSlot();
+        }
+      }
+
+      // Begin next bin
+      m_TicksUntilRecord = m_BinTicks;
+      m_BinStartTick = m_Tick;
+      m_BinSpikes = 0;
+    }
+  }
+
+private:
+  //-----------------------------------------------------------------------------
+  // Members
+  //-----------------------------------------------------------------------------
+  // How many ticks are in each bin
+  uint32_t m_BinTicks;
+
+  // How many ticks the simulation runs for
+  uint32_t m_SimulationTicks;
+
+  // Bit field specifying which neurons to record
+  uint32_t *m_IndicesToRecord;
+
+  // How many neurons are recorded
+  unsigned int m_NumRecorded;
+
+  // How many ticks until the current bin ends
+  unsigned int m_TicksUntilRecord;
+
+  // First tick of current bin
+  uint32_t m_BinStartTick;
+
+  // Number of spikes recorded neurons have emitted during current bin
+  uint32_t m_BinSpikes;
+
+  // Ring buffer in SDRAM to write bins to
+  RecordingBuffer m_RecordingBuffer;
+
+  // Current tick
+  uint32_t m_Tick;
+};
+}
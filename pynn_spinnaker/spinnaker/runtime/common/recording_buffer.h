@@ -0,0 +1,98 @@
+#pragma once
+
+// Standard includes
+#include <cstdint>
+
+// Rig CPP common includes
+#include "rig_cpp_common/log.h"
+
+//-----------------------------------------------------------------------------
+// Common::RecordingBuffer
+//-----------------------------------------------------------------------------
+// Ring buffer of fixed-size recording samples in SDRAM. The host drains
+// samples while the simulation is running by reading the samples between
+// the read and write indices and then advancing the read index. If the host
+// falls behind and the buffer fills up, new samples are dropped and counted.
+namespace Common
+{
+class RecordingBuffer
+{
+public:
+  RecordingBuffer() : m_Control(NULL), m_Data(NULL), m_SlotWords(0), m_WriteSlot(0) {}
+
+  //-----------------------------------------------------------------------------
+  // Public API
+  //-----------------------------------------------------------------------------
+  void ReadSDRAMData(uint32_t *region, unsigned int slotWords)
+  {
+    // Control block is at start of region followed by slots
+    m_Control = region;
+    m_Data = region + ControlWordMax;
+    m_SlotWords = slotWords;
+    m_WriteSlot = 0;
+
+    LOG_PRINT(LOG_LEVEL_INFO, "\tRecording buffer capacity:%u samples of %u words, starting at %08x",
+              m_Control[ControlWordCapacity], m_SlotWords, m_Data);
+  }
+
+  uint32_t *GetNextSlot()
+  {
+    // If host hasn't drained enough samples to make space, count and drop
+    // **NOTE** indices are free-running so wrapping subtraction is correct
+    if((m_Control[ControlWordWriteIndex] - m_Control[ControlWordReadIndex]) >=
+      m_Control[ControlWordCapacity])
+    {
+      m_Control[ControlWordOverflowCount]++;
+      return NULL;
+    }
+    // Otherwise, return pointer to slot
+    else
+    {
+      return m_Data + (m_WriteSlot * m_SlotWords);
+    }
+  }
+
+  void CommitSlot()
+  {
+    // Advance write slot, wrapping at capacity
+    // **NOTE** this avoids a software modulo every sample
+    m_WriteSlot++;
+    if(m_WriteSlot == m_Control[ControlWordCapacity])
+    {
+      m_WriteSlot = 0;
+    }
+
+    // Advance write index so host can drain sample
+    m_Control[ControlWordWriteIndex]++;
+  }
+
+private:
+  //-----------------------------------------------------------------------------
+  // Enumerations
+  //-----------------------------------------------------------------------------
+  // Words of control block, corresponding to those in recording_buffer.py
+  enum ControlWord
+  {
+    ControlWordCapacity,
+    ControlWordWriteIndex,
+    ControlWordReadIndex,
+    ControlWordOverflowCount,
+    ControlWordMax,
+  };
+
+  //-----------------------------------------------------------------------------
+  // Members
+  //-----------------------------------------------------------------------------
+  // Control block shared with host
+  volatile uint32_t *m_Control;
+
+  // Pointer to first slot of ring buffer
+  uint32_t *m_Data;
+
+  // How many words each slot takes
+  unsigned int m_SlotWords;
+
+  // Slot next sample should be written to
+  unsigned int m_WriteSlot;
+};
+}
@@ -0,0 +1,88 @@
+#pragma once
+
+// Standard includes
+#include <cstdint>
+
+// Rig CPP common includes
+#include "rig_cpp_common/bit_field.h"
+#include "rig_cpp_common/log.h"
+#include "rig_cpp_common/spinnaker.h"
+#include "rig_cpp_common/utils.h"
+
+//-----------------------------------------------------------------------------
+// Common::SpikeCountRecording
+//-----------------------------------------------------------------------------
+namespace Common
+{
+class SpikeCountRecording
+{
+public:
+  SpikeCountRecording() : m_IndicesToRecord(NULL), m_Counts(NULL), m_CurrentIndex(0) {}
+
+  //-----------------------------------------------------------------------------
+  // Public API
+  //-----------------------------------------------------------------------------
+  bool ReadSDRAMData(uint32_t *region, uint32_t, unsigned int numNeurons)
+  {
+    LOG_PRINT(LOG_LEVEL_INFO, "SpikeCountRecording::ReadSDRAMData");
+
+    // Calculate number of words that are required to build a bitfield for ALL neurons
+    unsigned int numWords = BitField::GetWordSize(numNeurons);
+    LOG_PRINT(LOG_LEVEL_INFO, "\tNum words per population:%u", numWords);
+
+    // Copy indices to record
+    if(!Utils::AllocateCopyStructArray(numWords, region, m_IndicesToRecord))
+    {
+      LOG_PRINT(LOG_LEVEL_ERROR, "Unable to allocate indices to record array");
+      return false;
+    }
+
+#if LOG_LEVEL <= LOG_LEVEL_TRACE
+    BitField::PrintBits(IO_BUF, m_IndicesToRecord, numWords);
+    io_printf(IO_BUF, "\n");
+#endif
+
+    // Subsequent data is a count for each recorded neuron which, as spikes
+    // are relatively rare, is incremented in place rather than copied to DTCM
+    m_Counts = region;
+    m_CurrentIndex = 0;
+
+    return true;
+  }
+
+  void RecordSpike(unsigned int neuron, bool spiked)
+  {
+    // If we should count this neuron's spikes
+    if(BitField::TestBit(m_IndicesToRecord, neuron))
+    {
+      // If it's spiked, increment its count
+      if(spiked)
+      {
+        m_Counts[m_CurrentIndex]++;
+      }
+
+      // Go onto next recorded neuron
+      m_CurrentIndex++;
+    }
+  }
+
+  void EndTick()
+  {
+    // Reset recorded neuron index
+    m_CurrentIndex = 0;
+  }
+
+private:
+  //-----------------------------------------------------------------------------
+  // Members
+  //-----------------------------------------------------------------------------
+  // Bit field specifying which neurons to record
+  uint32_t *m_IndicesToRecord;
+
+  // Spike count of each recorded neuron in SDRAM
+  volatile uint32_t *m_Counts;
+
+  // Index of the next recorded neuron
+  unsigned int m_CurrentIndex;
+};
+}
@@ -9,6 +9,9 @@
 #include "rig_cpp_common/spinnaker.h"
 #include "rig_cpp_common/utils.h"
 
+// Common includes
+#include "recording_buffer.h"
+
 //-----------------------------------------------------------------------------
 // Common::SpikeRecording
 //-----------------------------------------------------------------------------
@@ -17,7 +20,7 @@ namespace Common
 class SpikeRecording
 {
 public:
-  SpikeRecording() : m_NumWords(0), m_CurrentBit(0), m_IndicesToRecord(NULL), m_RecordBuffer(NULL), m_RecordSDRAM(NULL) {}
+  SpikeRecording() : m_Format(FormatBitField), m_NumWords(0), m_CurrentBit(0), m_IndicesToRecord(NULL), m_RecordBuffer(NULL), m_Tick(0) {}
 
   //-----------------------------------------------------------------------------
   // Public API
@@ -26,9 +29,11 @@ public:
   {
     LOG_PRINT(LOG_LEVEL_INFO, "SpikeRecording::ReadSDRAMData");
 
-    // Read number of words per sample from first word
+    // Read format and number of words per sample from first two words
+    m_Format = (Format)*region++;
     m_NumWords = *region++;
-    LOG_PRINT(LOG_LEVEL_INFO, "\tNum words per sample:%u", m_NumWords);
+    LOG_PRINT(LOG_LEVEL_INFO, "\tFormat:%u, Num words per sample:%u",
+              m_Format, m_NumWords);
 
     // Calculate number of words that are required to build a bitfield for ALL neurons
     unsigned int numWords = BitField::GetWordSize(numNeurons);
@@ -46,15 +51,16 @@ public:
     io_printf(IO_BUF, "\n");
 #endif
 
-    // Cache pointer of subsequent data
-    m_RecordSDRAM = region;
-    LOG_PRINT(LOG_LEVEL_INFO, "\tRecording starting at %08x", m_RecordSDRAM);
+    // Subsequent data is a ring buffer of samples, each of which consists
+    // of a tick word followed by either a spike bitfield or, if spikes are
+    // recorded as an event list, the index of the recorded neuron which spiked
+    m_RecordingBuffer.ReadSDRAMData(region, m_NumWords + 1);
 
-    // If we need to record anything
-    if(m_NumWords > 0)
+    // If we need to record anything as a bitfield
+    if(m_Format == FormatBitField && m_NumWords > 0)
     {
       // Allocate local record buffer
-      m_RecordBuffer = (uint32_t*)spin1_malloc(m_NumWords * sizeof(uint32_t));
+      m_RecordBuffer = (uint32_t*)spin1_malloc((m_NumWords + 1) * sizeof(uint32_t));
       if(m_RecordBuffer == NULL)
       {
         LOG_PRINT(LOG_LEVEL_ERROR, "Unable to allocate local record buffer");
@@ -63,6 +69,7 @@ public:
     }
 
     // Reset
+    m_Tick = 0;
     Reset();
 
     return true;
@@ -73,6 +80,30 @@ public:
     // If we should record this neuron's spikingness
     if(BitField::TestBit(m_IndicesToRecord, neuron))
     {
+      // If spikes are recorded as an event list
+      if(m_Format == FormatEventList)
+      {
+        // If it's spiked, write event directly to next free
+        // slot in SDRAM ring buffer (if there is space)
+        if(spiked)
+        {
+          uint32_t *recordSDRAM = m_RecordingBuffer.GetNextSlot();
+          if(recordSDRAM != NULL)
+          {
+            LOG_PRINT(LOG_LEVEL_TRACE, "\t\tRecording spike event neuron:%u, index:%u",
+                      neuron, m_CurrentBit);
+
+            recordSDRAM[0] = m_Tick;
+            recordSDRAM[1] = m_CurrentBit;
+            m_RecordingBuffer.CommitSlot();
+          }
+        }
+
+        // Increment current index
+        m_CurrentBit++;
+        return;
+      }
+
       // If current bit is beyond the end of the bitfield, spike buffer has
       // probably not been transferred and hence in reset so give and error
       if(m_CurrentBit >= (m_NumWords * 32))
@@ -84,10 +115,10 @@ public:
       LOG_PRINT(LOG_LEVEL_TRACE, "\t\tRecording neuron:%u, spikes:%u",
                 neuron, spiked ? 1 : 0);
 
-      // If it's spiked, set current bitm_SDRAMBuffers
+      // If it's spiked, set current bit
       if(spiked)
       {
-        BitField::SetBit(m_RecordBuffer, m_CurrentBit);
+        BitField::SetBit(&m_RecordBuffer[1], m_CurrentBit);
       }
 
       // Increment current bit
@@ -101,28 +132,58 @@ public:
     m_CurrentBit = 0;
 
     // Zero recording buffer
-    BitField::Clear(m_RecordBuffer, m_NumWords);
+    if(m_Format == FormatBitField)
+    {
+      BitField::Clear(&m_RecordBuffer[1], m_NumWords);
+    }
   }
 
   void TransferBuffer(uint tag)
   {
-    LOG_PRINT(LOG_LEVEL_TRACE, "\tTransferring record buffer to SDRAM:%08x",
-      m_RecordSDRAM);
-#if LOG_LEVEL <= LOG_LEVEL_TRACE
-    BitField::PrintBits(IO_BUF, m_RecordBuffer, m_NumWords);
-    io_printf(IO_BUF, "\n");
-#endif
-
-    // Use DMA to transfer record buffer to SDRAM
-    if(m_NumWords > 0)
+    // If spikes are recorded as an event list, events have already been
+    // written to SDRAM so reset immediately as there'll be no DMA
+    if(m_Format == FormatEventList)
+    {
+      Reset();
+    }
+    // Otherwise, if we're recording anything
+    else if(m_NumWords > 0)
     {
-      spin1_dma_transfer(tag, m_RecordSDRAM,
-                         m_RecordBuffer, DMA_WRITE,
-                         m_NumWords * sizeof(uint32_t));
+      // Get next free slot in SDRAM ring buffer
+      uint32_t *recordSDRAM = m_RecordingBuffer.GetNextSlot();
 
-      // Advance SDRAM pointer
-      m_RecordSDRAM += m_NumWords;
+      // If there's no space, drop this tick's sample and
+      // reset immediately as there'll be no DMA complete event
+      if(recordSDRAM == NULL)
+      {
+        LOG_PRINT(LOG_LEVEL_TRACE, "\tRecording buffer full - dropping sample");
+        Reset();
+      }
+      else
+      {
+        LOG_PRINT(LOG_LEVEL_TRACE, "\tTransferring record buffer to SDRAM:%08x",
+          recordSDRAM);
+#if LOG_LEVEL <= LOG_LEVEL_TRACE
+        BitField::PrintBits(IO_BUF, &m_RecordBuffer[1], m_NumWords);
+        io_printf(IO_BUF, "\n");
+#endif
+        // Stamp sample with tick
+        m_RecordBuffer[0] = m_Tick;
+
+        // Use DMA to transfer record buffer to SDRAM
+        spin1_dma_transfer(tag, recordSDRAM,
+                           m_RecordBuffer, DMA_WRITE,
+                           (m_NumWords + 1) * sizeof(uint32_t));
+
+        // Make sample available to host
+        // **NOTE** the DMA may still be in flight so
+        // the host never drains the most recent sample
+        m_RecordingBuffer.CommitSlot();
+      }
     }
+
+    // Advance tick
+    m_Tick++;
   }
 
   bool IsReset() const
@@ -131,22 +192,41 @@ public:
   }
 
 private:
+  //-----------------------------------------------------------------------------
+  // Enumerations
+  //-----------------------------------------------------------------------------
+  // Recording formats, corresponding to SpikeRecordingFormat in spike_recording.py
+  enum Format
+  {
+    FormatBitField,
+    FormatEventList,
+  };
+
   //-----------------------------------------------------------------------------
   // Members
   //-----------------------------------------------------------------------------
+  // Format spikes are recorded in
+  Format m_Format;
+
   // How many words to write to SDRAM every time step
+  // **NOTE** if spikes are recorded as an event list, this is per spike
   unsigned int m_NumWords;
 
   // Which bit within m_RecordBuffer should we set next
+  // **NOTE** this is the index of the next recorded neuron
   unsigned int m_CurrentBit;
 
   // Bit field specifying which neurons to record
   uint32_t *m_IndicesToRecord;
 
-  // Buffer into which one timestep worth of spiking data is written
+  // Buffer into which the tick and one timestep
+  // worth of spiking data is written
   uint32_t *m_RecordBuffer;
 
-  // Pointer in SDRAM to write next buffer to
-  uint32_t *m_RecordSDRAM;
+  // Ring buffer in SDRAM to transfer buffers to
+  RecordingBuffer m_RecordingBuffer;
+
+  // Tick of current sample
+  uint32_t m_Tick;
 };
 }
\ No newline at end of file
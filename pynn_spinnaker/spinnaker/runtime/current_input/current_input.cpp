@@ -7,6 +7,8 @@
 #include "rig_cpp_common/spinnaker.h"
 
 // Common includes
+#include "../common/population_rate_recording.h"
+#include "../common/spike_count_recording.h"
 #include "../common/spike_recording.h"
 
 // Configuration include
@@ -38,11 +40,16 @@ uint32_t *g_OutputBuffers[2] = {NULL, NULL};
 
 uint32_t *g_OutputWeights = NULL;
 
+uint16_t *g_OutputIndices = NULL;
+
 uint32_t *g_OutputBuffer = NULL;
+unsigned int g_NumOutputs = 0;
 
 uint32_t g_AppWords[AppWordMax];
 
 SpikeRecording g_SpikeRecording;
+SpikeCountRecording g_SpikeCountRecording;
+PopulationRateRecording g_PopulationRateRecording;
 
 Source g_SpikeSource;
 
@@ -72,15 +79,34 @@ bool ReadOutputWeightRegion(uint32_t *region, uint32_t)
     return false;
   }
 
+  // Sources for each output are interleaved so calculate number of outputs
+  const unsigned int sourcesPerOutput = g_AppWords[AppWordNumSourcesPerOutput];
+  g_NumOutputs = g_AppWords[AppWordNumCurrentSources] / sourcesPerOutput;
+
   // Allocate output buffer
-  g_OutputBuffer = (uint32_t*)spin1_malloc(
-    sizeof(uint32_t) * g_AppWords[AppWordNumCurrentSources]);
+  g_OutputBuffer = (uint32_t*)spin1_malloc(sizeof(uint32_t) * g_NumOutputs);
   if(g_OutputBuffer == NULL)
   {
     LOG_PRINT(LOG_LEVEL_ERROR, "Unable to allocate output buffer array");
     return false;
   }
 
+  // Allocate array of output each source contributes to
+  g_OutputIndices = (uint16_t*)spin1_malloc(
+    sizeof(uint16_t) * g_AppWords[AppWordNumCurrentSources]);
+  if(g_OutputIndices == NULL)
+  {
+    LOG_PRINT(LOG_LEVEL_ERROR, "Unable to allocate output index array");
+    return false;
+  }
+
+  // Fill in output indices
+  // **NOTE** this avoids a (software) division each time a source spikes
+  for(unsigned int s = 0; s < g_AppWords[AppWordNumCurrentSources]; s++)
+  {
+    g_OutputIndices[s] = (uint16_t)(s / sourcesPerOutput);
+  }
+
   return true;
 }
 //-----------------------------------------------------------------------------
@@ -101,8 +127,8 @@ bool ReadSDRAMData(uint32_t *baseAddress, uint32_t flags)
   }
   else
   {
-    LOG_PRINT(LOG_LEVEL_INFO, "\tnum current sources=%u",
-      g_AppWords[AppWordNumCurrentSources]);
+    LOG_PRINT(LOG_LEVEL_INFO, "\tnum current sources=%u, sources per output=%u",
+      g_AppWords[AppWordNumCurrentSources], g_AppWords[AppWordNumSourcesPerOutput]);
   }
 
   // Read spike source region
@@ -137,6 +163,22 @@ bool ReadSDRAMData(uint32_t *baseAddress, uint32_t flags)
     return false;
   }
 
+  // Read spike count recording region
+  if(!g_SpikeCountRecording.ReadSDRAMData(
+    Config::GetRegionStart(baseAddress, RegionSpikeCountRecording), flags,
+    g_AppWords[AppWordNumCurrentSources]))
+  {
+    return false;
+  }
+
+  // Read population rate recording region
+  if(!g_PopulationRateRecording.ReadSDRAMData(
+    Config::GetRegionStart(baseAddress, RegionPopulationRateRecording), flags,
+    g_AppWords[AppWordNumCurrentSources]))
+  {
+    return false;
+  }
+
   // Read profiler region
   if(!Common::Profiler::ReadSDRAMData(
     Config::GetRegionStart(baseAddress, RegionProfiler),
@@ -188,7 +230,7 @@ void TimerTick(uint tick, uint)
     LOG_PRINT(LOG_LEVEL_TRACE, "Timer tick %u", tick);
 
     // Zero output buffer
-    for(unsigned int o = 0; o < g_AppWords[AppWordNumCurrentSources]; o++)
+    for(unsigned int o = 0; o < g_NumOutputs; o++)
     {
       g_OutputBuffer[o] = 0;
     }
@@ -197,19 +239,32 @@ void TimerTick(uint tick, uint)
     auto emitSpikeLambda =
       [](unsigned int n)
       {
-        g_OutputBuffer[n] += g_OutputWeights[n];
+        g_OutputBuffer[g_OutputIndices[n]] += g_OutputWeights[n];
+      };
+
+    // Create lambda function to record spike
+    auto recordSpikeLambda =
+      [](unsigned int n, bool spiked)
+      {
+        g_SpikeRecording.RecordSpike(n, spiked);
+        g_SpikeCountRecording.RecordSpike(n, spiked);
+        g_PopulationRateRecording.RecordSpike(n, spiked);
       };
 
     // Update poisson source
-    g_SpikeSource.Update(tick, emitSpikeLambda, g_SpikeRecording,
+    g_SpikeSource.Update(tick, emitSpikeLambda, recordSpikeLambda,
       g_AppWords[AppWordNumCurrentSources]);
 
     // Transfer spike recording buffer to SDRAM
     g_SpikeRecording.TransferBuffer(DMATagSpikeRecordingWrite);
 
+    // End tick of spike count and population rate recording
+    g_SpikeCountRecording.EndTick();
+    g_PopulationRateRecording.EndTick();
+
 
 #if LOG_LEVEL <= LOG_LEVEL_TRACE
-    for(unsigned int i = 0; i < g_AppWords[AppWordNumCurrentSources]; i++)
+    for(unsigned int i = 0; i < g_NumOutputs; i++)
     {
       io_printf(IO_BUF, "%u,", g_OutputBuffer[i]);
     }
@@ -219,7 +274,7 @@ void TimerTick(uint tick, uint)
     // DMA output buffer into correct output buffer for this timer tick
     spin1_dma_transfer(DMATagOutputWrite, g_OutputBuffers[tick % 2],
                        g_OutputBuffer, DMA_WRITE,
-                       g_AppWords[AppWordNumCurrentSources] * sizeof(uint32_t));
+                       g_NumOutputs * sizeof(uint32_t));
   }
 }
 } // anonymous namespace
@@ -14,12 +14,15 @@ enum Region
   RegionOutputWeight,
   RegionSpikeRecording,
   RegionProfiler,
+  RegionSpikeCountRecording,
+  RegionPopulationRateRecording,
 };
 
 // Indexes of application words
 enum AppWord
 {
   AppWordNumCurrentSources,
+  AppWordNumSourcesPerOutput,
   AppWordMax,
 };
 
@@ -10,6 +10,9 @@
 #include "rig_cpp_common/spinnaker.h"
 #include "rig_cpp_common/utils.h"
 
+// Common includes
+#include "../common/recording_buffer.h"
+
 // Namespaces
 using namespace Common;
 using namespace Common::FixedPointNumber;
@@ -23,8 +26,11 @@ namespace NeuronProcessor
 class AnalogueRecording
 {
 public:
-  AnalogueRecording() : m_IndicesToRecord(NULL), m_SamplingIntervalTick(0),
-    m_TicksUntilRecord(0), m_RecordSDRAM(NULL)  {}
+  AnalogueRecording() : m_IndicesToRecord(NULL), m_NumRecorded(0),
+    m_SamplingIntervalTick(0), m_Precision(32), m_Aggregate(false),
+    m_Accumulators(NULL), m_TicksAccumulated(0), m_TicksUntilRecord(0),
+    m_CurrentIndex(0), m_Sum(0), m_SumOfSquares(0), m_RecordSDRAM(NULL),
+    m_RecordSDRAM16(NULL), m_Tick(0)  {}
 
   //-----------------------------------------------------------------------------
   // Public API
@@ -33,10 +39,13 @@ public:
   {
     LOG_PRINT(LOG_LEVEL_INFO, "\tAnalogueRecording::ReadSDRAMData");
 
-    // Read sampling interval from region
+    // Read sampling interval, precision and whether to average and aggregate from region
     m_SamplingIntervalTick = *region++;
-    LOG_PRINT(LOG_LEVEL_INFO, "\t\tSampling interval:%u (ticks)",
-              m_SamplingIntervalTick);
+    m_Precision = *region++;
+    const bool average = (*region++ != 0);
+    m_Aggregate = (*region++ != 0);
+    LOG_PRINT(LOG_LEVEL_INFO, "\t\tSampling interval:%u (ticks), Precision:%u bits, Average:%u, Aggregate:%u",
+              m_SamplingIntervalTick, m_Precision, average, m_Aggregate);
 
     // Calculate number of words that are required to build a bitfield for ALL neurons
     unsigned int numWords = BitField::GetWordSize(numNeurons);
@@ -54,54 +63,268 @@ public:
     io_printf(IO_BUF, "\n");
 #endif
 
-    // Cache pointer of subsequent data
-    m_RecordSDRAM = (S1615*)region;
-    LOG_PRINT(LOG_LEVEL_INFO, "\t\tRecording starting at %08x", m_RecordSDRAM);
+    // Count neurons to record
+    m_NumRecorded = 0;
+    for(unsigned int n = 0; n < numNeurons; n++)
+    {
+      if(BitField::TestBit(m_IndicesToRecord, n))
+      {
+        m_NumRecorded++;
+      }
+    }
+
+    // Calculate number of words in each sample
+    // **NOTE** aggregated samples consist of a 64-bit sum and sum of
+    // squares and 16-bit samples are packed two to a word
+    unsigned int numWordsPerSample = m_NumRecorded;
+    if(m_Aggregate)
+    {
+      numWordsPerSample = 4;
+    }
+    else if(m_Precision == 16)
+    {
+      numWordsPerSample = (m_NumRecorded + 1) / 2;
+    }
+    LOG_PRINT(LOG_LEVEL_INFO, "\t\tNum words per sample:%u", numWordsPerSample);
+
+    // If we should average, allocate and zero an accumulator for each recorded neuron
+    if(average && m_NumRecorded > 0)
+    {
+      m_Accumulators = (int64_t*)spin1_malloc(m_NumRecorded * sizeof(int64_t));
+      if(m_Accumulators == NULL)
+      {
+        LOG_PRINT(LOG_LEVEL_ERROR, "Unable to allocate accumulator array");
+        return false;
+      }
+
+      for(unsigned int i = 0; i < m_NumRecorded; i++)
+      {
+        m_Accumulators[i] = 0;
+      }
+    }
+
+    // Subsequent data is a ring buffer of samples, each of which consists of a
+    // tick word followed by a value for each recorded neuron or their aggregate
+    m_RecordingBuffer.ReadSDRAMData(region, numWordsPerSample + 1);
+
+    // Begin sample for first tick
+    m_Tick = 0;
+    m_TicksAccumulated = 0;
+    m_TicksUntilRecord = 0;
+    m_CurrentIndex = 0;
+    m_Sum = 0;
+    m_SumOfSquares = 0;
+    BeginSample();
 
     return true;
   }
 
   void RecordValue(unsigned int neuron, S1615 value)
   {
-    // If we should record this neuron this tick
-    if(m_TicksUntilRecord == 0 && BitField::TestBit(m_IndicesToRecord, neuron))
+    // If we're not recording this tick or averaging, there's nothing to do
+    if(m_TicksUntilRecord != 0 && m_Accumulators == NULL)
     {
-      LOG_PRINT(LOG_LEVEL_TRACE, "\t\tRecording neuron:%u, value:%k",
-                neuron,  value);
+      return;
+    }
 
-      // Write value to SDRAM
-      *m_RecordSDRAM++ = value;
+    // If we should record this neuron
+    if(BitField::TestBit(m_IndicesToRecord, neuron))
+    {
+      // If we're averaging, add value to neuron's accumulator
+      if(m_Accumulators != NULL)
+      {
+        m_Accumulators[m_CurrentIndex] += value;
+      }
+
+      // If we should record this tick
+      if(m_TicksUntilRecord == 0)
+      {
+        // If we're averaging, calculate mean over the ticks
+        // since the last sample and reset accumulator
+        if(m_Accumulators != NULL)
+        {
+          value = (S1615)(m_Accumulators[m_CurrentIndex] /
+                          (int64_t)(m_TicksAccumulated + 1));
+          m_Accumulators[m_CurrentIndex] = 0;
+        }
+
+        // If there is a current sample, write value to it
+        // **NOTE** if the recording buffer is full, there's no current sample
+        if(m_RecordSDRAM != NULL)
+        {
+          LOG_PRINT(LOG_LEVEL_TRACE, "\t\tRecording neuron:%u, value:%k",
+                    neuron,  value);
+
+          // If we're aggregating, add value and its square to totals
+          // **NOTE** squares are shifted back into S16.15 format
+          if(m_Aggregate)
+          {
+            m_Sum += value;
+            m_SumOfSquares += ((int64_t)value * (int64_t)value) >> 15;
+          }
+          else if(m_Precision == 16)
+          {
+            *m_RecordSDRAM16++ = ToS78(value);
+          }
+          else
+          {
+            *m_RecordSDRAM++ = value;
+          }
+        }
+      }
+
+      // Go onto next recorded neuron
+      m_CurrentIndex++;
     }
   }
 
 
   void EndTick()
   {
-    // If we've been recording this tick, reset
-    // ticks until record to sampling interval
+    // Advance tick and reset recorded neuron index
+    m_Tick++;
+    m_CurrentIndex = 0;
+
+    // If we've been recording this tick
     if(m_TicksUntilRecord == 0)
     {
+      // If a sample was written, make it available to host
+      if(m_RecordSDRAM != NULL)
+      {
+        // If we're aggregating, write totals to sample as 64-bit
+        // values split into words as SDRAM slots are only word-aligned
+        if(m_Aggregate)
+        {
+          uint32_t *sample = (uint32_t*)m_RecordSDRAM;
+          sample[0] = (uint32_t)m_Sum;
+          sample[1] = (uint32_t)(m_Sum >> 32);
+          sample[2] = (uint32_t)m_SumOfSquares;
+          sample[3] = (uint32_t)(m_SumOfSquares >> 32);
+        }
+
+        m_RecordingBuffer.CommitSlot();
+      }
+
+      // Reset aggregate totals
+      m_Sum = 0;
+      m_SumOfSquares = 0;
+
+      // Reset ticks until record to sampling interval
+      // and number of ticks values have been accumulated over
       m_TicksUntilRecord = m_SamplingIntervalTick;
+      m_TicksAccumulated = 0;
+    }
+    else
+    {
+      m_TicksAccumulated++;
     }
 
     // Decrement counter
     m_TicksUntilRecord--;
+
+    // If we should record next tick, begin a new sample
+    if(m_TicksUntilRecord == 0)
+    {
+      BeginSample();
+    }
   }
 
 private:
+  //-----------------------------------------------------------------------------
+  // Private methods
+  //-----------------------------------------------------------------------------
+  void BeginSample()
+  {
+    // If nothing is being recorded, there's no sample
+    if(m_NumRecorded == 0)
+    {
+      m_RecordSDRAM = NULL;
+      return;
+    }
+
+    // Get next free slot in SDRAM ring buffer, dropping
+    // this sample if the host hasn't made space for it
+    uint32_t *slot = m_RecordingBuffer.GetNextSlot();
+    if(slot == NULL)
+    {
+      LOG_PRINT(LOG_LEVEL_TRACE, "\t\tRecording buffer full - dropping sample");
+      m_RecordSDRAM = NULL;
+    }
+    // Otherwise, stamp sample with tick and point record pointers after it
+    else
+    {
+      *slot++ = m_Tick;
+      m_RecordSDRAM = (S1615*)slot;
+      m_RecordSDRAM16 = (int16_t*)slot;
+    }
+  }
+
+  static int16_t ToS78(S1615 value)
+  {
+    // Round S16.15 value to nearest S7.8 value
+    int32_t rounded = (value + (1 << 6)) >> 7;
+
+    // Saturate to 16-bit range
+    if(rounded > INT16_MAX)
+    {
+      return INT16_MAX;
+    }
+    else if(rounded < INT16_MIN)
+    {
+      return INT16_MIN;
+    }
+    else
+    {
+      return (int16_t)rounded;
+    }
+  }
+
   //-----------------------------------------------------------------------------
   // Members
   //-----------------------------------------------------------------------------
   // Bit field specifying which neurons to record
   uint32_t *m_IndicesToRecord;
 
+  // How many neurons are recorded
+  unsigned int m_NumRecorded;
+
   // How often should we record
   uint32_t m_SamplingIntervalTick;
 
+  // How many bits should each value be recorded with (16 or 32)
+  uint32_t m_Precision;
+
+  // Should the sum and sum of squares of recorded neurons' values
+  // be recorded rather than the value of each neuron
+  bool m_Aggregate;
+
+  // If we're averaging, accumulated values of each recorded neuron
+  // **NOTE** NULL if values are sampled rather than averaged
+  int64_t *m_Accumulators;
+
+  // How many ticks have values been accumulated over since the last sample
+  uint32_t m_TicksAccumulated;
+
   // How many ticks until we should record next sample
   uint32_t m_TicksUntilRecord;
 
-  // Pointer to SDRAM to write next value to
+  // Index of next recorded neuron within this tick
+  unsigned int m_CurrentIndex;
+
+  // If we're aggregating, sum and sum of squares of
+  // the values of the recorded neurons in this sample
+  int64_t m_Sum;
+  int64_t m_SumOfSquares;
+
+  // Pointers to SDRAM to write next 32 or 16-bit value to
+  // **NOTE** m_RecordSDRAM is NULL if there is no current sample
   S1615 *m_RecordSDRAM;
+  int16_t *m_RecordSDRAM16;
+
+  // Ring buffer in SDRAM to write samples to
+  RecordingBuffer m_RecordingBuffer;
+
+  // Current simulation tick
+  uint32_t m_Tick;
 };
-}
\ No newline at end of file
+}
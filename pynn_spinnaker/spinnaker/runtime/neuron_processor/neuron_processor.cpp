@@ -14,6 +14,8 @@
 
 // Common includes
 #include "../common/flush.h"
+#include "../common/population_rate_recording.h"
+#include "../common/spike_count_recording.h"
 #include "../common/spike_recording.h"
 
 // Neuron processor includes
@@ -68,6 +70,8 @@ Flush g_Flush;
 IntrinsicPlasticity g_IntrinsicPlasticity;
 
 SpikeRecording g_SpikeRecording;
+SpikeCountRecording g_SpikeCountRecording;
+PopulationRateRecording g_PopulationRateRecording;
 AnalogueRecording g_AnalogueRecording[Neuron::RecordingChannelMax + IntrinsicPlasticity::RecordingChannelMax];
 Statistics<StatWordMax> g_Statistics;
 
@@ -221,6 +225,22 @@ bool ReadSDRAMData(uint32_t *baseAddress, uint32_t flags)
     return false;
   }
 
+  // Read spike count recording region
+  if(!g_SpikeCountRecording.ReadSDRAMData(
+    Config::GetRegionStart(baseAddress, RegionSpikeCountRecording), flags,
+    g_AppWords[AppWordNumNeurons]))
+  {
+    return false;
+  }
+
+  // Read population rate recording region
+  if(!g_PopulationRateRecording.ReadSDRAMData(
+    Config::GetRegionStart(baseAddress, RegionPopulationRateRecording), flags,
+    g_AppWords[AppWordNumNeurons]))
+  {
+    return false;
+  }
+
   // Check that there are enough analogue recording regions for this neuron model
   static_assert(RegionAnalogueRecordingEnd - RegionAnalogueRecordingStart >= (Neuron::RecordingChannelMax + IntrinsicPlasticity::RecordingChannelMax),
                 "Not enough analogue recording regions for neuron and intrinsic plasticity model channels");
@@ -313,6 +333,8 @@ void UpdateNeurons()
 
     // Record spike
     g_SpikeRecording.RecordSpike(n, spiked);
+    g_SpikeCountRecording.RecordSpike(n, spiked);
+    g_PopulationRateRecording.RecordSpike(n, spiked);
 
     // Update intrinsic plasticity based on new spike
     g_IntrinsicPlasticity.ApplySpike(n, spiked);
@@ -378,6 +400,10 @@ void UpdateNeurons()
   g_SpikeRecording.TransferBuffer(DMATagSpikeRecordingWrite);
   g_BackPropagationOutput.TransferBuffer(g_Tick, DMATagBackPropagationWrite);
 
+  // End tick of spike count and population rate recording
+  g_SpikeCountRecording.EndTick();
+  g_PopulationRateRecording.EndTick();
+
   // Loop through all analogue recording regions and
   // end tick (updates sampling interval mechanism)
   for(unsigned int r = 0;
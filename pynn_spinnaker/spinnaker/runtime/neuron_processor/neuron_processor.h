@@ -20,6 +20,8 @@ enum Region
   RegionAnalogueRecordingEnd = RegionAnalogueRecordingStart + 4,
   RegionProfiler = RegionAnalogueRecordingEnd,
   RegionStatistics,
+  RegionSpikeCountRecording,
+  RegionPopulationRateRecording,
 };
 
 // Indexes of application words
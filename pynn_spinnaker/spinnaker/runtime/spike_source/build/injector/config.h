@@ -0,0 +1,12 @@
+#pragma once
+
+// Common includes
+#include "../../../common/injector_source.h"
+
+namespace SpikeSource
+{
+//-----------------------------------------------------------------------------
+// Typedefines
+//-----------------------------------------------------------------------------
+typedef Common::InjectorSource Source;
+};
\ No newline at end of file
@@ -13,6 +13,8 @@
 
 // Common includes
 #include "../common/flush.h"
+#include "../common/population_rate_recording.h"
+#include "../common/spike_count_recording.h"
 #include "../common/spike_recording.h"
 
 // Configuration include
@@ -40,6 +42,8 @@ uint32_t g_AppWords[AppWordMax];
 Statistics<StatWordMax> g_Statistics;
 
 SpikeRecording g_SpikeRecording;
+SpikeCountRecording g_SpikeCountRecording;
+PopulationRateRecording g_PopulationRateRecording;
 
 Flush g_Flush;
 
@@ -93,6 +97,22 @@ bool ReadSDRAMData(uint32_t *baseAddress, uint32_t flags)
     return false;
   }
 
+  // Read spike count recording region
+  if(!g_SpikeCountRecording.ReadSDRAMData(
+    Config::GetRegionStart(baseAddress, RegionSpikeCountRecording), flags,
+    g_AppWords[AppWordNumSpikeSources]))
+  {
+    return false;
+  }
+
+  // Read population rate recording region
+  if(!g_PopulationRateRecording.ReadSDRAMData(
+    Config::GetRegionStart(baseAddress, RegionPopulationRateRecording), flags,
+    g_AppWords[AppWordNumSpikeSources]))
+  {
+    return false;
+  }
+
   // Read profiler region
   if(!Profiler::ReadSDRAMData(
     Config::GetRegionStart(baseAddress, RegionProfiler),
@@ -126,6 +146,17 @@ void DMATransferDone(uint, uint tag)
   }
 }
 //-----------------------------------------------------------------------------
+void SDPReceived(uint mailbox, uint port)
+{
+  // Pass packet to spike source and then free it
+  sdp_msg_t *msg = (sdp_msg_t*)mailbox;
+  if(!g_SpikeSource.SDPReceived(msg, port))
+  {
+    LOG_PRINT(LOG_LEVEL_WARN, "Spike source unable to handle SDP packet on port %u", port);
+  }
+  spin1_msg_free(msg);
+}
+//-----------------------------------------------------------------------------
 void TimerTick(uint tick, uint)
 {
   // Subtract 1 from tick as they start at 1
@@ -167,15 +198,28 @@ void TimerTick(uint tick, uint)
         }
       };
 
+    // Create lambda function to record spike
+    auto recordSpikeLambda =
+      [](unsigned int n, bool spiked)
+      {
+        g_SpikeRecording.RecordSpike(n, spiked);
+        g_SpikeCountRecording.RecordSpike(n, spiked);
+        g_PopulationRateRecording.RecordSpike(n, spiked);
+      };
+
     // Update spike source
     Profiler::WriteEntry(Profiler::Enter | ProfilerTagUpdateNeurons);
-    g_SpikeSource.Update(tick, emitSpikeLambda, g_SpikeRecording,
+    g_SpikeSource.Update(tick, emitSpikeLambda, recordSpikeLambda,
       g_AppWords[AppWordNumSpikeSources]
     );
     Profiler::WriteEntry(Profiler::Exit | ProfilerTagUpdateNeurons);
 
     // Transfer spike recording buffer to SDRAM
     g_SpikeRecording.TransferBuffer(DMATagOutputWrite);
+
+    // End tick of spike count and population rate recording
+    g_SpikeCountRecording.EndTick();
+    g_PopulationRateRecording.EndTick();
   }
 }
 } // Anonymous namespace
@@ -202,6 +246,7 @@ extern "C" void c_main()
   // Register callbacks
   spin1_callback_on(TIMER_TICK,         TimerTick,        2);
   spin1_callback_on(DMA_TRANSFER_DONE,  DMATransferDone,   0);
+  spin1_callback_on(SDP_PACKET_RX,      SDPReceived,       1);
   
   // Start simulation
   spin1_start(SYNC_WAIT);
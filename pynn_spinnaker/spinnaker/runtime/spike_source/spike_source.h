@@ -14,6 +14,8 @@ enum Region
   RegionSpikeRecording = 7,
   RegionProfiler = 12,
   RegionStatistics,
+  RegionSpikeCountRecording,
+  RegionPopulationRateRecording,
 };
 
 // Indexes of application words
@@ -0,0 +1,376 @@
+# Import modules
+import logging
+import numpy as np
+import socket
+import struct
+import sys
+import threading
+import time
+
+# Import classes
+from collections import defaultdict
+
+# Import functions
+from six import reraise
+
+logger = logging.getLogger("pynn_spinnaker")
+
+# SDP port on which injector cores receive spikes,
+# corresponding to InjectorSource::SDPPort in injector_source.h
+SDP_PORT = 1
+
+# Each spike is packed into a word with the neuron index in the low bits and
+# the tick, relative to the first word of the packet, in the remaining bits
+NEURON_BITS = 10
+MAX_TICK_OFFSET = (1 << (32 - NEURON_BITS)) - 1
+
+# A packet's 272 byte payload contains a base tick followed by spikes
+MAX_SPIKES_PER_PACKET = 67
+
+
+# ----------------------------------------------------------------------------
+# Functions
+# ----------------------------------------------------------------------------
+def encode_spike_payloads(neurons, ticks):
+    """Pack spikes into SDP payloads to send to an injector core.
+
+    Parameters
+    ----------
+    neurons : :py:class:`numpy.ndarray`
+        Indices of the spiking neurons within the vertex.
+    ticks : :py:class:`numpy.ndarray`
+        Ticks at which the neurons spike, sorted in ascending order.
+
+    Returns
+    -------
+    [bytes]
+        Payloads, each containing a base tick followed by packed spikes.
+    """
+    payloads = []
+    start = 0
+    while start < len(ticks):
+        # Take as many spikes as fit in a packet, stopping early if
+        # any are too far ahead of the first to fit in their word
+        stop = min(len(ticks), start + MAX_SPIKES_PER_PACKET)
+        base_tick = ticks[start]
+        stop = start + np.searchsorted(ticks[start:stop],
+                                       base_tick + MAX_TICK_OFFSET,
+                                       side="right")
+
+        # Pack spikes into words and precede with base tick
+        words = (((ticks[start:stop] - base_tick) << NEURON_BITS) |
+                 neurons[start:stop])
+        payloads.append(struct.pack("I", base_tick) +
+                        words.astype(np.uint32).tostring())
+        start = stop
+
+    return payloads
+
+
+def decode_spike_payload(payload):
+    """Unpack the spikes contained in an SDP payload sent to an injector core.
+
+    Returns
+    -------
+    (:py:class:`numpy.ndarray`, :py:class:`numpy.ndarray`)
+        Indices of the spiking neurons within the vertex
+        and the ticks at which they spike.
+    """
+    words = np.fromstring(payload, dtype=np.uint32)
+    neurons = words[1:] & ((1 << NEURON_BITS) - 1)
+    ticks = words[0] + (words[1:] >> NEURON_BITS)
+    return neurons.astype(int), ticks.astype(int)
+
+
+# ----------------------------------------------------------------------------
+# SpikeInjectionQueue
+# ----------------------------------------------------------------------------
+class SpikeInjectionQueue(object):
+    """Thread-safe queue of spikes pushed to an injector population which
+    have not yet been taken by :py:class:`SpikeInjectionSender`."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._batches = []
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(b[0]) for b in self._batches)
+
+    # --------------------------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------------------------
+    def push(self, indices, ticks):
+        """Add spikes, emitted by the population indices at the given ticks."""
+        indices = np.asarray(indices, dtype=int)
+        ticks = np.asarray(ticks, dtype=int)
+        assert indices.shape == ticks.shape
+
+        with self._lock:
+            self._batches.append((indices, ticks))
+
+    def take(self):
+        """Remove all queued spikes, returning their indices and ticks."""
+        with self._lock:
+            batches = self._batches
+            self._batches = []
+
+        if len(batches) == 0:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
+        else:
+            return (np.hstack([b[0] for b in batches]),
+                    np.hstack([b[1] for b in batches]))
+
+
+# ----------------------------------------------------------------------------
+# SpikeInjectionSender
+# ----------------------------------------------------------------------------
+class SpikeInjectionSender(threading.Thread):
+    """Background thread which sends spikes pushed to injector populations to
+    the cores simulating them as SDP packets while the simulation is running.
+
+    Spikes are sent when they are due within `lookahead_ticks` of the current
+    simulation tick, estimated from the time since :py:meth:`start`, so cores
+    only need to buffer a short window of spikes. No more than
+    `max_packets_per_second` packets are sent so that the Ethernet
+    connection to SpiNNaker isn't overwhelmed.
+
+    **NOTE** spikes which arrive after the tick they are due
+    are emitted in the next tick rather than being dropped.
+    """
+    def __init__(self, hostname, targets, tick_period_s, simulation_ticks,
+                 lookahead_ticks, max_packets_per_second,
+                 port=None, poll_interval=0.001):
+        super(SpikeInjectionSender, self).__init__(name="SpikeInjectionSender")
+
+        # Don't keep process alive if simulation is interrupted
+        self.daemon = True
+
+        # List of (queue, [(vertex slice, (x, y, p))]) tuples
+        # describing the vertices spikes from each queue are sent to
+        self.targets = targets
+
+        self.tick_period_s = tick_period_s
+        self.simulation_ticks = simulation_ticks
+        self.lookahead_ticks = lookahead_ticks
+        self.min_packet_interval = 1.0 / float(max_packets_per_second)
+        self.poll_interval = poll_interval
+
+        # Statistics
+        self.num_packets = 0
+        self.num_spikes = 0
+        self.num_discarded = 0
+
+        # Spikes taken from each target's queue but not yet sent,
+        # sorted by tick, as (indices, ticks) tuples
+        self._pending = [(np.empty(0, dtype=int), np.empty(0, dtype=int))
+                         for _ in targets]
+
+        # Create UDP socket to send packets through,
+        # by default, to the port SpiNNaker receives SCP packets on
+        if port is None:
+            from rig.machine_control.consts import SCP_PORT
+            port = SCP_PORT
+        self._address = (hostname, port)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        self._start_time = None
+        self._next_send_time = 0.0
+        self._stop_event = threading.Event()
+        self._exc_info = None
+
+    # --------------------------------------------------------------------------
+    # Thread methods
+    # --------------------------------------------------------------------------
+    def run(self):
+        try:
+            # Until stopped, send any spikes that are now due
+            self._start_time = time.time()
+            while not self._stop_event.is_set():
+                if not self.send_due(self._get_current_tick()):
+                    self._stop_event.wait(self.poll_interval)
+        except:
+            # Store exception so it can be re-raised in main thread
+            self._exc_info = sys.exc_info()
+
+    # --------------------------------------------------------------------------
+    # Public methods
+    # --------------------------------------------------------------------------
+    def send_due(self, current_tick):
+        """Send all pending spikes due before the lookahead window after
+        `current_tick` ends, returning whether any spikes were sent."""
+        any_sent = False
+        send_before_tick = current_tick + self.lookahead_ticks
+        for t, (queue, vertices) in enumerate(self.targets):
+            # Merge newly-pushed spikes into pending spikes
+            self._update_pending(t, queue)
+
+            # Split off pending spikes which are now due
+            indices, ticks = self._pending[t]
+            num_due = np.searchsorted(ticks, send_before_tick)
+            if num_due == 0:
+                continue
+            self._pending[t] = (indices[num_due:], ticks[num_due:])
+            indices = indices[:num_due]
+            ticks = ticks[:num_due]
+
+            # Loop through vertices and send their due spikes
+            for vertex_slice, (x, y, p) in vertices:
+                mask = ((indices >= vertex_slice.start) &
+                        (indices < vertex_slice.stop))
+                for payload in encode_spike_payloads(
+                        indices[mask] - vertex_slice.start, ticks[mask]):
+                    self._send(x, y, p, payload)
+
+            self.num_spikes += num_due
+            any_sent = True
+
+        return any_sent
+
+    def stop(self):
+        # Signal thread to stop and wait for it to do so
+        self._stop_event.set()
+        self.join()
+        self._socket.close()
+
+        logger.info("Injected %u spikes in %u packets",
+                    self.num_spikes, self.num_packets)
+
+        # Warn if any spikes were pushed for times outside the simulation
+        if self.num_discarded > 0:
+            logger.warn("%u injected spikes were discarded as they were not "
+                        "within the simulation", self.num_discarded)
+
+        # If thread raised an exception, re-raise it here
+        if self._exc_info is not None:
+            reraise(*self._exc_info)
+
+    # --------------------------------------------------------------------------
+    # Private methods
+    # --------------------------------------------------------------------------
+    def _get_current_tick(self):
+        return int((time.time() - self._start_time) / self.tick_period_s)
+
+    def _update_pending(self, t, queue):
+        # Take any spikes pushed to queue since last update
+        new_indices, new_ticks = queue.take()
+        if len(new_ticks) == 0:
+            return
+
+        # Discard any which are outside of simulation
+        valid = (new_ticks >= 0) & (new_ticks < self.simulation_ticks)
+        self.num_discarded += len(valid) - np.count_nonzero(valid)
+
+        # Add remainder to pending spikes and stable sort by tick
+        indices, ticks = self._pending[t]
+        indices = np.hstack((indices, new_indices[valid]))
+        ticks = np.hstack((ticks, new_ticks[valid]))
+        order = np.argsort(ticks, kind="mergesort")
+        self._pending[t] = (indices[order], ticks[order])
+
+    def _send(self, x, y, p, payload):
+        from rig.machine_control.packets import SDPPacket
+
+        # Wait until rate limit allows another packet to be sent
+        delay = self._next_send_time - time.time()
+        if delay > 0.0:
+            time.sleep(delay)
+        self._next_send_time = max(time.time(), self._next_send_time) +\
+            self.min_packet_interval
+
+        # Build SDP packet and send, preceded by the
+        # two bytes of padding required when using UDP
+        packet = SDPPacket(dest_port=SDP_PORT, dest_cpu=p,
+                           dest_x=x, dest_y=y, data=payload)
+        self._socket.sendto(b"\x00\x00" + packet.bytestring, self._address)
+        self.num_packets += 1
+
+
+# ----------------------------------------------------------------------------
+# LoopbackSpikeInjectionEndpoint
+# ----------------------------------------------------------------------------
+class LoopbackSpikeInjectionEndpoint(threading.Thread):
+    """Local stand-in for SpiNNaker which receives the packets sent by
+    :py:class:`SpikeInjectionSender` over UDP and decodes the spikes within
+    them so the host side of spike injection can be tested and benchmarked
+    without a board.
+    """
+    def __init__(self, hostname="127.0.0.1", port=0):
+        super(LoopbackSpikeInjectionEndpoint, self).__init__(
+            name="LoopbackSpikeInjectionEndpoint")
+
+        # Don't keep process alive if main thread exits
+        self.daemon = True
+
+        # Bind socket, by default to any free port
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind((hostname, port))
+        self._socket.settimeout(0.01)
+        self.address = self._socket.getsockname()
+
+        # Statistics
+        self.num_packets = 0
+        self.first_receive_time = None
+        self.last_receive_time = None
+
+        # Dictionary mapping (x, y, p) to lists of (neurons, ticks,
+        # receive time) tuples decoded from each packet
+        self._spikes = defaultdict(list)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    # --------------------------------------------------------------------------
+    # Thread methods
+    # --------------------------------------------------------------------------
+    def run(self):
+        from rig.machine_control.packets import SDPPacket
+
+        while not self._stop_event.is_set():
+            try:
+                data = self._socket.recv(1024)
+            except socket.timeout:
+                continue
+
+            # Strip padding from packet and decode
+            receive_time = time.time()
+            packet = SDPPacket.from_bytestring(data[2:])
+            assert packet.dest_port == SDP_PORT
+
+            # Add decoded spikes to list for destination core
+            core = (packet.dest_x, packet.dest_y, packet.dest_cpu)
+            with self._lock:
+                self._spikes[core].append(
+                    decode_spike_payload(packet.data) + (receive_time,))
+
+                self.num_packets += 1
+                if self.first_receive_time is None:
+                    self.first_receive_time = receive_time
+                self.last_receive_time = receive_time
+
+    # --------------------------------------------------------------------------
+    # Public methods
+    # --------------------------------------------------------------------------
+    def get_spikes(self, x, y, p):
+        """Get the neuron indices and ticks of all spikes received for a core,
+        in the order they were received."""
+        with self._lock:
+            spikes = list(self._spikes[(x, y, p)])
+
+        if len(spikes) == 0:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
+        else:
+            return (np.hstack([s[0] for s in spikes]),
+                    np.hstack([s[1] for s in spikes]))
+
+    def get_receive_times(self, x, y, p):
+        """Get the times, as returned by :py:func:`time.time`, at which each
+        spike returned by :py:meth:`get_spikes` for a core was received."""
+        with self._lock:
+            spikes = list(self._spikes[(x, y, p)])
+
+        return np.asarray([s[2] for s in spikes for _ in s[1]], dtype=float)
+
+    def stop(self):
+        # Signal thread to stop and wait for it to do so
+        self._stop_event.set()
+        self.join()
+        self._socket.close()
@@ -11,3 +11,8 @@ class SpinnakerPopulationConfig(object):
         self.max_neurons_per_core = None
         self.max_cluster_width = None
         self.flush_time = None
+        self.recording_buffer_time = None
+        self.spike_recording_format = "bitfield"
+        self.analogue_recording_precision = {}
+        self.analogue_recording_average = {}
+        self.analogue_recording_aggregate = {}
@@ -7,17 +7,17 @@ import math
 import numpy as np
 from os import path
 import regions
-from rig import machine
 import sys
 
 # Import classes
 from collections import defaultdict
 from rig_cpp_common.regions import Profiler, Statistics, System
 from rig_cpp_common.utils import Args
+from bulk_read import CachedMemoryIO
 from utils import InputVertex
 
 # Import functions
-from pkg_resources import resource_filename
+from bulk_read import cache_region_memory
 from rig_cpp_common.utils import load_regions
 from six import iteritems, iterkeys, itervalues
 from utils import get_model_executable_filename, split_slice
@@ -55,6 +55,10 @@ class WeightRange(object):
         self.min = min(self.min, np.amin(abs_weight))
         self.max = max(self.max, np.amax(abs_weight))
 
+    def update_range(self, weight_min, weight_max):
+        self.min = min(self.min, weight_min)
+        self.max = max(self.max, weight_max)
+
     @property
     def fixed_point(self):
         # Get MSB for maximum weight
@@ -140,6 +144,9 @@ class SynapseCluster(object):
                  synapse_model, receptor_index, synaptic_projections,
                  vertex_load_applications, vertex_run_applications,
                  vertex_resources, post_synaptic_width):
+        from pkg_resources import resource_filename
+        from rig.place_and_route import Cores, SDRAM
+
         # Dictionary of regions
         self.regions = {}
         self.regions[Regions.system] = System(timer_period_us, sim_ticks)
@@ -298,13 +305,15 @@ class SynapseCluster(object):
             # Add resources to dictionary, checking that 
             # SDRAM is an integer as otherwise C CSA fails
             assert isinstance(s, int)
-            vertex_resources[v] = {machine.Cores: 1, machine.SDRAM: s}
+            vertex_resources[v] = {Cores: 1, SDRAM: s}
 
     # --------------------------------------------------------------------------
     # Public methods
     # --------------------------------------------------------------------------
     def allocate_out_buffers(self, placements, allocations,
                              machine_controller):
+        from rig.place_and_route import Cores
+
         # Loop through synapse verts
         for v in self.verts:
             # Get placement and allocation
@@ -312,7 +321,7 @@ class SynapseCluster(object):
             vertex_allocation = allocations[v]
 
             # Get core this vertex should be run on
-            core = vertex_allocation[machine.Cores]
+            core = vertex_allocation[Cores]
             assert (core.stop - core.start) == 1
 
             logger.debug("\t\tVertex %s (%u, %u, %u)",
@@ -331,7 +340,8 @@ class SynapseCluster(object):
                     for _ in range(2)]
 
     def load(self, placements, allocations, machine_controller,
-             incoming_projections, flush_mask):
+             incoming_projections, flush_mask, matrix_cache=None):
+        from rig.place_and_route import Cores
 
         projection_state_dict = {}
         for p in itertools.chain.from_iterable(itervalues(incoming_projections)):
@@ -378,48 +388,33 @@ class SynapseCluster(object):
                         weight_range.update(weight_max)
                 # Otherwise
                 else:
-                    # Create list of lists to contain matrix rows
-                    sub_rows = [[] for _ in range(pre_pop.size)]
-
-                    # Loop through projections leading from pre_pop
-                    for proj in incoming_from_pre:
-                        # Check local mask isn't currently in use
-                        assert np.all(proj.post._mask_local)
-
-                        # Cache original post mask (due to above
-                        # this is slightly pointless but still)
-                        old_post_mask = proj.post._mask_local
-                        old_num_processes = proj._simulator.state.num_processes
-
-                        # Create new local mask to select only the columns
-                        # corresponding to neurons in postsynaptic vertex
-                        proj.post._mask_local = np.zeros((proj.post.size,),
-                                                         dtype=bool)
-                        proj.post._mask_local[post_slice.python_slice] = True
-
-                        # Some connectors also use num_processes for
-                        # partial connector building so override this too
-                        proj._simulator.state.num_processes =\
-                            len(self.post_slices)
-
-                        # Cache original connector callback
-                        old_connector_callback = proj._connector.callback
-                        proj._connector.callback = None
-
-                        # Add synapses from projection to rows
-                        proj._build(matrix_rows=sub_rows,
-                                    weight_range=weight_range,
-                                    directly_connect=False)
-
-                        # Restore old mask, connector callback
-                        # and number of processes
-                        proj.post._mask_local = old_post_mask
-                        proj._connector.callback = old_connector_callback
-                        proj._simulator.state.num_processes = old_num_processes
-
-                    # Convert rows to numpy and add to dictionary
-                    pre_pop_sub_rows[pre_pop] = [np.asarray(r, dtype=row_dtype)
-                                                for r in sub_rows]
+                    # If there's a cache, get key for the synapses
+                    # the projections from pre_pop generate in this slice
+                    cache_key = None
+                    if matrix_cache is not None:
+                        cache_key = matrix_cache.get_key(incoming_from_pre,
+                                                         post_slice,
+                                                         len(self.post_slices))
+
+                    # If there is a key, try and read rows from cache
+                    cached = (None if cache_key is None
+                              else matrix_cache.get(cache_key,
+                                                    incoming_from_pre))
+                    if cached is not None:
+                        sub_rows, (weight_min, weight_max) = cached
+                    else:
+                        sub_rows, weight_min, weight_max =\
+                            self._generate_sub_rows(pre_pop, post_slice,
+                                                    incoming_from_pre)
+
+                        # If synapses can be cached, add them to cache
+                        if cache_key is not None:
+                            matrix_cache.put(cache_key, sub_rows, weight_min,
+                                             weight_max, incoming_from_pre)
+
+                    # Update weight range and add rows to dictionary
+                    weight_range.update_range(weight_min, weight_max)
+                    pre_pop_sub_rows[pre_pop] = sub_rows
 
             logger.debug("\t\t\t\t%u generated on host, %u to generate on chip",
                          len(pre_pop_sub_rows), len(pre_pop_on_chip_proj))
@@ -438,7 +433,7 @@ class SynapseCluster(object):
                 vertex_allocation = allocations[v]
 
                 # Get core this vertex should be run on
-                core = vertex_allocation[machine.Cores]
+                core = vertex_allocation[Cores]
                 assert (core.stop - core.start) == 1
 
                 logger.debug("\t\t\t\tVertex %s (%u, %u, %u)",
@@ -514,36 +509,104 @@ class SynapseCluster(object):
             [v.region_memory[Regions.statistics] for v in self.verts],
             self.statistic_names)
 
+    def get_readback_requests(self):
+        # Wrap memory of regions which are read back
+        # after simulation so it can be prefetched
+        return cache_region_memory(
+            self.verts, [r for r in (Regions.profiler, Regions.statistics)
+                         if r in self.regions])
+
     def read_synaptic_matrices(self, pre_pop, names, sim_timestep_ms,
-                               is_inhibitory):
+                               is_inhibitory, bulk_reader=None):
+        return list(self.iter_synaptic_matrices(pre_pop, names,
+                                                sim_timestep_ms,
+                                                is_inhibitory, bulk_reader))
+
+    def iter_synaptic_matrices(self, pre_pop, names, sim_timestep_ms,
+                               is_inhibitory, bulk_reader=None):
         # Get the synaptic matrix region
         region = self.regions[Regions.synaptic_matrix]
 
-        # Loop through synapse vertices (post-synaptic)
-        sub_matrices = []
-        for post_s_vert in self.verts:
-            # If this synapse vertex has no incoming connections
-            # from pre-synaptic population, skip
-            if pre_pop not in post_s_vert.incoming_connections:
-                continue
-
-            # Get region memory for synaptic matrix
-            region_mem = post_s_vert.region_memory[Regions.synaptic_matrix]
+        # Get synapse vertices (post-synaptic) with
+        # incoming connections from pre-synaptic population
+        post_s_verts = [v for v in self.verts
+                        if pre_pop in v.incoming_connections]
+
+        # Get region memory for synaptic matrix of each vertex
+        region_mems = [v.region_memory[Regions.synaptic_matrix]
+                       for v in post_s_verts]
+
+        # If a bulk reader is provided, use it to prefetch all the
+        # sub-matrices associated with pre-synaptic population at once
+        if bulk_reader is not None:
+            region_mems = [CachedMemoryIO(m) for m in region_mems]
+            requests = []
+            for post_s_vert, region_mem in zip(post_s_verts, region_mems):
+                for pre_n_vert in post_s_vert.incoming_connections[pre_pop]:
+                    requests.append(region.get_sub_matrix_request(
+                        pre_n_vert, post_s_vert, region_mem))
+            bulk_reader.read(requests)
 
+        # Loop through synapse vertices
+        for post_s_vert, region_mem in zip(post_s_verts, region_mems):
             # Loop through list of pre-synaptic vertices
             # this synapse vertex is connected to
             for pre_n_vert in post_s_vert.incoming_connections[pre_pop]:
-                # Read associated sub-matrix
-                sub_matrices.append(
-                    region.read_sub_matrix(pre_n_vert, post_s_vert,
-                                           names, region_mem,
-                                           sim_timestep_ms, is_inhibitory))
-
-        return sub_matrices
+                # Read and yield associated sub-matrix
+                yield region.read_sub_matrix(pre_n_vert, post_s_vert,
+                                             names, region_mem,
+                                             sim_timestep_ms, is_inhibitory)
 
     # --------------------------------------------------------------------------
     # Private methods
     # --------------------------------------------------------------------------
+    def _generate_sub_rows(self, pre_pop, post_slice, incoming_from_pre):
+        # Create list of lists to contain matrix rows
+        sub_rows = [[] for _ in range(pre_pop.size)]
+
+        # Create weight range for these projections
+        weight_range = WeightRange(self.synapse_model._signed_weight)
+
+        # Loop through projections leading from pre_pop
+        for proj in incoming_from_pre:
+            # Check local mask isn't currently in use
+            assert np.all(proj.post._mask_local)
+
+            # Cache original post mask (due to above
+            # this is slightly pointless but still)
+            old_post_mask = proj.post._mask_local
+            old_num_processes = proj._simulator.state.num_processes
+
+            # Create new local mask to select only the columns
+            # corresponding to neurons in postsynaptic vertex
+            proj.post._mask_local = np.zeros((proj.post.size,),
+                                             dtype=bool)
+            proj.post._mask_local[post_slice.python_slice] = True
+
+            # Some connectors also use num_processes for
+            # partial connector building so override this too
+            proj._simulator.state.num_processes =\
+                len(self.post_slices)
+
+            # Cache original connector callback
+            old_connector_callback = proj._connector.callback
+            proj._connector.callback = None
+
+            # Add synapses from projection to rows
+            proj._build(matrix_rows=sub_rows,
+                        weight_range=weight_range,
+                        directly_connect=False)
+
+            # Restore old mask, connector callback
+            # and number of processes
+            proj.post._mask_local = old_post_mask
+            proj._connector.callback = old_connector_callback
+            proj._simulator.state.num_processes = old_num_processes
+
+        # Convert rows to numpy and return with weight range
+        return ([np.asarray(r, dtype=row_dtype) for r in sub_rows],
+                weight_range.min, weight_range.max)
+
     def _get_region_arguments(self, post_vertex_slice, sub_matrix_props,
                               host_sub_matrix_rows, chip_sub_matrix_projs,
                               matrix_placements,
@@ -67,6 +67,92 @@ class InputVertex(object):
                            self.receptor_index, self.weight_fixed_point)
 
 
+# ----------------------------------------------------------------------------
+# PayloadCache
+# ----------------------------------------------------------------------------
+class PayloadCache(object):
+    """Memoises the payload a region builds for a set of arguments, typically
+    a vertex slice, so the payload built when the region is sized can be
+    reused verbatim when it is written.
+
+    Payloads should be evicted once they are written so that, at most,
+    those of vertices which have been sized but not yet loaded are held.
+    """
+    def __init__(self, build_function):
+        self.build_function = build_function
+        self._payloads = {}
+
+    # ------------------------------------------------------------------------
+    # Magic methods
+    # ------------------------------------------------------------------------
+    def __len__(self):
+        return len(self._payloads)
+
+    # ------------------------------------------------------------------------
+    # Public methods
+    # ------------------------------------------------------------------------
+    def get(self, *args, **kwargs):
+        """Get the payload for a set of arguments, building it if required."""
+        key = self._get_key(args, kwargs)
+        if key not in self._payloads:
+            self._payloads[key] = self.build_function(*args, **kwargs)
+
+        return self._payloads[key]
+
+    def evict(self, *args, **kwargs):
+        """Remove the payload for a set of arguments, if it has been built."""
+        self._payloads.pop(self._get_key(args, kwargs), None)
+
+    def invalidate(self):
+        """Remove all payloads, for example if the
+        data they were built from has changed."""
+        self._payloads.clear()
+
+    # ------------------------------------------------------------------------
+    # Private methods
+    # ------------------------------------------------------------------------
+    def _get_key(self, args, kwargs):
+        # Build hashable key from arguments, converting any lists to tuples
+        return tuple(tuple(a) if isinstance(a, list) else a
+                     for a in itertools.chain(
+                        args, (kwargs[k] for k in sorted(kwargs))))
+
+# ----------------------------------------------------------------------------
+# CachedComparableMixin
+# ----------------------------------------------------------------------------
+class CachedComparableMixin(object):
+    """Mixin for models with `_comparable_param_names` which caches the
+    tuple built from them by :py:func:`get_model_comparable`.
+
+    The cache is invalidated whenever the model's parameter space is
+    replaced or its parameters are set using `set_parameters`.
+    """
+    _comparable_cache = None
+
+    # ------------------------------------------------------------------------
+    # Properties
+    # ------------------------------------------------------------------------
+    @property
+    def parameter_space(self):
+        return self._parameter_space
+
+    @parameter_space.setter
+    def parameter_space(self, parameter_space):
+        self._parameter_space = parameter_space
+        self._comparable_cache = None
+
+    # ------------------------------------------------------------------------
+    # Public methods
+    # ------------------------------------------------------------------------
+    def set_parameters(self, **parameters):
+        """Update the model's parameters, invalidating the comparable cache.
+
+        **NOTE** updating the parameter space in place bypasses this so
+        parameters should always be set through here instead.
+        """
+        self._parameter_space.update(**parameters)
+        self._comparable_cache = None
+
 # ----------------------------------------------------------------------------
 # UnitStrideSlice
 # ----------------------------------------------------------------------------
@@ -89,6 +175,10 @@ class UnitStrideSlice(namedtuple("UnitStrideSlice", ["start", "stop"])):
     def intersection(self, other):
         return max(0, min(self.stop, other.stop) - max(self.start, other.start))
 
+    def contains_any(self, indices):
+        indices = np.asarray(indices)
+        return bool(np.any((indices >= self.start) & (indices < self.stop)))
+
     # ------------------------------------------------------------------------
     # Properties
     # ------------------------------------------------------------------------
@@ -155,7 +245,17 @@ class LazyArrayFloatToFixConverter(object):
         self.copy = copy
 
     def __call__(self, values):
-        """Convert the given lazy array of values into fixed point format."""
+        """Convert the given lazy array or NumPy array of
+        values into fixed point format."""
+        # If values are a NumPy array, scale them into a new array and round
+        # **NOTE** the caller's array is never modified so no copy is required
+        # **NOTE** like lazy arrays with NumPy base values, which ignore their
+        # dtype, values are left as floats to be cast when they are assigned
+        # into the fixed-point fields of parameter records
+        if isinstance(values, np.ndarray):
+            vals = values * (2.0 ** self.n_frac)
+            return np.rint(vals, out=vals)
+
         # Make a copy of the original lazy array
         # **YUCK** deep copy here as lazy array constructor doesn't give the
         # option to copy and hence doesn't deep copy operations
@@ -259,6 +359,11 @@ def get_model_comparable(value):
     if not inspect.isclass(value):
         # If model type has a list of param names to use for hash
         if hasattr(value, "_comparable_param_names"):
+            # If a tuple has been cached since parameters were last set, use it
+            cached = getattr(value, "_comparable_cache", None)
+            if cached is not None:
+                return cached
+
             # Start tuple with class type - various STDP components
             # are likely to have similarly named parameters
             # with simular values so this is important 1st check
@@ -268,6 +373,10 @@ def get_model_comparable(value):
             # to be equal and read them from parameter space into tuple
             for p in value._comparable_param_names:
                 comp += (get_homogeneous_param(value.parameter_space, p),)
+
+            # If model supports it, cache tuple for subsequent comparisons
+            if isinstance(value, CachedComparableMixin):
+                value._comparable_cache = comp
             return comp
         # Otherwise, if model type has a collection of comparable properties,
         # Loop through the properties and recursively call this function
@@ -1,10 +1,15 @@
 # Import modules
 import lazyarray as la
 import logging
+import numpy as np
 from pyNN.standardmodels import cells
 from ..spinnaker import lazy_param_map
 from ..spinnaker import regions
 
+# Import classes
+from pyNN.parameters import Sequence
+from pyNN.standardmodels import StandardCellType
+
 # Import functions
 from copy import deepcopy
 from functools import partial
@@ -17,8 +22,7 @@ logger = logging.getLogger("PyNN")
 # a Poisson source should be modelled using the fast or slow model
 def _poisson_slow_model(values, sim_timestep_ms, **kwargs):
     # Convert rates into spikes per time step
-    rate_vals = deepcopy(values)
-    spikes_per_timestep = (rate_vals * sim_timestep_ms) / 1000.0
+    spikes_per_timestep = (values * sim_timestep_ms) / 1000.0
 
     # Based on this return mask specifying which spikes sources
     # should be simulated using the slow rather than fast model
@@ -253,6 +257,106 @@ class SpikeSourcePoisson(cells.SpikeSourcePoisson):
         # Scale by timestep mul
         return int(2048 * timestep_mul)
 
+    def _get_rate_epochs(self, parameters, pop_size):
+        # Each neuron has a single epoch so
+        # parameters can be used directly
+        return ({n: parameters[n] for n in ("rate", "start_time", "end_time")},
+                np.ones(pop_size, dtype=int))
+
+class SpikeSourcePoissonVariable(StandardCellType):
+    """Spike source, generating spikes according to a Poisson process
+    whose rate is piecewise-constant over time.
+
+    Each neuron's rate is `rates[i]` from `starts[i]` for `durations[i]`
+    and zero outside of these epochs, which must not overlap.
+    """
+
+    default_parameters = {
+        "rates": Sequence([1.0]),       # Hz
+        "starts": Sequence([0.0]),      # ms
+        "durations": Sequence([1e10]),  # ms
+    }
+    recordable = ["spikes"]
+    injectable = False
+    receptor_types = ()
+    units = {
+        "rates": "Hz",
+        "starts": "ms",
+        "durations": "ms",
+    }
+
+    translations = build_translations(
+        ("rates",     "rates"),
+        ("starts",    "starts"),
+        ("durations", "durations"),
+    )
+
+    # --------------------------------------------------------------------------
+    # Internal SpiNNaker properties
+    # --------------------------------------------------------------------------
+    # Rate epochs are simulated by the same
+    # executables as SpikeSourcePoisson
+    _executable_filename = "spikesourcepoisson"
+
+    _directly_connectable = True
+    _neuron_region_class = regions.SpikeSourcePoisson
+    _current_input_region_class = regions.SpikeSourcePoisson
+
+    _immutable_param_map = SpikeSourcePoisson._immutable_param_map
+
+    # --------------------------------------------------------------------------
+    # Internal SpiNNaker methods
+    # --------------------------------------------------------------------------
+    # How many of these neurons per core can
+    # a SpiNNaker neuron processor handle
+    _calc_max_neurons_per_core = partial(calc_max_neurons_per_core,
+                                         neuron_update_cpu_cycles=58,
+                                         synapse_shape_cpu_cycles=0,
+                                         apply_input_cpu_cycles=0)
+
+    def _calc_max_current_inputs_per_core(self, hardware_timestep_us):
+        # Calculate timestep multiplier
+        timestep_mul = calc_timestep_mul(hardware_timestep_us)
+
+        # Scale by timestep mul
+        return int(2048 * timestep_mul)
+
+    def _get_rate_epochs(self, parameters, pop_size):
+        # Evaluate each neuron's schedule
+        schedules = [parameters[n] for n in ("rates", "starts", "durations")]
+        for s in schedules:
+            s.shape = (pop_size,)
+        rates, starts, durations = [[v.value for v in s.evaluate()]
+                                    for s in schedules]
+
+        # Count epochs in each neuron's schedule and check they're consistent
+        num_epochs = np.asarray([len(r) for r in rates], dtype=int)
+        if (any(len(s) != n for s, n in zip(starts, num_epochs)) or
+                any(len(d) != n for d, n in zip(durations, num_epochs))):
+            raise ValueError("Each neuron's rates, starts and durations "
+                             "must have the same number of entries")
+
+        # Check each neuron's epochs are in order and don't overlap
+        # **NOTE** on-chip, a neuron advances to its next epoch once
+        # the current one has ended so they must be in order
+        if any(np.any(s[1:] < (s + d)[:-1]) for s, d in zip(starts, durations)):
+            raise ValueError("Each neuron's rate epochs must be in order "
+                             "of start time and must not overlap")
+
+        # Remove zero-rate epochs as sources are silent outside of epochs anyway
+        active = [r > 0.0 for r in rates]
+        rates, starts, durations = [[e[a] for e, a in zip(v, active)]
+                                    for v in (rates, starts, durations)]
+        num_epochs = np.asarray([np.count_nonzero(a) for a in active],
+                                dtype=int)
+
+        # Flatten schedules into lazy arrays with an entry per epoch
+        rates, starts, durations = [
+            np.hstack(v) if len(v) > 0 else np.empty(0)
+            for v in (rates, starts, durations)]
+        return ({"rate": la.larray(rates), "start_time": la.larray(starts),
+                 "end_time": la.larray(starts + durations)}, num_epochs)
+
 class SpikeSourceArray(cells.SpikeSourceArray):
     __doc__ = cells.SpikeSourceArray.__doc__
 
@@ -291,4 +395,46 @@ class SpikeSourceArray(cells.SpikeSourceArray):
         timestep_mul = calc_timestep_mul(hardware_timestep_us)
 
         # Scale by timestep mul
-        return int(2048 * timestep_mul)
\ No newline at end of file
+        return int(2048 * timestep_mul)
+
+class SpikeInjector(StandardCellType):
+    """Spike source emitting spikes pushed to it from the host, using
+    :py:meth:`~pynn_spinnaker.Population.push_spikes`, while the simulation
+    is running."""
+
+    default_parameters = {}
+    recordable = ["spikes"]
+    injectable = False
+    receptor_types = ()
+
+    translations = build_translations()
+
+    # --------------------------------------------------------------------------
+    # Internal SpiNNaker properties
+    # --------------------------------------------------------------------------
+    # Spikes can't be converted to current input as they aren't known in advance
+    _directly_connectable = False
+    _neuron_region_class = regions.SpikeInjectionBuffer
+
+    # Spikes pushed from the host are injected rather than being simulated
+    _receives_injected_spikes = True
+
+    # How many spikes, received ahead of when they are due,
+    # can each SpiNNaker neuron processor buffer
+    _injection_buffer_spikes = 1024
+
+    # --------------------------------------------------------------------------
+    # Internal SpiNNaker methods
+    # --------------------------------------------------------------------------
+    # How many of these neurons per core can
+    # a SpiNNaker neuron processor handle
+    def _calc_max_neurons_per_core(self, hardware_timestep_us,
+                                   num_input_processors):
+        assert num_input_processors == 0
+
+        # Calculate timestep multiplier
+        timestep_mul = calc_timestep_mul(hardware_timestep_us)
+
+        # Scale by timestep mul, but neuron indices
+        # must fit in the bits reserved for them in packets
+        return min(1024, int(1024 * timestep_mul))
@@ -2,6 +2,7 @@ from pyNN.standardmodels import synapses, build_translations
 from ..spinnaker import regions
 from ..simulator import state
 from ..spinnaker import lazy_param_map
+from ..spinnaker.utils import CachedComparableMixin
 from ..spinnaker.utils import get_homogeneous_param
 import logging
 
@@ -156,7 +157,8 @@ class STDPMechanism(synapses.STDPMechanism):
 # ------------------------------------------------------------------------------
 # AdditiveWeightDependence
 # ------------------------------------------------------------------------------
-class AdditiveWeightDependence(synapses.AdditiveWeightDependence):
+class AdditiveWeightDependence(CachedComparableMixin,
+                               synapses.AdditiveWeightDependence):
     __doc__ = synapses.AdditiveWeightDependence.__doc__
 
     translations = build_translations(
@@ -181,7 +183,8 @@ class AdditiveWeightDependence(synapses.AdditiveWeightDependence):
 # ------------------------------------------------------------------------------
 # MultiplicativeWeightDependence
 # ------------------------------------------------------------------------------
-class MultiplicativeWeightDependence(synapses.MultiplicativeWeightDependence):
+class MultiplicativeWeightDependence(CachedComparableMixin,
+                                     synapses.MultiplicativeWeightDependence):
     __doc__ = synapses.MultiplicativeWeightDependence.__doc__
 
     translations = build_translations(
@@ -209,7 +212,8 @@ class MultiplicativeWeightDependence(synapses.MultiplicativeWeightDependence):
 # ------------------------------------------------------------------------------
 # SpikePairRule
 # ------------------------------------------------------------------------------
-class SpikePairRule(synapses.SpikePairRule):
+class SpikePairRule(CachedComparableMixin,
+                    synapses.SpikePairRule):
     __doc__ = synapses.SpikePairRule.__doc__
 
     translations = build_translations(
@@ -239,7 +243,8 @@ class SpikePairRule(synapses.SpikePairRule):
 # ------------------------------------------------------------------------------
 # Vogels2011Rule
 # ------------------------------------------------------------------------------
-class Vogels2011Rule(synapses.Vogels2011Rule):
+class Vogels2011Rule(CachedComparableMixin,
+                     synapses.Vogels2011Rule):
     __doc__ = synapses.Vogels2011Rule.__doc__
 
     translations = build_translations(
@@ -107,5 +107,6 @@ setup(
     # Extras
     extras_require={
         "spalloc": ["spalloc >= 0.2.4"],  # For machine allocation
+        "hdf5": ["h5py"],  # For writing recorded arrays to HDF5
     },
 )
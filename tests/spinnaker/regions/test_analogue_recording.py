@@ -0,0 +1,127 @@
+# Import modules
+import numpy as np
+import pytest
+import struct
+import tempfile
+
+# Import classes
+from bitarray import bitarray
+from pynn_spinnaker.spinnaker.regions import AnalogueRecording
+from pynn_spinnaker.spinnaker.utils import UnitStrideSlice
+
+# ----------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------
+@pytest.mark.parametrize("precision", [16, 32])
+@pytest.mark.parametrize("num_recorded", [0, 5, 8])
+def test_read_signal(precision, num_recorded):
+    vertex_slice = UnitStrideSlice(0, 10)
+    simulation_ticks = 20
+
+    # Create region recording first neurons every 2 ticks
+    indices_to_record = bitarray([i < num_recorded for i in range(10)],
+                                 endian="little")
+    region = AnalogueRecording({"v": indices_to_record}, "v", 0.2, 0.1,
+                               simulation_ticks, precision=precision)
+    assert region.num_samples == 10
+
+    # Generate random signals in the range covered by 16-bit samples
+    signals = np.random.uniform(-100.0, 100.0, size=(10, num_recorded))
+
+    # Convert to fixed point and pad
+    # to a whole number of words per sample
+    frac_bits = 8 if precision == 16 else 15
+    dtype = np.int16 if precision == 16 else np.int32
+    fixed = np.round(signals * (2 ** frac_bits)).astype(dtype)
+    sample_words = region._get_sample_words(num_recorded)
+    padded = np.zeros((10, (sample_words * 4) // fixed.itemsize), dtype=dtype)
+    padded[:, :num_recorded] = fixed
+
+    # Write region followed by ticks and samples
+    region_memory = tempfile.TemporaryFile()
+    region.write_subregion_to_file(region_memory, vertex_slice)
+    if num_recorded > 0:
+        for i, s in enumerate(padded):
+            region_memory.write(struct.pack("I", i * 2))
+            region_memory.write(s.tostring())
+
+        # Set write index to the number of samples written
+        region_memory.seek(region._get_data_offset(vertex_slice) - 12)
+        region_memory.write(struct.pack("I", 10))
+
+    # Read signal and check it's correct
+    indices, signal = region.read_signal(vertex_slice, region_memory)
+    assert np.array_equal(indices, np.arange(num_recorded))
+    assert signal.shape == (10, num_recorded)
+    assert signal.dtype == np.float32
+    assert np.allclose(signal, signals, atol=2.0 ** -frac_bits)
+
+    # Read signal within a window of ticks and check
+    # only the samples recorded within it are returned
+    indices, signal = region.read_signal(vertex_slice, region_memory, (5, 13))
+    assert np.array_equal(indices, np.arange(num_recorded))
+    assert signal.shape == (4, num_recorded)
+    assert np.allclose(signal, signals[3:7], atol=2.0 ** -frac_bits)
+
+
+def test_invalid_precision():
+    indices_to_record = bitarray([True] * 10, endian="little")
+    with pytest.raises(ValueError):
+        AnalogueRecording({"v": indices_to_record}, "v", 0.2, 0.1, 20,
+                          precision=8)
+
+
+@pytest.mark.parametrize("dropped_sample", [None, 3])
+def test_read_aggregate_signal(dropped_sample):
+    vertex_slices = [UnitStrideSlice(0, 10), UnitStrideSlice(10, 20)]
+    simulation_ticks = 20
+
+    # Create region aggregating every other neuron every 2 ticks
+    indices_to_record = bitarray([(i % 2) == 0 for i in range(20)],
+                                 endian="little")
+    region = AnalogueRecording({"v": indices_to_record}, "v", 0.2, 0.1,
+                               simulation_ticks, aggregate=True)
+
+    # Generate random signals for the 5 neurons recorded by each vertex
+    signals = np.random.uniform(-100.0, 100.0, size=(10, 10))
+
+    # Loop through vertices
+    vertex_memories = []
+    for i, vertex_slice in enumerate(vertex_slices):
+        # Calculate sum and sum of squares of vertex's
+        # neurons' fixed-point values in the same way as SpiNNaker
+        fixed = np.round(signals[:, i * 5:(i + 1) * 5] * (2 ** 15))
+        fixed = fixed.astype(np.int64)
+        totals = np.vstack((np.sum(fixed, axis=1),
+                            np.sum((fixed * fixed) >> 15, axis=1))).T
+
+        # Write region followed by ticks and totals,
+        # dropping a sample from the second vertex
+        region_memory = tempfile.TemporaryFile()
+        region.write_subregion_to_file(region_memory, vertex_slice)
+        num_written = 0
+        for s, t in enumerate(totals):
+            if i == 1 and s == dropped_sample:
+                continue
+            region_memory.write(struct.pack("I", s * 2))
+            region_memory.write(t.tostring())
+            num_written += 1
+
+        # Set write index to the number of samples written
+        region_memory.seek(region._get_data_offset(vertex_slice) - 12)
+        region_memory.write(struct.pack("I", num_written))
+        vertex_memories.append((vertex_slice, region_memory))
+
+    # Calculate expected mean and variance across all recorded neurons
+    expected_mean = np.mean(signals, axis=1)
+    expected_variance = np.var(signals, axis=1)
+    if dropped_sample is not None:
+        expected_mean[dropped_sample] = np.nan
+        expected_variance[dropped_sample] = np.nan
+
+    # Read aggregate signal and check it's correct
+    times, mean, variance = region.read_aggregate_signal(vertex_memories)
+    assert np.allclose(times, np.arange(10) * 0.2)
+    assert np.allclose(mean, expected_mean, atol=1e-3, equal_nan=True)
+    assert np.allclose(variance, expected_variance, rtol=1e-3,
+                       equal_nan=True)
@@ -0,0 +1,73 @@
+# Import modules
+import numpy as np
+import pytest
+import struct
+import tempfile
+
+# Import classes
+from bitarray import bitarray
+from pynn_spinnaker.spinnaker.regions import PopulationRateRecording
+from pynn_spinnaker.spinnaker.utils import UnitStrideSlice
+
+# ----------------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------------
+def _write_vertex(region, vertex_slice, bin_counts, dropped_bin=None):
+    # Write region
+    region_memory = tempfile.TemporaryFile()
+    region.write_subregion_to_file(region_memory, vertex_slice)
+
+    # Write tick and spike count of each bin,
+    # other than any dropped, in the same way as SpiNNaker
+    num_written = 0
+    for b, count in enumerate(bin_counts):
+        if b != dropped_bin:
+            region_memory.write(struct.pack("2I", b * region.sample_ticks,
+                                            count))
+            num_written += 1
+
+    # Set write index to the number of samples written
+    region_memory.seek(region._get_data_offset(vertex_slice) - 12)
+    region_memory.write(struct.pack("I", num_written))
+    return region_memory
+
+# ----------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------
+@pytest.mark.parametrize("dropped_bin", [None, 2])
+def test_read_rate(dropped_bin):
+    vertex_slices = [UnitStrideSlice(0, 10), UnitStrideSlice(10, 20)]
+    simulation_ticks = 45
+
+    # Create region recording every other neuron in 1ms bins of 10 ticks
+    indices_to_record = bitarray([(i % 2) == 0 for i in range(20)],
+                                 endian="little")
+    region = PopulationRateRecording({"population_rate": indices_to_record},
+                                     1.0, 0.1, simulation_ticks)
+    assert region.num_samples == 5
+
+    # Write random spike counts to each vertex,
+    # dropping one bin from the second vertex
+    counts = np.random.randint(0, 50, size=(2, 5))
+    vertex_memories = [
+        (vertex_slices[0], _write_vertex(region, vertex_slices[0], counts[0])),
+        (vertex_slices[1], _write_vertex(region, vertex_slices[1], counts[1],
+                                         dropped_bin))]
+
+    # Calculate expected rates of the 10 recorded
+    # neurons, the last bin of which is only 5 ticks long
+    bin_duration_s = np.asarray([1.0, 1.0, 1.0, 1.0, 0.5]) / 1000.0
+    expected = np.sum(counts, axis=0) / (10.0 * bin_duration_s)
+    if dropped_bin is not None:
+        expected[dropped_bin] = np.nan
+
+    # Read rate and check it's correct
+    times, rates = region.read_rate(vertex_memories)
+    assert np.allclose(times, [0.0, 1.0, 2.0, 3.0, 4.0])
+    assert np.allclose(rates, expected, equal_nan=True)
+
+    # Read rate within a window of ticks and check
+    # only the bins starting within it are returned
+    times, rates = region.read_rate(vertex_memories, (5, 35))
+    assert np.allclose(times, [1.0, 2.0, 3.0])
+    assert np.allclose(rates, expected[1:4], equal_nan=True)
@@ -0,0 +1,48 @@
+# Import modules
+import numpy as np
+import pytest
+import tempfile
+
+# Import classes
+from bitarray import bitarray
+from pynn_spinnaker.spinnaker.regions import SpikeCountRecording
+from pynn_spinnaker.spinnaker.utils import UnitStrideSlice
+
+# Import functions
+from pynn_spinnaker.spinnaker.utils import calc_slice_bitfield_words
+
+# ----------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------
+@pytest.mark.parametrize("vertex_slice", [UnitStrideSlice(0, 100),
+                                          UnitStrideSlice(64, 100)])
+@pytest.mark.parametrize("record_probability", [0.0, 0.3, 1.0])
+def test_read_counts(vertex_slice, record_probability):
+    population_size = 100
+
+    # Pick random subset of neurons to record
+    record = np.random.rand(population_size) < record_probability
+    indices_to_record = bitarray(list(record), endian="little")
+    region = SpikeCountRecording({"spike_count": indices_to_record})
+
+    # Write region and check it's the expected size
+    region_memory = tempfile.TemporaryFile()
+    region.write_subregion_to_file(region_memory, vertex_slice)
+    assert region_memory.tell() == region.sizeof(vertex_slice)
+
+    # Check counts are initially zeroed
+    recorded_indices = np.flatnonzero(record[vertex_slice.python_slice])
+    recorded_indices += vertex_slice.start
+    indices, counts = region.read_counts(vertex_slice, region_memory)
+    assert np.array_equal(indices, recorded_indices)
+    assert np.all(counts == 0)
+
+    # Write random counts after bitfield in the same way as SpiNNaker
+    expected = np.random.randint(0, 1000, size=len(recorded_indices))
+    region_memory.seek(calc_slice_bitfield_words(vertex_slice) * 4)
+    region_memory.write(expected.astype(np.uint32).tostring())
+
+    # Read counts and check they're correct
+    indices, counts = region.read_counts(vertex_slice, region_memory)
+    assert np.array_equal(indices, recorded_indices)
+    assert np.array_equal(counts, expected)
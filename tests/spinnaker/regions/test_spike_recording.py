@@ -0,0 +1,215 @@
+# Import modules
+import numpy as np
+import pytest
+import struct
+import tempfile
+
+# Import classes
+from bitarray import bitarray
+from pynn_spinnaker.spinnaker.regions import SpikeRecording
+from pynn_spinnaker.spinnaker.regions.spike_recording import (
+    SpikeRecordingFormat)
+from pynn_spinnaker.spinnaker.utils import UnitStrideSlice
+
+# Import functions
+from pynn_spinnaker.spinnaker.utils import calc_bitfield_words
+
+# ----------------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------------
+def _record_sample(region, vertex_slice, region_memory, tick, sample):
+    # Read control block in the same way as SpiNNaker
+    data_offset = region._get_data_offset(vertex_slice)
+    region_memory.seek(data_offset - 16)
+    capacity, write_index, read_index, overflows = struct.unpack(
+        "4I", region_memory.read(16))
+
+    # If buffer is full, count overflow
+    if (write_index - read_index) >= capacity:
+        region_memory.seek(data_offset - 4)
+        region_memory.write(struct.pack("I", overflows + 1))
+        return False
+    # Otherwise write tick and sample to next slot and advance write index
+    else:
+        slot_bytes = (len(sample) + 1) * 4
+        region_memory.seek(data_offset + ((write_index % capacity) * slot_bytes))
+        region_memory.write(struct.pack("I", tick))
+        region_memory.write(sample.tostring())
+        region_memory.seek(data_offset - 12)
+        region_memory.write(struct.pack("I", write_index + 1))
+        return True
+
+
+def _generate_spikes(vertex_slice, record, simulation_ticks):
+    # Generate random spikes for each recorded neuron in vertex
+    recorded_indices = np.flatnonzero(record[vertex_slice.python_slice])
+    recorded_indices += vertex_slice.start
+    spiked = np.random.rand(simulation_ticks, len(recorded_indices)) < 0.1
+
+    # Pack spikes into bitfield words in the same way as SpiNNaker
+    sample_words = calc_bitfield_words(len(recorded_indices))
+    samples = np.zeros((simulation_ticks, sample_words), dtype=np.uint32)
+    for t, b in zip(*np.nonzero(spiked)):
+        samples[t, b // 32] |= np.uint32(1 << (b % 32))
+
+    # Build event list of spikes in the same way as SpiNNaker
+    spike_ticks, spike_bits = np.nonzero(spiked)
+    events = [(t, np.asarray([b], dtype=np.uint32))
+              for t, b in zip(spike_ticks, spike_bits)]
+
+    # Build expected spikes, sorted by index and then time
+    expected = sorted(zip(recorded_indices[spike_bits], spike_ticks))
+    return samples, events, expected
+
+# ----------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------
+@pytest.mark.parametrize("vertex_slice", [UnitStrideSlice(0, 100),
+                                          UnitStrideSlice(64, 100)])
+@pytest.mark.parametrize("record_probability", [0.0, 0.3, 1.0])
+@pytest.mark.parametrize("recording_format", ["bitfield", "event_list"])
+def test_read_spikes(vertex_slice, record_probability, recording_format):
+    population_size = 100
+    simulation_ticks = 50
+
+    # Pick random subset of neurons to record
+    record = np.random.rand(population_size) < record_probability
+    indices_to_record = bitarray(list(record), endian="little")
+    region = SpikeRecording({"spikes": indices_to_record}, 0.1,
+                            simulation_ticks, recording_format=recording_format,
+                            mean_firing_rate=1000.0)
+    assert not region.streaming
+
+    samples, events, expected = _generate_spikes(vertex_slice, record,
+                                                 simulation_ticks)
+
+    # Write region and then record samples into it
+    region_memory = tempfile.TemporaryFile()
+    region.write_subregion_to_file(region_memory, vertex_slice)
+    region_memory.write(b"\0" * (region.sizeof(vertex_slice) -
+                                 region_memory.tell()))
+    if samples.shape[1] > 0:
+        if recording_format == "bitfield":
+            for t, s in enumerate(samples):
+                assert _record_sample(region, vertex_slice,
+                                      region_memory, t, s)
+        else:
+            for t, e in events:
+                assert _record_sample(region, vertex_slice,
+                                      region_memory, t, e)
+
+    # Read spikes back
+    indices, times = region.read_spikes(vertex_slice, region_memory)
+
+    assert np.array_equal(indices, [e[0] for e in expected])
+    assert np.allclose(times, [e[1] * 0.1 for e in expected])
+
+
+@pytest.mark.parametrize("drain_interval", [3, 12])
+def test_drain_spikes(drain_interval):
+    vertex_slice = UnitStrideSlice(0, 100)
+    simulation_ticks = 48
+
+    # Create region with an 8 tick buffer, recording all neurons
+    record = np.ones(100, dtype=bool)
+    indices_to_record = bitarray(list(record), endian="little")
+    region = SpikeRecording({"spikes": indices_to_record}, 0.1,
+                            simulation_ticks, buffer_time=0.8,
+                            recording_format="bitfield")
+    assert region.streaming
+    assert region._get_capacity(vertex_slice) == 8
+
+    samples, _, expected = _generate_spikes(vertex_slice, record,
+                                            simulation_ticks)
+
+    # Write region
+    region_memory = tempfile.TemporaryFile()
+    region.write_subregion_to_file(region_memory, vertex_slice)
+    region_memory.write(b"\0" * (region.sizeof(vertex_slice) -
+                                 region_memory.tell()))
+
+    # Record samples, draining buffer periodically
+    dropped_ticks = []
+    for t, s in enumerate(samples):
+        if t > 0 and (t % drain_interval) == 0:
+            region.drain(vertex_slice, region_memory)
+
+        # Keep track of ticks which don't fit in buffer
+        if not _record_sample(region, vertex_slice, region_memory, t, s):
+            dropped_ticks.append(t)
+
+    # Read spikes back
+    indices, times = region.read_spikes(vertex_slice, region_memory)
+
+    # Check statistics
+    stats = region.get_statistics([vertex_slice])
+    assert stats["max_occupancy"] <= 8
+    assert stats["samples_drained"] == simulation_ticks - stats["overflows"]
+    assert stats["overflows"] == len(dropped_ticks)
+    assert (len(dropped_ticks) == 0) == (drain_interval < 8)
+
+    # Check spikes from samples that weren't dropped are read correctly
+    expected = [e for e in expected if e[1] not in dropped_ticks]
+    assert np.array_equal(indices, [e[0] for e in expected])
+    assert np.allclose(times, [e[1] * 0.1 for e in expected])
+
+
+@pytest.mark.parametrize("recording_format", ["bitfield", "event_list"])
+@pytest.mark.parametrize("tick_window", [(0, 48), (10, 20), (20, 48),
+                                         (30, 31), (47, 100)])
+def test_read_spike_window(recording_format, tick_window):
+    vertex_slice = UnitStrideSlice(0, 100)
+    simulation_ticks = 48
+
+    # Create region with a 16 tick buffer, recording all neurons
+    record = np.ones(100, dtype=bool)
+    indices_to_record = bitarray(list(record), endian="little")
+    region = SpikeRecording({"spikes": indices_to_record}, 0.1,
+                            simulation_ticks, buffer_time=1.6,
+                            recording_format=recording_format,
+                            mean_firing_rate=1000.0)
+
+    samples, events, expected = _generate_spikes(vertex_slice, record,
+                                                 simulation_ticks)
+
+    # Write region
+    region_memory = tempfile.TemporaryFile()
+    region.write_subregion_to_file(region_memory, vertex_slice)
+    region_memory.write(b"\0" * (region.sizeof(vertex_slice) -
+                                 region_memory.tell()))
+
+    # Record samples, draining buffer periodically
+    # so samples are both drained and left in buffer
+    if recording_format == "bitfield":
+        samples = list(enumerate(samples))
+    else:
+        samples = events
+    for t, s in samples:
+        if t > 0 and (t % 8) == 0:
+            region.drain(vertex_slice, region_memory)
+        assert _record_sample(region, vertex_slice, region_memory, t, s)
+
+    # Read spikes in window and check only they are returned
+    indices, times = region.read_spikes(vertex_slice, region_memory,
+                                        tick_window)
+    window_expected = [e for e in expected
+                       if tick_window[0] <= e[1] < tick_window[1]]
+    assert np.array_equal(indices, [e[0] for e in window_expected])
+    assert np.allclose(times, [e[1] * 0.1 for e in window_expected])
+
+    # Check all spikes can still be read
+    indices, times = region.read_spikes(vertex_slice, region_memory)
+    assert np.array_equal(indices, [e[0] for e in expected])
+    assert np.allclose(times, [e[1] * 0.1 for e in expected])
+
+
+@pytest.mark.parametrize("mean_firing_rate", [1.0, 1000.0])
+def test_default_format(mean_firing_rate):
+    # Create region recording all neurons without specifying a format and
+    # check lossless bitfield is used, even if an event list would be smaller
+    indices_to_record = bitarray([True] * 256, endian="little")
+    region = SpikeRecording({"spikes": indices_to_record}, 1.0, 1000,
+                            mean_firing_rate=mean_firing_rate)
+    assert region.recording_format == SpikeRecordingFormat.bitfield
+    assert region._get_header_words(indices_to_record) ==\
+        (SpikeRecordingFormat.bitfield, 8)
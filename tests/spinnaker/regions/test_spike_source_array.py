@@ -0,0 +1,120 @@
+# Import modules
+import numpy as np
+import pytest
+import struct
+import tempfile
+
+# Import classes
+from pyNN.parameters import Sequence
+from pynn_spinnaker.spinnaker.regions import (SpikeSourceArray,
+                                              SpikeSourceArrayFormat)
+from pynn_spinnaker.spinnaker.utils import UnitStrideSlice
+
+# Import functions
+from pynn_spinnaker.spinnaker.utils import calc_slice_bitfield_words
+
+# ----------------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------------
+def _read_spike_blocks(region_memory, vertex_words):
+    # Read first timestep and spike blocks
+    first_timestep = struct.unpack("I", region_memory.read(4))[0]
+    spike_blocks = np.fromstring(region_memory.read(), dtype=np.uint32)
+    spike_blocks = spike_blocks.reshape((-1, vertex_words + 1))
+
+    # If there are no spikes, check there are no spike blocks
+    if first_timestep == 0xFFFFFFFF:
+        assert len(spike_blocks) == 0
+        return set()
+
+    # Check blocks are chained together through increasing timesteps
+    block_timesteps = np.append(first_timestep, spike_blocks[:-1, 0])
+    assert np.all(np.diff(block_timesteps) > 0)
+    assert spike_blocks[-1, 0] == 0xFFFFFFFF
+
+    # Unpack bitfields and convert to set of (timestep, neuron) spikes
+    bits = (spike_blocks[:, 1:, np.newaxis] >> np.arange(32)) & 1
+    bits = bits.reshape((len(spike_blocks), -1))
+    blocks, neurons = np.nonzero(bits)
+    return set(zip(block_timesteps[blocks], neurons))
+
+
+def _read_delta_streams(region_memory, num_neurons):
+    # Read 16-bit deltas
+    streams = np.fromstring(region_memory.read(), dtype=np.uint16)
+
+    # Decode each neuron's stream in the same way as SpiNNaker
+    spikes = set()
+    offset = 0
+    for n in range(num_neurons):
+        timestep = -1
+        while streams[offset] != 0:
+            if streams[offset] == SpikeSourceArray.delta_escape:
+                timestep += SpikeSourceArray.max_delta
+            else:
+                timestep += streams[offset]
+                spikes.add((timestep, n))
+            offset += 1
+        offset += 1
+
+    # Check there is at most one halfword of padding
+    assert offset in (len(streams), len(streams) - 1)
+    return spikes
+
+# ----------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------
+@pytest.mark.parametrize("vertex_slice", [UnitStrideSlice(0, 100),
+                                          UnitStrideSlice(40, 90)])
+@pytest.mark.parametrize("mean_spikes, duration_ms, synchronous, format", [
+    (0, 50.0, False, "block"),
+    (0.5, 50.0, False, "delta"),
+    (20, 50.0, False, "delta"),
+    (20, 50.0, True, "block"),
+    (2, 20000.0, False, "delta")])
+def test_write_spike_data(vertex_slice, mean_spikes, duration_ms,
+                          synchronous, format):
+    population_size = 100
+    sim_timestep_ms = 0.1
+
+    # Generate random spike times for each neuron, either independently or
+    # from a small set shared by all neurons
+    # **NOTE** some neurons will spike multiple times per timestep
+    shared_times = np.random.uniform(0.0, duration_ms, 5)
+    spike_times = np.empty(population_size, dtype=object)
+    for i in range(population_size):
+        num_spikes = np.random.poisson(mean_spikes)
+        if synchronous:
+            spike_times[i] = Sequence(np.random.choice(shared_times,
+                                                       num_spikes))
+        else:
+            spike_times[i] = Sequence(np.random.uniform(0.0, duration_ms,
+                                                        num_spikes))
+
+    region = SpikeSourceArray(None, {"spike_times": spike_times}, None,
+                              sim_timestep_ms, population_size)
+
+    # Write region and check it's the expected size
+    region_memory = tempfile.TemporaryFile()
+    region.write_subregion_to_file(region_memory, vertex_slice)
+    assert region_memory.tell() == region.sizeof(vertex_slice)
+
+    # Read format and check smallest was chosen
+    region_memory.seek(0)
+    spike_format = struct.unpack("I", region_memory.read(4))[0]
+    assert spike_format == SpikeSourceArrayFormat[format]
+
+    # Decode spikes
+    if spike_format == SpikeSourceArrayFormat.block:
+        spikes = _read_spike_blocks(
+            region_memory, calc_slice_bitfield_words(vertex_slice))
+    else:
+        spikes = _read_delta_streams(
+            region_memory, vertex_slice.stop - vertex_slice.start)
+
+    # Check decoded spikes match the spike times of each neuron
+    expected = set()
+    for n, s in enumerate(spike_times[vertex_slice.python_slice]):
+        expected.update((t, n) for t in
+                        np.rint(s.value / sim_timestep_ms).astype(int))
+    assert spikes == expected
@@ -0,0 +1,91 @@
+# Import modules
+import numpy as np
+import pytest
+import struct
+import tempfile
+
+# Import classes
+from pyNN.parameters import ParameterSpace, Sequence
+from pynn_spinnaker.spinnaker.regions import SpikeSourcePoisson
+from pynn_spinnaker.spinnaker.utils import UnitStrideSlice
+from pynn_spinnaker.standardmodels.cells import (
+    SpikeSourcePoisson as SpikeSourcePoissonCell, SpikeSourcePoissonVariable)
+
+# ----------------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------------
+def _read_schedules(region, vertex_slice):
+    # Write region and check it's the expected size
+    region_memory = tempfile.TemporaryFile()
+    size = region.sizeof(vertex_slice)
+    region.write_subregion_to_file(region_memory, vertex_slice)
+    assert region_memory.tell() == size
+
+    # Check encoded data is no longer cached once written
+    assert len(region._payloads) == 0
+
+    # Skip seed and read epoch count
+    region_memory.seek(SpikeSourcePoisson.SeedWords * 4)
+    num_epochs = struct.unpack("I", region_memory.read(4))[0]
+
+    # Read each neuron's schedule, followed by epochs
+    schedules = np.fromstring(region_memory.read(4 * len(vertex_slice)),
+                              dtype=[("first", "u2"), ("count", "u2")])
+    epochs = np.fromstring(region_memory.read(), dtype=region.epochs.dtype)
+    assert len(epochs) == num_epochs
+
+    # Return the (start tick, end tick) of each neuron's epochs
+    return [[(e[1], e[2]) for e in epochs[s[0]:s[0] + s[1]]]
+            for s in schedules], num_epochs
+
+# ----------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------
+@pytest.mark.parametrize("vertex_slice", [UnitStrideSlice(0, 10),
+                                          UnitStrideSlice(3, 8)])
+def test_single_rate(vertex_slice):
+    cell_type = SpikeSourcePoissonCell()
+    parameters = ParameterSpace({"rate": 10.0, "start_time": 5.0,
+                                 "end_time": 100.0}, shape=(10,))
+    region = SpikeSourcePoisson(cell_type, parameters, None, 0.1, 10)
+
+    # Check each neuron has a single epoch, shared between all neurons
+    schedules, num_epochs = _read_schedules(region, vertex_slice)
+    assert num_epochs == 1
+    assert schedules == [[(50, 1000)]] * len(vertex_slice)
+
+
+@pytest.mark.parametrize("vertex_slice", [UnitStrideSlice(0, 10),
+                                          UnitStrideSlice(3, 8)])
+def test_variable_rate(vertex_slice):
+    # Alternate neurons between two schedules,
+    # one of which has a zero-rate epoch
+    rates = [Sequence([10.0, 0.0, 200.0]), Sequence([5.0, 50.0])]
+    starts = [Sequence([0.0, 10.0, 20.0]), Sequence([0.0, 15.0])]
+    durations = [Sequence([10.0, 10.0, 5.0]), Sequence([10.0, 100.0])]
+
+    cell_type = SpikeSourcePoissonVariable()
+    parameters = ParameterSpace({"rates": [rates[i % 2] for i in range(10)],
+                                 "starts": [starts[i % 2] for i in range(10)],
+                                 "durations": [durations[i % 2]
+                                               for i in range(10)]},
+                                schema=cell_type.get_schema(), shape=(10,))
+    region = SpikeSourcePoisson(cell_type, parameters, None, 1.0, 10)
+
+    # Check neurons with the same schedule share epochs
+    # and that the zero-rate epoch was removed
+    schedules, num_epochs = _read_schedules(region, vertex_slice)
+    assert num_epochs == 4
+    expected = [[(0, 10), (20, 25)], [(0, 10), (15, 115)]]
+    assert schedules == [expected[i % 2]
+                         for i in range(vertex_slice.start, vertex_slice.stop)]
+
+
+def test_variable_rate_overlapping():
+    cell_type = SpikeSourcePoissonVariable()
+    parameters = ParameterSpace({"rates": Sequence([10.0, 20.0]),
+                                 "starts": Sequence([0.0, 5.0]),
+                                 "durations": Sequence([10.0, 10.0])},
+                                schema=cell_type.get_schema(), shape=(10,))
+    with pytest.raises(ValueError):
+        SpikeSourcePoisson(cell_type, parameters, None, 1.0, 10)
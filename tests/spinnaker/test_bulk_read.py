@@ -0,0 +1,130 @@
+# Import modules
+import numpy as np
+import pytest
+
+# Import classes
+from pynn_spinnaker.spinnaker.bulk_read import BulkReader, CachedMemoryIO
+from rig.machine_control.machine_controller import MemoryIO
+
+# Import functions
+from pynn_spinnaker.spinnaker.bulk_read import prefetch_recording
+
+# ----------------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------------
+class MockMachineController(object):
+    """Machine controller with 64KiB of memory on each of four chips,
+    the chips in each column of which share a connection."""
+    def __init__(self):
+        self.memory = {(x, y): bytearray(np.random.bytes(64 * 1024))
+                       for x in range(2) for y in range(2)}
+        self.connections = {x: object() for x in range(2)}
+        self.reads = []
+
+    def _get_connection(self, x, y):
+        return self.connections[x]
+
+    def read(self, address, length_bytes, x, y, p=0):
+        self.reads.append((x, y, address, length_bytes))
+        return bytes(self.memory[(x, y)][address:address + length_bytes])
+
+    def write(self, address, data, x, y, p=0):
+        self.memory[(x, y)][address:address + len(data)] = data
+
+class MockVertex(object):
+    """Vertex with a single region in memory on chip (0, 0)."""
+    def __init__(self, mc, address):
+        self.region_memory = {0: MemoryIO(mc, 0, 0, address, address + 1024)}
+
+class MockRecordingRegion(object):
+    def __init__(self, streaming):
+        self.streaming = streaming
+
+# ----------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------
+@pytest.mark.parametrize("num_threads", [None, 1])
+def test_bulk_read(num_threads):
+    mc = MockMachineController()
+
+    # On each chip, create an allocation sliced into adjacent regions
+    # with one further region which is too far away to be coalesced
+    memories = []
+    for chip in mc.memory:
+        allocation = MemoryIO(mc, chip[0], chip[1], 1024, 8192)
+        memories.extend(CachedMemoryIO(allocation[s:s + 1024])
+                        for s in range(0, 4096, 1024))
+        memories.append(CachedMemoryIO(allocation[6144:7168]))
+
+    # Prefetch part of each memory
+    reader = BulkReader(mc, num_threads)
+    reader.read([(m, 16, 1000) for m in memories])
+
+    # Check that regions on each chip were read in two reads
+    assert len(mc.reads) == 8
+
+    # Check data within prefetched range is read without further reads
+    for m in memories:
+        m.seek(32)
+        chip_memory = mc.memory[m.chip]
+        assert m.read(128) == bytes(chip_memory[m.address + 32:
+                                                m.address + 160])
+    assert len(mc.reads) == 8
+
+    # Check data outside prefetched range is read from memory
+    memories[0].seek(0)
+    assert memories[0].read(32) == bytes(
+        mc.memory[memories[0].chip][memories[0].address:
+                                    memories[0].address + 32])
+    assert len(mc.reads) == 9
+
+
+def test_write_through():
+    mc = MockMachineController()
+    memory = CachedMemoryIO(MemoryIO(mc, 0, 0, 0, 1024))
+
+    # Prefetch memory
+    reader = BulkReader(mc)
+    reader.read([(memory, 0, 1024)])
+
+    # Write to memory
+    memory.seek(100)
+    memory.write(b"Hello")
+    assert memory.tell() == 105
+
+    # Check write has gone through to
+    # memory and updated prefetched data
+    assert bytes(mc.memory[(0, 0)][100:105]) == b"Hello"
+    memory.seek(98)
+    assert memory.read(9)[2:7] == b"Hello"
+    assert len(mc.reads) == 1
+
+
+@pytest.mark.parametrize("streaming, tick_window, use_reader, expect_reads",
+                         [(False, None, True, True),
+                          (False, None, False, False),
+                          (False, (10, 20), True, False),
+                          (True, None, True, False)])
+def test_prefetch_recording(streaming, tick_window, use_reader, expect_reads):
+    mc = MockMachineController()
+
+    # Create vertices whose regions are too far apart to be coalesced
+    verts = [MockVertex(mc, a) for a in range(0, 16384, 4096)]
+    reader = BulkReader(mc) if use_reader else None
+    region = MockRecordingRegion(streaming)
+
+    # Prefetch recordings of only some vertices
+    prefetch_recording(reader, verts[:2], 0, region, tick_window)
+
+    # If prefetch is expected, check only these vertices' regions were read
+    if expect_reads:
+        assert sorted(r[2] for r in mc.reads) == [0, 4096]
+        assert all(isinstance(v.region_memory[0], CachedMemoryIO)
+                   for v in verts[:2])
+
+        # Check prefetching again doesn't read them again
+        prefetch_recording(reader, verts[:2], 0, region, tick_window)
+        assert len(mc.reads) == 2
+    # Otherwise, check nothing was read
+    else:
+        assert len(mc.reads) == 0
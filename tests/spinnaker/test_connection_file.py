@@ -0,0 +1,53 @@
+# Import modules
+import numpy as np
+import os
+import pytest
+
+# Import functions
+from pynn_spinnaker.spinnaker.connection_file import (
+    convert_text_connection_file, load_binary_connection_file)
+
+# ----------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------
+@pytest.mark.parametrize("num_connections", [0, 1, 5000])
+@pytest.mark.parametrize("chunk_lines", [7, 1000000])
+def test_convert_text_connection_file(tmpdir, num_connections, chunk_lines):
+    # Build random connection list
+    conn_list = np.vstack((np.random.randint(100, size=num_connections),
+                           np.random.randint(200, size=num_connections),
+                           np.random.uniform(size=num_connections),
+                           np.ones(num_connections))).T
+
+    # Write it to text file with PyNN-style header
+    text_filename = str(tmpdir.join("connections.txt"))
+    with open(text_filename, "w") as f:
+        f.write("# columns = ['i', 'j', 'weight', 'delay']\n")
+        np.savetxt(f, conn_list, fmt="%r", delimiter="\t")
+
+    # Convert to binary and memory-map
+    binary_filename = text_filename + ".npy"
+    convert_text_connection_file(text_filename, binary_filename,
+                                 chunk_lines=chunk_lines)
+    connections = load_binary_connection_file(binary_filename)
+    assert not os.path.exists(binary_filename + ".tmp")
+
+    # Check connections are grouped by post-synaptic index
+    assert np.all(np.diff(connections[:, 1]) >= 0)
+
+    # Check the same set of connections is present
+    if num_connections > 0:
+        assert connections.shape == conn_list.shape
+        assert (sorted(map(tuple, np.asarray(connections))) ==
+                sorted(map(tuple, conn_list)))
+    else:
+        assert len(connections) == 0
+
+
+def test_load_unsorted_binary_connection_file(tmpdir):
+    # Save connection list which isn't sorted by post-synaptic index
+    filename = str(tmpdir.join("connections.npy"))
+    np.save(filename, np.asarray([[0, 5, 1.0, 1.0], [1, 2, 1.0, 1.0]]))
+
+    with pytest.raises(ValueError):
+        load_binary_connection_file(filename)
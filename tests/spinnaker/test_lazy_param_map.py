@@ -145,3 +145,23 @@ s1615_rate_isi = partial(rate_isi, float_to_fixed=float_to_s1615_no_copy)
 u032_rate_exp_minus_lambda = partial(rate_exp_minus_lambda, float_to_fixed=float_to_u032_no_copy)
 s411_exp_decay_lut = partial(exp_decay_lut, float_to_fixed=float_to_s411_no_copy)
 '''
+
+# ----------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------
+def test_apply_preserves_parameters():
+    # Create parameter space with array parameter
+    values = np.arange(1.0, 11.0)
+    param_space = ParameterSpace({"a": values.copy()}, shape=(10,))
+
+    # Apply map which uses parameter for multiple fields
+    param_map = [("a", "i4", lazy_param_map.s1615),
+                 ("a", "i4", lazy_param_map.s1615_exp_init),
+                 ("a", "u4", lazy_param_map.u032_exp_decay)]
+    mapped_params = lazy_param_map.apply(param_space, param_map, 10,
+                                         sim_timestep_ms=0.1)
+
+    # Check mapping didn't modify the parameters
+    assert np.array_equal(param_space["a"].evaluate(), values)
+    assert np.array_equal(mapped_params["f0"],
+                          np.round(values * 2.0 ** 15).astype(int))
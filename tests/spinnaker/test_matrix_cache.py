@@ -0,0 +1,82 @@
+# Import modules
+import lazyarray as la
+import mock
+import numpy as np
+import os
+
+# Import classes
+from pyNN.random import NumpyRNG, RandomDistribution
+from pynn_spinnaker.spinnaker.matrix_cache import SynapticMatrixCache
+from pynn_spinnaker.spinnaker.synapse_cluster import row_dtype
+from pynn_spinnaker.spinnaker.utils import UnitStrideSlice
+
+# ----------------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------------
+class _Connector(object):
+    def __init__(self, p_connect, rng):
+        self.p_connect = p_connect
+        self.rng = rng
+        self.callback = None
+
+
+def _make_projection(rng, p_connect):
+    # Build mock projection with a connector and synapse type using RNG
+    proj = mock.Mock()
+    proj.pre.size = 10
+    proj.post.size = 20
+    proj.receptor_type = "excitatory"
+    proj._simulator.state.dt = 0.1
+    proj._connector = _Connector(p_connect, rng)
+    proj.synapse_type.native_parameters._parameters = {
+        "weight": la.larray(RandomDistribution("uniform", (0.0, 1.0),
+                                               rng=rng)),
+        "delay": la.larray(1.0)}
+    return proj
+
+# ----------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------
+def test_matrix_cache_round_trip(tmpdir):
+    rng = NumpyRNG(seed=1)
+    proj = _make_projection(rng, 0.1)
+    cache = SynapticMatrixCache(str(tmpdir), 1024 * 1024)
+    post_slice = UnitStrideSlice(0, 20)
+
+    # Check key isn't initially in cache
+    key = cache.get_key([proj], post_slice, 1)
+    assert key is not None
+    assert cache.get(key, [proj]) is None
+
+    # Advance RNG as if synapses were generated and add them to cache
+    rng.next(100)
+    rng_state = rng.rng.get_state()[1].copy()
+    rows = [np.asarray([(0.5, 1, i)], dtype=row_dtype) for i in range(10)]
+    cache.put(key, rows, 0.5, 0.5, [proj])
+
+    # Check different connector parameters result in different key
+    assert cache.get_key([_make_projection(rng, 0.2)], post_slice, 1) != key
+
+    # Re-seed RNG and check that same key is generated
+    rng.rng.seed(1)
+    assert cache.get_key([proj], post_slice, 1) == key
+
+    # Check rows are read correctly and RNG state is restored
+    cached_rows, weight_range = cache.get(key, [proj])
+    assert weight_range == (0.5, 0.5)
+    assert len(cached_rows) == len(rows)
+    for c, r in zip(cached_rows, rows):
+        assert np.array_equal(c, r)
+    assert np.array_equal(rng.rng.get_state()[1], rng_state)
+
+
+def test_matrix_cache_eviction(tmpdir):
+    rng = NumpyRNG(seed=1)
+    proj = _make_projection(rng, 0.1)
+    cache = SynapticMatrixCache(str(tmpdir), 0)
+
+    # Add entry to cache which can't hold anything and check it's evicted
+    key = cache.get_key([proj], UnitStrideSlice(0, 20), 1)
+    rows = [np.zeros(1, dtype=row_dtype) for _ in range(10)]
+    cache.put(key, rows, 0.5, 0.5, [proj])
+    assert len(os.listdir(str(tmpdir))) == 0
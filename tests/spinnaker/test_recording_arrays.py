@@ -0,0 +1,54 @@
+# Import modules
+import numpy as np
+import pytest
+
+# Import functions
+from pynn_spinnaker.spinnaker.recording_arrays import read_arrays, write_arrays
+
+# ----------------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------------
+def _get_arrays():
+    return {"spikes.index": np.repeat(np.arange(10), 5),
+            "spikes.time": np.random.rand(50).astype(np.float32),
+            "v.index": np.arange(0, 10, 2),
+            "v.signal": np.random.rand(100, 5).astype(np.float32),
+            "v.sampling_interval": np.float64(0.1),
+            "gsyn_exc.index": np.empty(0, dtype=int),
+            "gsyn_exc.signal": np.empty((100, 0), dtype=np.float32)}
+
+# ----------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------
+@pytest.mark.parametrize("mmap_mode", ["r", None])
+def test_npz_round_trip(tmpdir, mmap_mode):
+    arrays = _get_arrays()
+
+    filename = str(tmpdir.join("arrays.npz"))
+    write_arrays(filename, arrays)
+    read = read_arrays(filename, mmap_mode)
+
+    # Check all arrays are read back correctly
+    assert set(read.keys()) == set(arrays.keys())
+    for name, array in arrays.items():
+        assert read[name].dtype == array.dtype
+        assert read[name].shape == array.shape
+        assert np.array_equal(read[name], array)
+
+    # Check non-empty arrays are memory-mapped
+    if mmap_mode is not None:
+        assert isinstance(read["v.signal"], np.memmap)
+        assert isinstance(read["spikes.time"], np.memmap)
+
+
+def test_hdf5_round_trip(tmpdir):
+    pytest.importorskip("h5py")
+    arrays = _get_arrays()
+
+    filename = str(tmpdir.join("arrays.h5"))
+    write_arrays(filename, arrays)
+
+    with read_arrays(filename) as read:
+        assert set(read.keys()) == set(arrays.keys())
+        for name, array in arrays.items():
+            assert np.array_equal(read[name][()], array)
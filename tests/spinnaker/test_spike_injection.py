@@ -0,0 +1,166 @@
+# Import modules
+import numpy as np
+import pytest
+import time
+
+# Import classes
+from pynn_spinnaker.spinnaker.spike_injection import (
+    LoopbackSpikeInjectionEndpoint, SpikeInjectionQueue, SpikeInjectionSender)
+from pynn_spinnaker.spinnaker.utils import UnitStrideSlice
+
+# Import functions
+from pynn_spinnaker.spinnaker.spike_injection import (decode_spike_payload,
+                                                      encode_spike_payloads)
+
+# Import globals
+from pynn_spinnaker.spinnaker.spike_injection import (MAX_SPIKES_PER_PACKET,
+                                                      MAX_TICK_OFFSET)
+
+# ----------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------
+@pytest.mark.parametrize("num_spikes", [0, 1, 500])
+@pytest.mark.parametrize("max_tick", [100, 3 * MAX_TICK_OFFSET])
+def test_encode_decode(num_spikes, max_tick):
+    # Generate random spikes, sorted by tick
+    ticks = np.sort(np.random.randint(0, max_tick, num_spikes))
+    neurons = np.random.randint(0, 1024, num_spikes)
+
+    # Encode spikes and check each payload fits in an SDP packet
+    payloads = encode_spike_payloads(neurons, ticks)
+    assert all(len(p) <= 4 * (MAX_SPIKES_PER_PACKET + 1) for p in payloads)
+
+    # Decode payloads and check original spikes are recovered
+    decoded = [decode_spike_payload(p) for p in payloads]
+    if num_spikes == 0:
+        assert len(decoded) == 0
+    else:
+        assert np.array_equal(np.hstack([d[0] for d in decoded]), neurons)
+        assert np.array_equal(np.hstack([d[1] for d in decoded]), ticks)
+
+
+@pytest.mark.parametrize("max_packets_per_second", [1000, 100000])
+def test_loopback_injection(max_packets_per_second):
+    simulation_ticks = 1000
+    lookahead_ticks = 50
+
+    # Create loopback endpoint to stand in for SpiNNaker
+    endpoint = LoopbackSpikeInjectionEndpoint()
+    endpoint.start()
+
+    # Create queue of spikes for a population split across two cores
+    population_size = 200
+    vertices = [(UnitStrideSlice(0, 100), (0, 0, 1)),
+                (UnitStrideSlice(100, 200), (1, 0, 3))]
+    queue = SpikeInjectionQueue()
+
+    # Push random spikes in two batches, including
+    # some which are outside of the simulation
+    indices = np.random.randint(0, population_size, 400)
+    ticks = np.random.randint(0, simulation_ticks + 100, 400)
+    queue.push(indices[:200], ticks[:200])
+    queue.push(indices[200:], ticks[200:])
+
+    # Send spikes, simulating 1000 ticks in 0.1s
+    sender = SpikeInjectionSender(endpoint.address[0], [(queue, vertices)],
+                                  0.0001, simulation_ticks, lookahead_ticks,
+                                  max_packets_per_second,
+                                  port=endpoint.address[1])
+    sender.start()
+    time.sleep(0.5)
+    sender.stop()
+
+    # Wait for endpoint to receive all packets
+    timeout = time.time() + 5.0
+    while endpoint.num_packets < sender.num_packets and time.time() < timeout:
+        time.sleep(0.01)
+    endpoint.stop()
+    assert endpoint.num_packets == sender.num_packets
+
+    # Check spikes outside of simulation were discarded
+    valid = ticks < simulation_ticks
+    assert sender.num_discarded == np.count_nonzero(~valid)
+    assert sender.num_spikes == np.count_nonzero(valid)
+
+    # Check each core received the spikes within its slice, in tick order
+    for vertex_slice, (x, y, p) in vertices:
+        mask = (valid & (indices >= vertex_slice.start) &
+                (indices < vertex_slice.stop))
+        expected = sorted(zip(ticks[mask], indices[mask] - vertex_slice.start))
+
+        neurons, received_ticks = endpoint.get_spikes(x, y, p)
+        assert np.all(np.diff(received_ticks) >= 0)
+        assert sorted(zip(received_ticks, neurons)) == expected
+
+    # Check rate limit was respected
+    duration = endpoint.last_receive_time - endpoint.first_receive_time
+    min_duration = (endpoint.num_packets - 1) / float(max_packets_per_second)
+    assert duration >= 0.9 * min_duration
+
+
+def test_loopback_injection_out_of_order():
+    tick_period_s = 0.001
+    simulation_ticks = 400
+    lookahead_ticks = 100
+
+    # Create loopback endpoint to stand in for SpiNNaker
+    endpoint = LoopbackSpikeInjectionEndpoint()
+    endpoint.start()
+
+    # Create queue of spikes for a population simulated on one core
+    # and push spikes from first half of population throughout simulation
+    vertices = [(UnitStrideSlice(0, 100), (0, 0, 1))]
+    queue = SpikeInjectionQueue()
+    early_ticks = np.arange(0, simulation_ticks, 4)
+    early_indices = early_ticks % 50
+    queue.push(early_indices, early_ticks)
+
+    # Start sending spikes in real time
+    sender = SpikeInjectionSender(endpoint.address[0], [(queue, vertices)],
+                                  tick_period_s, simulation_ticks,
+                                  lookahead_ticks, 100000,
+                                  port=endpoint.address[1])
+    start_time = time.time()
+    sender.start()
+
+    # Twice during simulation, push a batch of spikes from second half of
+    # population, in reverse order and due before spikes that have
+    # already been sent within lookahead window
+    late_indices = []
+    late_ticks = []
+    for _ in range(2):
+        time.sleep(0.1)
+        current_tick = int((time.time() - start_time) / tick_period_s)
+        ticks = np.arange(current_tick + 50, current_tick + 20, -3)
+        indices = 50 + (ticks % 50)
+        queue.push(indices, ticks)
+        late_indices.append(indices)
+        late_ticks.append(ticks)
+
+    # Wait for simulation to end
+    time.sleep(simulation_ticks * tick_period_s)
+    sender.stop()
+
+    # Wait for endpoint to receive all packets
+    timeout = time.time() + 5.0
+    while endpoint.num_packets < sender.num_packets and time.time() < timeout:
+        time.sleep(0.01)
+    endpoint.stop()
+    assert endpoint.num_packets == sender.num_packets
+
+    # Check all spikes were received
+    indices = np.hstack([early_indices] + late_indices)
+    ticks = np.hstack([early_ticks] + late_ticks)
+    received_indices, received_ticks = endpoint.get_spikes(0, 0, 1)
+    assert sorted(zip(received_ticks, received_indices)) ==\
+        sorted(zip(ticks, indices))
+
+    # Check some were received after spikes due later than them
+    # - injector cores must insert these into their buffers in tick order
+    assert np.any(np.diff(received_ticks) < 0)
+
+    # Check late spikes were received before they were due
+    receive_times = endpoint.get_receive_times(0, 0, 1)
+    late = received_indices >= 50
+    assert np.all(receive_times[late] <=
+                  start_time + (received_ticks[late] * tick_period_s))
@@ -56,3 +56,45 @@ def test_input_vertex_non_overlapping_slices():
 def test_unit_strided_slice_overlap(slice_a, slice_b, expected_overlap):
     assert slice_a.overlaps(slice_b) == expected_overlap
     assert slice_b.overlaps(slice_a) == expected_overlap
+
+
+@pytest.mark.parametrize(
+    "indices, expected_contains",
+    [([], False),
+     ([0, 9, 20], False),
+     ([10], True),
+     ([3, 19], True),
+     ])
+def test_unit_strided_slice_contains_any(indices, expected_contains):
+    assert (utils.UnitStrideSlice(10, 20).contains_any(indices) ==
+            expected_contains)
+
+
+def test_payload_cache():
+    # Create cache around function which counts how often it's called
+    calls = []
+    def build(vertex_slice, scale=1):
+        calls.append(vertex_slice)
+        return b"\x00" * len(vertex_slice) * scale
+
+    cache = utils.PayloadCache(build)
+    slice_a = utils.UnitStrideSlice(0, 10)
+    slice_b = utils.UnitStrideSlice(10, 15)
+
+    # Check payloads are only built once for each set of arguments
+    assert len(cache.get(slice_a)) == 10
+    assert len(cache.get(slice_a)) == 10
+    assert len(cache.get(slice_a, scale=2)) == 20
+    assert len(cache.get(slice_b)) == 5
+    assert len(calls) == 3
+    assert len(cache) == 3
+
+    # Check evicted payloads are rebuilt
+    cache.evict(slice_a)
+    assert len(cache) == 2
+    cache.get(slice_a)
+    assert len(calls) == 4
+
+    # Check invalidating removes all payloads
+    cache.invalidate()
+    assert len(cache) == 0
@@ -1,13 +1,18 @@
 # Import modules
 import numpy as np
+import os
 import scipy.stats as sp
 import pytest
 import pynn_spinnaker as sim
+from pynn_spinnaker import connectors
 
 # Import classes
 from pynn_spinnaker.spinnaker.synapse_cluster import WeightRange
 from pynn_spinnaker.spinnaker.utils import UnitStrideSlice
 
+# Import functions
+from pynn_spinnaker.spinnaker.connection_file import convert_text_connection_file
+
 # ----------------------------------------------------------------------------
 # Tests
 # ----------------------------------------------------------------------------
@@ -98,3 +103,159 @@ def test_row_synapses_distribution(pre_size, post_size, post_slice, connector):
     # Check estimated mean is approximately correct
     assert estimated_mean_row_synapses <= (1.25 * actual_mean_row_synapses)
     assert estimated_mean_row_synapses >= (0.75 * actual_mean_row_synapses)
+
+@pytest.mark.parametrize("pre_slice, post_slice",
+                         [(UnitStrideSlice(0, 100), UnitStrideSlice(0, 200)),
+                          (UnitStrideSlice(0, 64), UnitStrideSlice(0, 128)),
+                          (UnitStrideSlice(64, 100), UnitStrideSlice(128, 300))])
+def test_from_list_row_length_histogram(pre_slice, post_slice):
+    # Build random connection list with 100 x 200 neurons
+    conn_list = np.vstack((np.random.randint(100, size=5000),
+                           np.random.randint(200, size=5000),
+                           np.random.uniform(size=5000),
+                           np.ones(5000))).T
+    connector = sim.FromListConnector(conn_list)
+
+    # Count synapses in each row of slice directly
+    pre_indices = conn_list[:, 0].astype(int)
+    post_indices = conn_list[:, 1].astype(int)
+    mask = ((post_indices >= post_slice.start) &
+            (post_indices < post_slice.stop))
+    row_lengths = np.bincount(pre_indices[mask], minlength=100)
+    expected_hist = np.bincount(row_lengths[pre_slice.python_slice])
+
+    # Check indexed histogram matches and that it is cached
+    hist = connector._get_slice_row_length_histogram(pre_slice, post_slice)
+    assert np.array_equal(hist, expected_hist)
+    assert connector._get_slice_row_length_histogram(pre_slice,
+                                                     post_slice) is hist
+
+@pytest.mark.parametrize("binary", [False, True])
+@pytest.mark.parametrize("post_slice",
+                         [UnitStrideSlice(0, 200),
+                          UnitStrideSlice(0, 64),
+                          UnitStrideSlice(64, 150)])
+def test_from_file_connect(tmpdir, binary, post_slice):
+    # Setup simulator
+    sim.setup(timestep=1.0, min_delay=1.0, max_delay=8.0, spinnaker_hostname="")
+
+    # Write random connection list with 100 x 200 neurons to text file
+    conn_list = _random_connection_list(100, 200, 5000)
+    filename = _write_connection_file(tmpdir, conn_list)
+
+    # If required, convert it to a binary connection file
+    if binary:
+        convert_text_connection_file(filename, filename + ".npy")
+        filename += ".npy"
+
+    # Create two populations and connect them together with file
+    pre = sim.Population(100, sim.IF_curr_exp())
+    post = sim.Population(200, sim.IF_curr_exp())
+    proj = sim.Projection(pre, post, sim.FromFileConnector(filename),
+                          sim.StaticSynapse())
+
+    # Build projection with only the post-synaptic slice local
+    sub_rows = [[] for _ in range(100)]
+    weight_range = WeightRange(sim.StaticSynapse._signed_weight)
+    proj.post._mask_local = np.zeros((200,), dtype=bool)
+    proj.post._mask_local[post_slice.python_slice] = True
+    proj._build(matrix_rows=sub_rows,
+                weight_range=weight_range,
+                directly_connect=False)
+
+    # Check that exactly the connections to the slice were built
+    mask = ((conn_list[:, 1] >= post_slice.start) &
+            (conn_list[:, 1] < post_slice.stop))
+    expected = sorted(map(tuple, conn_list[mask]))
+    actual = sorted((i, s.index, s.weight, s.delay)
+                    for i, row in enumerate(sub_rows) for s in row)
+    assert np.array_equal(actual, expected)
+
+@pytest.mark.parametrize("pre_slice, post_slice",
+                         [(UnitStrideSlice(0, 100), UnitStrideSlice(0, 200)),
+                          (UnitStrideSlice(0, 64), UnitStrideSlice(0, 128)),
+                          (UnitStrideSlice(64, 100), UnitStrideSlice(128, 300))])
+def test_from_file_row_length_histogram(tmpdir, pre_slice, post_slice):
+    # Write random connection list with 100 x 200 neurons to text file
+    # and check connector memory-maps the binary version of it
+    conn_list = _random_connection_list(100, 200, 5000)
+    connector = sim.FromFileConnector(_write_connection_file(tmpdir,
+                                                             conn_list))
+    assert isinstance(connector.conn_list, np.memmap)
+
+    # Count synapses in each row of slice directly
+    pre_indices = conn_list[:, 0].astype(int)
+    post_indices = conn_list[:, 1].astype(int)
+    mask = ((post_indices >= post_slice.start) &
+            (post_indices < post_slice.stop))
+    row_lengths = np.bincount(pre_indices[mask], minlength=100)
+    row_lengths = row_lengths[pre_slice.python_slice]
+    expected_hist = np.bincount(row_lengths)
+
+    # Check histogram matches and that it is cached
+    hist = connector._get_slice_row_length_histogram(pre_slice, post_slice)
+    assert np.array_equal(hist, expected_hist)
+    assert connector._get_slice_row_length_histogram(pre_slice,
+                                                     post_slice) is hist
+
+    # Check row length statistics match
+    row_synapses_distribution = connector._row_synapses_distribution(
+        pre_slice, post_slice, 100, 200)
+    assert np.isclose(row_synapses_distribution.mean(), np.mean(row_lengths))
+    assert row_synapses_distribution.ppf(1.0) == np.amax(row_lengths)
+
+def test_from_file_conversion_cache(tmpdir, monkeypatch):
+    # Count conversions of text connection files
+    conversions = []
+    def count_conversions(text_filename, binary_filename):
+        conversions.append(text_filename)
+        convert_text_connection_file(text_filename, binary_filename)
+    monkeypatch.setattr(connectors, "convert_text_connection_file",
+                        count_conversions)
+
+    # Write random connection list to text file
+    conn_list = _random_connection_list(100, 200, 500)
+    filename = _write_connection_file(tmpdir, conn_list)
+
+    # Check that first connector converts text file
+    connector = sim.FromFileConnector(filename)
+    assert conversions == [filename]
+    assert os.path.exists(filename + ".npy")
+
+    # Check that second connector reuses binary file
+    connector = sim.FromFileConnector(filename)
+    assert conversions == [filename]
+    assert (sorted(map(tuple, np.asarray(connector.conn_list))) ==
+            sorted(map(tuple, conn_list)))
+
+    # Overwrite text file with a new connection list and make
+    # sure its modification time is after the binary file's
+    conn_list = _random_connection_list(100, 200, 300)
+    _write_connection_file(tmpdir, conn_list)
+    modified_time = os.path.getmtime(filename + ".npy") + 10.0
+    os.utime(filename, (modified_time, modified_time))
+
+    # Check that third connector converts text file again
+    # and that the binary file now contains the new connections
+    connector = sim.FromFileConnector(filename)
+    assert conversions == [filename, filename]
+    assert (sorted(map(tuple, np.asarray(connector.conn_list))) ==
+            sorted(map(tuple, conn_list)))
+
+# ----------------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------------
+def _random_connection_list(pre_size, post_size, num_connections):
+    # Build random connection list with whole millisecond delays
+    return np.vstack((np.random.randint(pre_size, size=num_connections),
+                      np.random.randint(post_size, size=num_connections),
+                      np.random.uniform(size=num_connections),
+                      np.random.randint(1, 9, size=num_connections))).T
+
+def _write_connection_file(tmpdir, conn_list):
+    # Write connection list to text file with PyNN-style header
+    filename = str(tmpdir.join("connections.txt"))
+    with open(filename, "w") as f:
+        f.write("# columns = ['i', 'j', 'weight', 'delay']\n")
+        np.savetxt(f, conn_list, fmt="%r", delimiter="\t")
+    return filename
@@ -0,0 +1,42 @@
+# Import modules
+import subprocess
+import sys
+
+# ----------------------------------------------------------------------------
+# Globals
+# ----------------------------------------------------------------------------
+# How long, on top of the PyNN modules it builds upon,
+# importing pynn_spinnaker may take in a fresh interpreter
+IMPORT_TIME_BUDGET_S = 0.5
+
+# ----------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------
+def test_import_defers_heavy_modules():
+    # Import pynn_spinnaker in a clean interpreter and
+    # list which slow-to-import modules were loaded with it
+    # **NOTE** scipy.stats isn't included as PyNN loads it through Neo
+    deferred = ["rig.machine_control", "rig.place_and_route"]
+    script = ("import sys, pynn_spinnaker; "
+              "print(' '.join(m for m in %r if m in sys.modules))" % deferred)
+    loaded = subprocess.check_output([sys.executable, "-c", script])
+
+    # Check none were - they should only be imported
+    # when a simulation is built
+    assert loaded.split() == []
+
+
+def test_import_time_budget():
+    # In a clean interpreter, import the PyNN modules pynn_spinnaker
+    # builds upon and then time how much longer importing it takes
+    script = ("import time, pyNN.common, pyNN.recording; "
+              "start = time.time(); "
+              "import pynn_spinnaker; "
+              "print(time.time() - start)")
+
+    # Take the fastest of several imports to reduce
+    # the influence of other processes on the machine
+    import_time = min(float(subprocess.check_output([sys.executable,
+                                                     "-c", script]))
+                      for _ in range(3))
+    assert import_time < IMPORT_TIME_BUDGET_S
@@ -0,0 +1,37 @@
+# Import modules
+import numpy as np
+import pynn_spinnaker as sim
+
+# Import classes
+from pynn_spinnaker.simulator import ID
+
+# ----------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------
+def test_population_ids():
+    sim.setup(timestep=1.0)
+
+    pop_a = sim.Population(10, sim.IF_curr_exp())
+    pop_b = sim.Population(5, sim.IF_curr_exp())
+
+    # Check ids are only materialised as ID objects, belonging
+    # to the population, when they are accessed individually
+    assert isinstance(pop_a.all_cells[3], ID)
+    assert pop_a.all_cells[3].parent is pop_a
+    assert all(id.parent is pop_b for id in pop_b.all_cells)
+    assert pop_b.first_id == pop_a.last_id + 1
+
+    # Check ids can be converted back to indices
+    assert pop_a.id_to_index(pop_a[7]) == 7
+    assert np.array_equal(pop_b.id_to_index(pop_b.all_cells), np.arange(5))
+
+    # Check views of populations share their ids
+    view = pop_a[2:6]
+    assert view[0] == pop_a[2]
+    assert view[0].parent is pop_a
+    assert np.array_equal(view.id_to_index(view.all_cells), np.arange(4))
+
+    # Check assemblies of populations contain ids from each population
+    assembly = pop_a + pop_b
+    assert len(assembly.all_cells) == 15
+    assert assembly.all_cells[12].parent is pop_b
@@ -2,9 +2,11 @@
 import numpy as np
 import pytest
 import pynn_spinnaker as sim
+from pyNN import common
 
 # Import classes
 from collections import defaultdict
+from pyNN.parameters import ParameterSpace
 from pyNN.random import RandomDistribution
 from pynn_spinnaker.spinnaker.neural_cluster import Vertex
 from pynn_spinnaker.spinnaker.regions import (KeyLookupBinarySearch,
@@ -12,6 +14,9 @@ from pynn_spinnaker.spinnaker.regions import (KeyLookupBinarySearch,
 from pynn_spinnaker.spinnaker.synapse_cluster import row_dtype
 from pynn_spinnaker.spinnaker.synapse_cluster import WeightRange
 from pynn_spinnaker.spinnaker.utils import UnitStrideSlice
+from pynn_spinnaker.projections import (interleave_parameters,
+                                        sum_connections_to_array,
+                                        SynapseClusterType)
 from rig.bitfield import BitField
 
 # ----------------------------------------------------------------------------
@@ -105,3 +110,202 @@ def test_estimate_max_dims(pre_size, post_size, post_slice, delay, connector):
     assert (sub_matrix_props[0].max_cols - 1) * 3 >= max_cols
     assert sub_matrix_props[0].size_words <= max_size_words
     assert sub_matrix_props[0].size_words * 3 >= max_size_words
+
+@pytest.mark.parametrize("pre_size, post_size, num_synapses",
+                         [(10, 20, 0), (10, 20, 50), (200, 100, 5000)])
+def test_sum_connections_to_array(pre_size, post_size, num_synapses):
+    # Generate random synapses, including some between the same neurons
+    pre_indices = np.random.randint(pre_size, size=num_synapses)
+    post_indices = np.random.randint(post_size, size=num_synapses)
+    values = np.random.uniform(size=num_synapses)
+
+    # Build reference array by accumulating each synapse in turn
+    reference = np.empty((pre_size, post_size))
+    reference.fill(np.nan)
+    for i, j, v in zip(pre_indices, post_indices, values):
+        reference[i, j] = v if np.isnan(reference[i, j]) else reference[i, j] + v
+
+    array = sum_connections_to_array((pre_size, post_size), pre_indices,
+                                     post_indices, values)
+    assert np.allclose(array, reference, equal_nan=True)
+
+@pytest.mark.parametrize("num_merged", [1, 2, 5])
+def test_merge_direct_projections(num_merged):
+    # Setup simulator
+    sim.setup(timestep=1.0)
+
+    # Create post-synaptic population
+    post = sim.Population(100, sim.IF_curr_exp())
+
+    # Connect Poisson sources one-to-one to post-synaptic population
+    pre = [sim.Population(100, sim.SpikeSourcePoisson(rate=10.0 * (i + 1)))
+           for i in range(num_merged)]
+    merged_proj = [sim.Projection(p, post, sim.OneToOneConnector(),
+                                  sim.StaticSynapse(weight=0.1),
+                                  receptor_type="excitatory")
+                   for p in pre]
+
+    # Add projections which can't be merged with them - one from a
+    # population which is being recorded and one to another receptor
+    recorded_pre = sim.Population(100, sim.SpikeSourcePoisson(rate=5.0))
+    recorded_pre.record("spikes")
+    recorded_proj = sim.Projection(recorded_pre, post,
+                                   sim.OneToOneConnector(),
+                                   sim.StaticSynapse(weight=0.1),
+                                   receptor_type="excitatory")
+    inh_proj = sim.Projection(pre[0], post, sim.OneToOneConnector(),
+                              sim.StaticSynapse(weight=0.1),
+                              receptor_type="inhibitory")
+
+    # Estimate constraints and check projections were grouped correctly
+    post._estimate_constraints(1000)
+    groups = post._direct_projection_groups
+    assert len(groups) == 3
+    assert tuple(merged_proj) in groups
+    assert (recorded_proj,) in groups
+    assert (inh_proj,) in groups
+
+    # Check sources for each neuron in merged
+    # group fit within current input constraint
+    for p in merged_proj:
+        assert p._current_input_j_constraint <= (2048 // num_merged)
+
+def test_interleave_parameters():
+    a = ParameterSpace({"rate": np.arange(5.0), "start": 1.0}, shape=(5,))
+    b = ParameterSpace({"rate": np.arange(5.0, 10.0), "start": 2.0},
+                       shape=(5,))
+
+    # Check each neuron's parameters are adjacent
+    parameters = interleave_parameters([a, b])
+    assert np.array_equal(parameters["rate"].evaluate(),
+                          [0.0, 5.0, 1.0, 6.0, 2.0, 7.0, 3.0, 8.0, 4.0, 9.0])
+    assert np.array_equal(parameters["start"].evaluate(), [1.0, 2.0] * 5)
+
+def test_synapse_cluster_type_comparable_cache():
+    timing = sim.SpikePairRule(tau_plus=16.7, tau_minus=33.7,
+                               A_plus=0.005, A_minus=0.005)
+    weight = sim.AdditiveWeightDependence(w_min=0.0, w_max=0.1)
+    stdp = sim.STDPMechanism(timing_dependence=timing,
+                             weight_dependence=weight, weight=0.05,
+                             delay=1.0)
+    cluster_type = SynapseClusterType(stdp, "excitatory")
+
+    # Check comparable tuples of STDP components are cached when built
+    assert timing._comparable_cache is None
+    hash(cluster_type)
+    assert timing._comparable_cache is not None
+    assert weight._comparable_cache is not None
+
+    # Check an identically-parameterised mechanism is compatible
+    other_weight = sim.AdditiveWeightDependence(w_min=0.0, w_max=0.1)
+    other_stdp = sim.STDPMechanism(timing_dependence=timing,
+                                   weight_dependence=other_weight, weight=0.05,
+                                   delay=1.0)
+    other_cluster_type = SynapseClusterType(other_stdp, "excitatory")
+    assert cluster_type == other_cluster_type
+    assert hash(cluster_type) == hash(other_cluster_type)
+
+    # Check setting parameters invalidates cache so types are now incompatible
+    other_weight.set_parameters(w_max=0.2)
+    assert other_weight._comparable_cache is None
+    assert cluster_type != other_cluster_type
+
+@pytest.mark.parametrize("chunk_size", [30, 40, 50])
+@pytest.mark.parametrize("sub_matrix_sizes", [[40, 40, 40], [0, 0], []])
+def test_iter_connections(monkeypatch, chunk_size, sub_matrix_sizes):
+    # Setup simulator
+    sim.setup(timestep=0.1, min_delay=1.0, max_delay=8.0)
+
+    # Connect two populations together and replace the reading of
+    # their synaptic matrices with sub-matrices of known sizes
+    proj, connections = _build_fake_projection(monkeypatch, sub_matrix_sizes)
+
+    # Check chunks are all full, apart from the last, and contain every
+    # connection with only the requested attributes, in the order read
+    chunks = list(proj.iter_connections("weight", chunk_size=chunk_size))
+    assert len(chunks) == -(-len(connections) // chunk_size)
+    assert all(len(c) == chunk_size for c in chunks[:-1])
+    assert all(0 < len(c) <= chunk_size for c in chunks)
+    for c in chunks:
+        assert c.dtype.names == ("presynaptic_index", "postsynaptic_index",
+                                 "weight")
+    if len(chunks) > 0:
+        streamed = np.concatenate(chunks)
+        for n in streamed.dtype.names:
+            assert np.array_equal(streamed[n], connections[n])
+
+@pytest.mark.parametrize("with_address", [True, False])
+def test_save_list_streamed(monkeypatch, tmpdir, with_address):
+    # Setup simulator
+    sim.setup(timestep=0.1, min_delay=1.0, max_delay=8.0)
+
+    # Connect two populations together and replace the reading of
+    # their synaptic matrices with sub-matrices of known sizes
+    proj, connections = _build_fake_projection(monkeypatch, [40, 25, 0, 7])
+
+    # Save connections by streaming them and by letting PyNN gather them
+    # **NOTE** connections are only gathered from other MPI processes in
+    # distributed simulations so, to match streaming, don't try here
+    streamed_filename = str(tmpdir.join("streamed.txt"))
+    gathered_filename = str(tmpdir.join("gathered.txt"))
+    proj.save("all", streamed_filename, gather=False,
+              with_address=with_address)
+    common.Projection.save(proj, "all", gathered_filename, "list",
+                           gather=False, with_address=with_address)
+
+    # Check headers are identical
+    with open(streamed_filename, "r") as streamed_file:
+        streamed_header = streamed_file.readline()
+    with open(gathered_filename, "r") as gathered_file:
+        gathered_header = gathered_file.readline()
+    assert streamed_header.startswith("# columns = ")
+    assert streamed_header == gathered_header
+
+    # Check rows are identical
+    # **NOTE** PyNN writes indices as integers rather than floats
+    # so compare the parsed values rather than the text
+    streamed = np.loadtxt(streamed_filename, ndmin=2)
+    gathered = np.loadtxt(gathered_filename, ndmin=2)
+    assert streamed.shape == (len(connections), 4 if with_address else 2)
+    assert np.array_equal(streamed, gathered)
+
+# ----------------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------------
+def _build_fake_projection(monkeypatch, sub_matrix_sizes, rows_per_matrix=8):
+    # Connect two populations together
+    pre = sim.Population(100, sim.IF_curr_exp())
+    post = sim.Population(100, sim.IF_curr_exp())
+    proj = sim.Projection(pre, post, sim.AllToAllConnector(),
+                          sim.StaticSynapse(weight=0.1, delay=1.0))
+
+    # Generate random connections for every sub-matrix
+    dtype = np.dtype([("presynaptic_index", np.uint32),
+                      ("postsynaptic_index", np.uint32),
+                      ("weight", np.float64), ("delay", np.float64)])
+    num_connections = sum(sub_matrix_sizes)
+    connections = np.empty(num_connections, dtype=dtype)
+    connections["presynaptic_index"] = np.random.randint(100,
+                                                         size=num_connections)
+    connections["postsynaptic_index"] = np.random.randint(100,
+                                                          size=num_connections)
+    connections["weight"] = np.random.uniform(size=num_connections)
+    connections["delay"] = np.random.randint(1, 9, size=num_connections)
+
+    def iter_synaptic_matrices(pre_pop, synapse_type, names):
+        # **NOTE** some versions of PyNN pass names as a single list
+        if len(names) == 1 and not isinstance(names[0], str):
+            names = names[0]
+
+        # Split connections into sub-matrices, each made up of rows
+        # with only the requested attributes, like those read from SpiNNaker
+        assert pre_pop is pre
+        start = 0
+        for size in sub_matrix_sizes:
+            matrix = connections[start:start + size]
+            start += size
+            yield np.array_split(matrix[list(names)].copy(), rows_per_matrix)
+
+    monkeypatch.setattr(post, "_iter_synaptic_matrices",
+                        iter_synaptic_matrices)
+    return proj, connections